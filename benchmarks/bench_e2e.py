@@ -0,0 +1,174 @@
+# benchmarks/bench_e2e.py
+"""End-to-end harvest benchmark: DevInsightsWorkflow.run against the GitHub stand-in
+
+Run from the repo root:
+
+    python -m benchmarks.bench_e2e [--commits 10000] [--modes graphql rest] [--latency-ms 30] [--out e2e.json]
+    python -m benchmarks.bench_e2e --replay cassette.json --repo owner/name --time-range 2024-07-01..2024-09-30
+
+benchmarks.github_standin serves a synthesized repository, or replays a
+cassette recorded from the real API, with per-request latency. Each
+harvest mode runs in a fresh interpreter with its own empty database and
+HTTP cache and checkpoint store, and the LLM stubbed. Pass 1 is a cold harvest.
+Later passes reuse the store and cache the way a repeat report does, with
+an incremental delta sync and 304 revalidation. Per pass it reports API
+calls by route, 304s, bytes on the wire, rate limit used, and harvest and
+whole-run wall time.
+"""
+from typing import Any, Dict, List
+from datetime import date, timedelta
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+SYNTHETIC_START = date(2024, 1, 1)  # benchmarks.synthetic histories start here
+
+CHILD = """
+import json, sys
+from benchmarks.bench_e2e import run_passes
+print(json.dumps(run_passes(json.loads(sys.argv[1]))))
+"""
+
+
+def run_passes(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Child side: run the workflow ``passes`` times, snapshotting the stand-in's counters after each"""
+    import requests
+    from benchmarks.bench_suite import StubLLM
+    from src.clients import get_client_registry
+    from src.graph.workflow import DevInsightsWorkflow
+
+    get_client_registry().set("llm", StubLLM())
+    control = requests.Session()
+    results = []
+    for index in range(config["passes"]):
+        control.post(f"{config['url']}/_standin/reset").raise_for_status()
+        workflow = DevInsightsWorkflow()
+        harvest_s = []
+        process = workflow.harvester.process
+
+        def timed_process(state, process=process, harvest_s=harvest_s):
+            start = time.perf_counter()
+            try:
+                return process(state)
+            finally:
+                harvest_s.append(time.perf_counter() - start)
+
+        # Bound into the graph when it is built, on the first run
+        workflow.harvester.process = timed_process
+        start = time.perf_counter()
+        report = workflow.run("insights", config["time_range"])
+        run_s = time.perf_counter() - start
+        # Counted once the run is over, so background writes are not in the timing
+        get_client_registry().get("db").flush()
+        results.append({
+            "pass": index + 1,
+            "harvest_s": sum(harvest_s),
+            "run_s": run_s,
+            "commits": report.get("metrics", {}).get("team_metrics", {}).get("total_commits"),
+            "errors": report.get("errors", []),
+            "api": control.get(f"{config['url']}/_standin/stats").json(),
+        })
+    return results
+
+
+def _child_env(standin_env: Dict[str, str], mode: str, repo: str, workdir: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    owner, name = repo.split("/", 1)
+    env.update(standin_env)
+    env.update({
+        "GITHUB_TOKEN": env.get("GITHUB_TOKEN", "standin"),
+        "GITHUB_OWNER": owner,
+        "GITHUB_REPO": name,
+        "GITHUB_HARVEST_MODE": mode,
+        # Nothing carried over from the developer's machine or another mode
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, mode + '.db')}",
+        "GITHUB_HTTP_CACHE": os.path.join(workdir, mode + "_http.sqlite"),
+        "LLM_CACHE_BACKEND": "off",
+        # On, as in production, so passes pay for saving each node's outputs
+        "WORKFLOW_CHECKPOINTS": "sqlite",
+        "WORKFLOW_CHECKPOINT_PATH": os.path.join(workdir, mode + "_checkpoints.sqlite"),
+    })
+    for key in ("GITHUB_REPOS", "GITHUB_ORG"):
+        env.pop(key, None)
+    return env
+
+
+def run_mode(standin, mode: str, args: argparse.Namespace, workdir: str) -> List[Dict[str, Any]]:
+    config = {"url": standin.url, "passes": args.passes, "time_range": args.time_range}
+    env = _child_env(standin.env(), mode, args.repo, workdir)
+    if args.concurrency:
+        env["HARVEST_CONCURRENCY"] = str(args.concurrency)
+    result = subprocess.run([sys.executable, "-c", CHILD, json.dumps(config)],
+                            capture_output=True, text=True, env=env)
+    if result.returncode:
+        raise RuntimeError(f"{mode} run failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=10_000, help="size of the synthesized repository")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--replay", metavar="CASSETTE", help="replay a recorded cassette instead of synthesizing")
+    parser.add_argument("--repo", default="bench/app")
+    parser.add_argument("--time-range", help="defaults to the synthesized history's full span")
+    parser.add_argument("--modes", nargs="+", default=["graphql", "rest"], choices=["graphql", "rest"])
+    parser.add_argument("--passes", type=int, default=2, help="pass 1 is cold, later ones reuse store and cache")
+    parser.add_argument("--concurrency", type=int, help="HARVEST_CONCURRENCY for the runs")
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    from benchmarks.github_standin import CassetteReplay, GitHubStandIn, SyntheticGitHub
+    if args.replay:
+        if not args.time_range:
+            parser.error("--replay needs the --time-range the cassette was recorded with")
+        backend = CassetteReplay(args.replay)
+    else:
+        # A fixed calendar window keeps request URLs, and so ETags and cache keys, identical across passes
+        last_day = SYNTHETIC_START + timedelta(days=args.days - 1)
+        args.time_range = args.time_range or f"{SYNTHETIC_START}..{last_day}"
+        backend = SyntheticGitHub(args.commits, (args.repo,), args.seed, args.days)
+
+    meta = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "source": args.replay or f"synthetic {args.commits:,} commits, seed {args.seed}",
+        "time_range": args.time_range,
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "concurrency": args.concurrency,
+    }
+    results = []
+    with GitHubStandIn(backend, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed) as standin, \
+            tempfile.TemporaryDirectory() as workdir:
+        for mode in args.modes:
+            for result in run_mode(standin, mode, args, workdir):
+                result["mode"] = mode
+                results.append(result)
+                api = result["api"]
+                print(f"{mode:8} pass {result['pass']}  harvest {result['harvest_s']:7.2f} s  "
+                      f"run {result['run_s']:7.2f} s  {api['requests']:6d} calls  "
+                      f"{api['not_modified']:6d} 304s  {api['bytes_out'] / 1024:10.1f} KiB out  "
+                      f"{api['bytes_in'] / 1024:8.1f} KiB in  commits {result['commits']}")
+                for route, counts in api["routes"].items():
+                    print(f"    {route:45} {counts['calls']:6d} calls  {counts['not_modified']:6d} 304s  "
+                          f"{counts['bytes_out'] / 1024:10.1f} KiB")
+                for error in result["errors"]:
+                    print(f"    error: {error}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
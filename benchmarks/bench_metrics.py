@@ -0,0 +1,45 @@
+# benchmarks/bench_metrics.py
+"""Scaling benchmark for MetricsEngine.compute
+
+Run from the repo root:
+
+    python -m benchmarks.bench_metrics [--sizes 10000 100000 1000000] [--out metrics.json]
+
+Inputs are built directly as columnar tables (benchmarks.synthetic) so the
+timing covers the engine, not dict construction. Reports wall time and
+ns/commit per size; roughly constant ns/commit across sizes is the
+linear-scaling check.
+"""
+import argparse
+import json
+import time
+from benchmarks.synthetic import synthetic_tables
+from src.metrics.engine import MetricsEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        commits, prs = synthetic_tables(size)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            MetricsEngine.compute(commits, prs)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        results.append({"commits": size, "prs": len(prs), "seconds": best, "ns_per_commit": best / size * 1e9})
+        print(f"{size:>10,} commits  {best * 1000:9.1f} ms  {best / size * 1e9:7.1f} ns/commit")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/bench_startup.py
+"""Cold-start benchmark for DevInsightsWorkflow
+
+Run from the repo root:
+
+    python -m benchmarks.bench_startup [--repeat 5] [--warm] [--out startup.json]
+    python -m benchmarks.bench_startup --record benchmarks/startup_baseline.json
+    python -m benchmarks.bench_startup --baseline benchmarks/startup_baseline.json
+
+Each sample is a fresh interpreter that imports src.graph.workflow and
+constructs DevInsightsWorkflow() (plus warm() with --warm), which is what a
+scaled-to-zero bot pays per cold start. One extra run under -X importtime
+attributes the import time to the slowest modules. With
+--baseline the run fails when the median cold start regresses past the
+recorded one by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+from src.graph.workflow import DevInsightsWorkflow
+imported = time.perf_counter()
+workflow = DevInsightsWorkflow()
+constructed = time.perf_counter()
+if {warm}:
+    workflow.warm()
+print(json.dumps({{
+    "import_s": imported - start,
+    "construct_s": constructed - imported,
+    "warm_s": time.perf_counter() - constructed,
+}}))
+"""
+
+
+def _child_env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    # Keep samples off the developer's real caches and database
+    env.setdefault("LLM_CACHE_BACKEND", "off")
+    env.setdefault("DATABASE_URL", "sqlite://")
+    return env
+
+
+def sample(warm: bool, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", CHILD.format(warm=warm)]
+    result = subprocess.run(command, capture_output=True, text=True, env=_child_env())
+    if result.returncode:
+        raise RuntimeError(f"startup sample failed:\n{result.stderr[-2000:]}")
+    return result
+
+
+def slowest_imports(stderr: str, top: int, max_depth: int) -> list:
+    """Modules nested at most ``max_depth`` deep, by cumulative import time, from -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        # Names are indented two spaces per nesting level after the separator's space
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= max_depth:
+            modules.append({"module": name.strip(), "depth": depth, "ms": int(cumulative) / 1000})
+    return sorted(modules, key=lambda m: m["ms"], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warm", action="store_true", help="also time workflow.warm() (graph, LLM, DB)")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to report")
+    parser.add_argument("--depth", type=int, default=1, help="import nesting depth to break down")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    parser.add_argument("--record", help="write the median cold start to this baseline file")
+    parser.add_argument("--baseline", help="fail if slower than the cold start recorded here")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression vs the baseline")
+    args = parser.parse_args()
+
+    samples = [json.loads(sample(args.warm).stdout.strip().splitlines()[-1]) for _ in range(args.repeat)]
+    median = {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+    cold_start = median["import_s"] + median["construct_s"] + median["warm_s"]
+    imports = slowest_imports(sample(args.warm, importtime=True).stderr, args.top, args.depth)
+
+    print(f"import     {median['import_s'] * 1000:8.1f} ms")
+    print(f"construct  {median['construct_s'] * 1000:8.1f} ms")
+    if args.warm:
+        print(f"warm       {median['warm_s'] * 1000:8.1f} ms")
+    print(f"cold start {cold_start * 1000:8.1f} ms  (median of {args.repeat})")
+    print("slowest imports:")
+    for module in imports:
+        print(f"  {module['ms']:8.1f} ms  {'  ' * module['depth']}{module['module']}")
+
+    results = {"python": sys.version.split()[0], "warm": args.warm, "repeat": args.repeat,
+               "median": median, "cold_start_s": cold_start, "samples": samples, "imports": imports}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.record:
+        with open(args.record, "w") as f:
+            json.dump({"warm": args.warm, "cold_start_s": cold_start}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        limit = baseline["cold_start_s"] * (1 + args.tolerance)
+        if cold_start > limit:
+            print(f"REGRESSION: cold start {cold_start * 1000:.1f} ms exceeds "
+                  f"{limit * 1000:.1f} ms (baseline {baseline['cold_start_s'] * 1000:.1f} ms "
+                  f"+ {args.tolerance:.0%})")
+            sys.exit(1)
+        print(f"ok: within {args.tolerance:.0%} of baseline {baseline['cold_start_s'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
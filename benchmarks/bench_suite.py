@@ -0,0 +1,210 @@
+# benchmarks/bench_suite.py
+"""Per-stage benchmark of the analysis, anomaly and chart hot paths
+
+Run from the repo root:
+
+    python -m benchmarks.bench_suite [--sizes 1000 10000 100000 1000000] [--stages engine charts]
+    python -m benchmarks.bench_suite --out suite.json --thresholds benchmarks/thresholds.json
+    python -m benchmarks.bench_suite --record-thresholds benchmarks/thresholds.json [--headroom 2]
+
+Inputs come from benchmarks.synthetic (seeded), and the LLM and database
+are stubbed, so a stage measures only this repo's code. For each stage and
+size it reports the best and median wall time over --repeat runs, then runs
+it once more under tracemalloc for peak and net traced memory plus the net
+change in allocated blocks. With --thresholds, any stage slower or hungrier
+than its recorded limit fails the run.
+"""
+from typing import Any, Callable, Dict, List
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import numpy as np
+from benchmarks.synthetic import synthetic_tables, synthetic_trend
+
+STUB_RESPONSE = "Velocity is steady; churn is concentrated in a few large commits worth reviewing."
+
+
+class StubLLM:
+    """Stands in for GeminiLLM: canned text, no network"""
+
+    def invoke(self, prompt: str) -> str:
+        return STUB_RESPONSE
+
+    def stream(self, prompt: str):
+        yield STUB_RESPONSE
+
+
+class StubDB:
+    """Just the DatabaseManager calls the agents make on these paths"""
+
+    def __init__(self):
+        self.anomaly_state = {}
+
+    def load_anomaly_state(self, scope: str):
+        return self.anomaly_state.get(scope)
+
+    def save_anomaly_state(self, scope: str, state: Dict[str, Any]):
+        self.anomaly_state[scope] = state
+
+    def save_conversation(self, agent_name: str, prompt: str, response: str):
+        pass
+
+
+def _agents():
+    from src.agents.diffanalyst import DiffAnalystAgent
+    from src.agents.insightnarrator import InsightNarratorAgent
+    from src.clients import ClientRegistry
+    clients = ClientRegistry()
+    clients.register("llm", StubLLM)
+    clients.register("db", StubDB)
+    return DiffAnalystAgent(clients), InsightNarratorAgent(clients)
+
+
+def build_stages(commits, prs) -> Dict[str, Callable[[], Any]]:
+    """Stage name -> zero-argument callable over one dataset"""
+    from src.metrics.calculator import MetricsCalculator
+    from src.metrics.engine import MetricsEngine
+    from src.visualization.charts import ChartGenerator
+
+    analyst, narrator = _agents()
+    metrics = MetricsEngine.compute(commits, prs)
+    anomalies = analyst._detect_anomalies(commits, metrics, "bench")
+    state = {"metrics": metrics, "anomalies": anomalies, "code_analysis": STUB_RESPONSE,
+             "time_range": "weekly", "errors": []}
+    trend = synthetic_trend(int(np.clip(len(commits) // 1000, 10, 1000)))
+
+    def detect_anomalies():
+        # A cold detector every time: the first run over a window is the expensive one
+        analyst.detectors.clear()
+        analyst.db.anomaly_state.clear()
+        return analyst._detect_anomalies(commits, metrics, "bench")
+
+    return {
+        "engine.compute": lambda: MetricsEngine.compute(commits, prs),
+        "analyst.calculate_metrics": lambda: analyst._calculate_metrics(commits, prs),
+        "analyst.detect_anomalies": detect_anomalies,
+        "analyst.analyze_code": lambda: analyst.analyze_code(state),
+        "calculator.dora_metrics": lambda: MetricsCalculator.calculate_dora_metrics(commits, prs),
+        "calculator.code_health_metrics": lambda: MetricsCalculator.calculate_code_health_metrics(commits),
+        "calculator.developer_velocity": lambda: MetricsCalculator.calculate_developer_velocity(metrics["developer_metrics"]),
+        "narrator.narrate": lambda: narrator.narrate(state),
+        "charts.developer_activity_figure": lambda: ChartGenerator.developer_activity_figure(metrics["developer_metrics"]),
+        "charts.code_health_figure": lambda: ChartGenerator.code_health_figure(metrics["team_metrics"]),
+        "charts.trend_figure": lambda: ChartGenerator.trend_figure(trend),
+    }
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    # Separate pass: tracemalloc slows allocation-heavy code down too much to time under it
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    current_before, _ = tracemalloc.get_traced_memory()
+    result = fn()
+    current_after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return {
+        "wall_s_min": min(timings),
+        "wall_s_median": statistics.median(timings),
+        "peak_kib": (peak - current_before) / 1024,
+        "net_kib": (current_after - current_before) / 1024,
+        "net_blocks": sys.getallocatedblocks() - blocks_before,
+    }
+
+
+def check_thresholds(results: List[Dict[str, Any]], thresholds: Dict[str, Any]) -> List[str]:
+    """Violations of per-stage, per-size wall_s / peak_kib limits"""
+    failures = []
+    limits = thresholds.get("limits", {})
+    for result in results:
+        limit = limits.get(result["stage"], {}).get(str(result["size"]))
+        if limit is None:
+            continue
+        if result["wall_s_min"] > limit["wall_s"]:
+            failures.append(f"{result['stage']} @ {result['size']:,}: {result['wall_s_min'] * 1000:.2f} ms "
+                            f"> limit {limit['wall_s'] * 1000:.2f} ms")
+        if result["peak_kib"] > limit["peak_kib"]:
+            failures.append(f"{result['stage']} @ {result['size']:,}: peak {result['peak_kib']:.0f} KiB "
+                            f"> limit {limit['peak_kib']:.0f} KiB")
+    return failures
+
+
+def record_thresholds(results: List[Dict[str, Any]], headroom: float, meta: Dict[str, Any]) -> Dict[str, Any]:
+    limits: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for result in results:
+        limits.setdefault(result["stage"], {})[str(result["size"])] = {
+            # Floors keep tiny stages from failing on timer noise
+            "wall_s": round(max(result["wall_s_min"] * headroom, 0.005), 6),
+            "peak_kib": round(max(result["peak_kib"] * headroom, 256), 1),
+        }
+    return {"recorded_on": meta, "headroom": headroom, "limits": limits}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--stages", nargs="+", help="only stages whose name starts with one of these")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    parser.add_argument("--thresholds", help="fail if any stage exceeds the limits in this file")
+    parser.add_argument("--record-thresholds", help="write limits (results x --headroom) to this file")
+    parser.add_argument("--headroom", type=float, default=2.0)
+    args = parser.parse_args()
+
+    meta = {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+    }
+    results = []
+    for size in args.sizes:
+        commits, prs = synthetic_tables(size, seed=args.seed)
+        stages = build_stages(commits, prs)
+        for name, fn in stages.items():
+            if args.stages and not any(name.startswith(prefix) for prefix in args.stages):
+                continue
+            result = {"stage": name, "size": size, "commits": len(commits), "prs": len(prs), **measure(fn, args.repeat)}
+            result["ns_per_commit"] = result["wall_s_min"] / size * 1e9
+            results.append(result)
+            print(f"{name:34} {size:>10,}  {result['wall_s_min'] * 1000:9.2f} ms  "
+                  f"{result['ns_per_commit']:9.1f} ns/commit  peak {result['peak_kib']:10.1f} KiB  "
+                  f"net {result['net_kib']:9.1f} KiB  {result['net_blocks']:+8d} blocks")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+    if args.record_thresholds:
+        with open(args.record_thresholds, "w") as f:
+            json.dump(record_thresholds(results, args.headroom, meta), f, indent=2)
+
+    if args.thresholds:
+        with open(args.thresholds) as f:
+            failures = check_thresholds(results, json.load(f))
+        if failures:
+            print("REGRESSION:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"ok: all stages within {args.thresholds}")
+
+
+if __name__ == "__main__":
+    main()
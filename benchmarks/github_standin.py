@@ -0,0 +1,760 @@
+# benchmarks/github_standin.py
+"""Local stand-in for the GitHub REST and GraphQL APIs
+
+Run from the repo root:
+
+    python -m benchmarks.github_standin --synthesize 10000 [--days 90] [--latency-ms 40]
+    python -m benchmarks.github_standin --record cassette.json    # proxies api.github.com with GITHUB_TOKEN
+    python -m benchmarks.github_standin --replay cassette.json
+
+and point the app at it:
+
+    GITHUB_API_URL=http://127.0.0.1:8765 GITHUB_GRAPHQL_URL=http://127.0.0.1:8765/graphql
+
+Synthesized repositories come from benchmarks.synthetic, so a size and seed
+always serve the same history. Cassettes hold real responses recorded
+through the stand-in and are replayed in recording order.
+
+In every mode the server behaves like GitHub wherever the harvester can
+tell. List endpoints page with Link headers and leave out the stats that
+only the per-commit and per-PR detail endpoints return. GETs carry ETags,
+and a matching If-None-Match gets a 304 that is not charged to the rate
+limit. Core and GraphQL budgets are reported in X-RateLimit-* headers, and
+an exhausted budget gets GitHub's rate-limit error. Every response can be
+delayed to model network latency.
+
+Requests and wire bytes are counted per endpoint. GET /_standin/stats
+returns the counts, and POST /_standin/reset zeroes them along with the
+rate limits.
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+
+DEFAULT_PORT = 8765
+UPSTREAM_URL = "https://api.github.com"
+# GitHub's per_page default and ceiling, and its cap on files listed per commit
+DEFAULT_PER_PAGE = 30
+MAX_PER_PAGE = 100
+MAX_COMMIT_FILES = 300
+RATE_LIMIT = 5000
+RATE_WINDOW = 3600  # seconds
+DOCS_URL = "https://docs.github.com/rest"
+
+# (status, headers, body)
+Response = Tuple[int, Dict[str, str], bytes]
+
+# Concrete paths are counted under their route, so stats stay small at any repo size
+_ROUTES = [
+    (re.compile(r"^/repos/[^/]+/[^/]+/commits/[^/]+$"), "/repos/{owner}/{repo}/commits/{sha}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/commits$"), "/repos/{owner}/{repo}/commits"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/pulls/\d+$"), "/repos/{owner}/{repo}/pulls/{number}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/pulls$"), "/repos/{owner}/{repo}/pulls"),
+    (re.compile(r"^/repos/[^/]+/[^/]+$"), "/repos/{owner}/{repo}"),
+    (re.compile(r"^/(orgs|users)/[^/]+/repos$"), "/{owner}/repos"),
+]
+
+
+def route(method: str, path: str) -> str:
+    for pattern, template in _ROUTES:
+        if pattern.match(path):
+            return f"{method} {template}"
+    return f"{method} {path}"
+
+
+def _json(status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    return status, dict(headers or {}), json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _not_found(message: str = "Not Found") -> Response:
+    return _json(404, {"message": message, "documentation_url": DOCS_URL})
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ") if value else None
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def _cursor(offset: int) -> str:
+    return base64.b64encode(f"cursor:{offset}".encode("ascii")).decode("ascii")
+
+
+def _offset(cursor: Optional[str]) -> int:
+    return int(base64.b64decode(cursor).decode("ascii").split(":", 1)[1]) if cursor else 0
+
+
+class StandInRequest:
+    __slots__ = ("method", "path", "query", "body", "headers", "base", "remaining")
+
+    def __init__(self, method: str, path: str, query: str, body: bytes, headers: Dict[str, str],
+                 base: str, remaining: int):
+        self.method = method
+        self.path = path
+        self.query = query          # raw query string
+        self.body = body
+        self.headers = headers
+        self.base = base            # the stand-in's own URL, for links in responses
+        self.remaining = remaining  # rate limit left once this request is charged
+
+    @property
+    def params(self) -> Dict[str, str]:
+        return dict(parse_qsl(self.query))
+
+
+class _SyntheticRepo:
+    """One synthesized repository, indexed for the list endpoints' filters"""
+
+    def __init__(self, full_name: str, n_commits: int, seed: int, days: int):
+        from benchmarks.synthetic import synthetic_tables
+        self.full_name = full_name
+        commits, pulls = synthetic_tables(n_commits, seed=seed, days=days)
+        # Newest first, as both APIs list history
+        self.commits = commits.sort_by("date", "sha", descending=True).to_records()
+        self.pulls = pulls.to_records()
+        self.by_sha = {commit["sha"]: commit for commit in self.commits}
+        self.by_number = {pr["number"]: pr for pr in self.pulls}
+        self._ascending_dates = [commit["date"].timestamp() for commit in reversed(self.commits)]
+        self._pull_orders: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def commit_window(self, since: Optional[datetime], until: Optional[datetime]) -> Tuple[int, int]:
+        """[start, stop) into ``commits`` of those dated within [since, until]"""
+        n = len(self.commits)
+        low = bisect_left(self._ascending_dates, since.timestamp()) if since else 0
+        high = bisect_right(self._ascending_dates, until.timestamp()) if until else n
+        return n - high, n - low
+
+    def pulls_ordered(self, state: str, sort: str, direction: str) -> List[Dict[str, Any]]:
+        key = (state, sort, direction)
+        with self._lock:
+            ordered = self._pull_orders.get(key)
+            if ordered is None:
+                field = "updated_at" if sort in ("updated", "long-running") else "created_at"
+                ordered = [pr for pr in self.pulls if state == "all" or pr["state"] == state]
+                ordered.sort(key=lambda pr: (pr[field], pr["number"]), reverse=direction != "asc")
+                self._pull_orders[key] = ordered
+        return ordered
+
+
+class SyntheticGitHub:
+    """Serves seeded synthetic repositories the way the GitHub API would"""
+
+    def __init__(self, n_commits: int = 10_000, repos: Tuple[str, ...] = ("bench/app",),
+                 seed: int = 7, days: int = 90):
+        self.repos = {name: _SyntheticRepo(name, n_commits, seed + i, days) for i, name in enumerate(repos)}
+
+    def handle(self, request: StandInRequest) -> Response:
+        if request.method == "POST" and request.path == "/graphql":
+            return self._graphql(request)
+        if request.method != "GET":
+            return _not_found()
+
+        parts = request.path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] in ("orgs", "users") and parts[2] == "repos":
+            repos = [self._repository(repo, request.base) for name, repo in sorted(self.repos.items())
+                     if name.split("/")[0] == parts[1]]
+            return self._paginate(request, repos, 0, len(repos))
+        if len(parts) < 3 or parts[0] != "repos":
+            return _not_found()
+        repo = self.repos.get(f"{parts[1]}/{parts[2]}")
+        if repo is None:
+            return _not_found()
+        if len(parts) == 3:
+            return _json(200, self._repository(repo, request.base))
+
+        resource, ident = parts[3], parts[4] if len(parts) == 5 else None
+        params = request.params
+        if resource == "commits" and ident is None:
+            start, stop = repo.commit_window(_parse_iso(params.get("since")), _parse_iso(params.get("until")))
+            return self._paginate(request, repo.commits, start, stop,
+                                  lambda c: self._commit(repo, c, request.base, detail=False))
+        if resource == "commits":
+            commit = repo.by_sha.get(ident)
+            return _json(200, self._commit(repo, commit, request.base, detail=True)) if commit else _not_found()
+        if resource == "pulls" and ident is None:
+            pulls = repo.pulls_ordered(params.get("state", "open"), params.get("sort", "created"),
+                                       params.get("direction", "desc"))
+            return self._paginate(request, pulls, 0, len(pulls),
+                                  lambda pr: self._pull(repo, pr, request.base, detail=False))
+        if resource == "pulls" and ident.isdigit():
+            pr = repo.by_number.get(int(ident))
+            return _json(200, self._pull(repo, pr, request.base, detail=True)) if pr else _not_found()
+        return _not_found()
+
+    @staticmethod
+    def _paginate(request: StandInRequest, items: List[Any], start: int, stop: int,
+                  render=None) -> Response:
+        """One page of items[start:stop] with GitHub's Link header"""
+        params = request.params
+        per_page = max(1, min(int(params.get("per_page", DEFAULT_PER_PAGE)), MAX_PER_PAGE))
+        page = max(1, int(params.get("page", 1)))
+        last = max(1, -(-(stop - start) // per_page))
+        first_item = start + (page - 1) * per_page
+        chunk = items[first_item:min(stop, first_item + per_page)]
+
+        def link(number: int, rel: str) -> str:
+            return f'<{request.base}{request.path}?{urlencode({**params, "per_page": per_page, "page": number})}>; rel="{rel}"'
+
+        links = []
+        if page > 1:
+            links.append(link(page - 1, "prev"))
+        if page < last:
+            links += [link(page + 1, "next"), link(last, "last")]
+        if page > 1:
+            links.append(link(1, "first"))
+        headers = {"Link": ", ".join(links)} if links else {}
+        return _json(200, [render(item) for item in chunk] if render else chunk, headers)
+
+    @staticmethod
+    def _user(login: str, base: str, kind: str = "User") -> Dict[str, Any]:
+        return {"login": login, "id": zlib.crc32(login.encode("utf-8")), "type": kind,
+                "url": f"{base}/users/{login}", "html_url": f"https://github.com/{login}"}
+
+    def _repository(self, repo: _SyntheticRepo, base: str) -> Dict[str, Any]:
+        owner, name = repo.full_name.split("/", 1)
+        return {
+            "id": zlib.crc32(repo.full_name.encode("utf-8")),
+            "name": name,
+            "full_name": repo.full_name,
+            "owner": self._user(owner, base, "Organization"),
+            "private": False,
+            "fork": False,
+            "archived": False,
+            "default_branch": "main",
+            "url": f"{base}/repos/{repo.full_name}",
+            "html_url": f"https://github.com/{repo.full_name}",
+        }
+
+    def _commit(self, repo: _SyntheticRepo, commit: Dict[str, Any], base: str, detail: bool) -> Dict[str, Any]:
+        login, sha = commit["author"], commit["sha"]
+        signature = {"name": login, "email": f"{login}@users.noreply.github.com", "date": _iso(commit["date"])}
+        payload = {
+            "sha": sha,
+            "url": f"{base}/repos/{repo.full_name}/commits/{sha}",
+            "html_url": f"https://github.com/{repo.full_name}/commit/{sha}",
+            "commit": {"message": commit["message"], "author": signature, "committer": signature},
+            "author": self._user(login, base),
+            "committer": self._user(login, base),
+            "parents": [],
+        }
+        if detail:
+            # Stats and files only come with the single-commit endpoint
+            additions, deletions = commit["additions"], commit["deletions"]
+            payload["stats"] = {"additions": additions, "deletions": deletions, "total": additions + deletions}
+            n_files = max(1, min(commit["files"], MAX_COMMIT_FILES))
+            payload["files"] = [{
+                "filename": f"src/module_{i}.py",
+                "status": "modified",
+                "additions": additions // n_files + (i < additions % n_files),
+                "deletions": deletions // n_files + (i < deletions % n_files),
+                "changes": 0,
+            } for i in range(n_files)]
+            for f in payload["files"]:
+                f["changes"] = f["additions"] + f["deletions"]
+        return payload
+
+    def _pull(self, repo: _SyntheticRepo, pr: Dict[str, Any], base: str, detail: bool) -> Dict[str, Any]:
+        closed_at = pr["merged_at"] or (pr["updated_at"] if pr["state"] == "closed" else None)
+        payload = {
+            "url": f"{base}/repos/{repo.full_name}/pulls/{pr['number']}",
+            "html_url": f"https://github.com/{repo.full_name}/pull/{pr['number']}",
+            "id": pr["number"],
+            "number": pr["number"],
+            "state": pr["state"],
+            "title": pr["title"],
+            "user": self._user(pr["author"], base),
+            "body": None,
+            "draft": False,
+            "created_at": _iso(pr["created_at"]),
+            "updated_at": _iso(pr["updated_at"]),
+            "closed_at": _iso(closed_at),
+            "merged_at": _iso(pr["merged_at"]),
+        }
+        if detail:
+            # Size and review counts only come with the single-PR endpoint
+            payload.update({
+                "merged": pr["merged_at"] is not None,
+                "comments": 0,
+                "review_comments": pr["review_comments"],
+                "additions": pr["additions"],
+                "deletions": pr["deletions"],
+                "changed_files": pr["changed_files"],
+            })
+        return payload
+
+    def _graphql(self, request: StandInRequest) -> Response:
+        """The harvester's HISTORY_QUERY and the rateLimit health probe"""
+        payload = json.loads(request.body or b"{}")
+        query, variables = payload.get("query", ""), payload.get("variables") or {}
+        data: Dict[str, Any] = {"rateLimit": {"cost": 1, "remaining": request.remaining}}
+        if "repository(" not in query:
+            return _json(200, {"data": data})
+
+        full_name = f"{variables.get('owner')}/{variables.get('name')}"
+        repo = self.repos.get(full_name)
+        if repo is None:
+            return _json(200, {"data": {"repository": None}, "errors": [{
+                "type": "NOT_FOUND", "message": f"Could not resolve to a Repository with the name '{full_name}'."
+            }]})
+
+        page_size = max(1, min(int(variables.get("pageSize") or MAX_PER_PAGE), MAX_PER_PAGE))
+        repository: Dict[str, Any] = {}
+        if variables.get("withCommits"):
+            start, stop = repo.commit_window(_parse_iso(variables.get("since")), _parse_iso(variables.get("until")))
+            offset = _offset(variables.get("commitCursor"))
+            nodes = repo.commits[start + offset:min(stop, start + offset + page_size)]
+            repository["defaultBranchRef"] = {"target": {"history": {
+                "pageInfo": {"hasNextPage": start + offset + len(nodes) < stop,
+                             "endCursor": _cursor(offset + len(nodes)) if nodes else None},
+                "nodes": [self._commit_node(commit) for commit in nodes],
+            }}}
+        if variables.get("withPulls"):
+            pulls = repo.pulls_ordered("all", "updated", "desc")
+            offset = _offset(variables.get("prCursor"))
+            nodes = pulls[offset:offset + page_size]
+            repository["pullRequests"] = {
+                "pageInfo": {"hasNextPage": offset + len(nodes) < len(pulls),
+                             "endCursor": _cursor(offset + len(nodes)) if nodes else None},
+                "nodes": [self._pull_node(pr) for pr in nodes],
+            }
+        data["repository"] = repository
+        return _json(200, {"data": data})
+
+    @staticmethod
+    def _commit_node(commit: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "oid": commit["sha"],
+            "message": commit["message"],
+            "additions": commit["additions"],
+            "deletions": commit["deletions"],
+            "changedFilesIfAvailable": commit["files"],
+            "author": {"date": _iso(commit["date"]), "user": {"login": commit["author"]}},
+        }
+
+    @staticmethod
+    def _pull_node(pr: Dict[str, Any]) -> Dict[str, Any]:
+        state = "MERGED" if pr["merged_at"] else pr["state"].upper()
+        reviews = [{"comments": {"totalCount": pr["review_comments"]}}] if pr["review_comments"] else []
+        return {
+            "number": pr["number"],
+            "title": pr["title"],
+            "state": state,
+            "createdAt": _iso(pr["created_at"]),
+            "updatedAt": _iso(pr["updated_at"]),
+            "mergedAt": _iso(pr["merged_at"]),
+            "additions": pr["additions"],
+            "deletions": pr["deletions"],
+            "changedFiles": pr["changed_files"],
+            "author": {"login": pr["author"]},
+            "reviews": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": reviews},
+        }
+
+
+# Query parameters and GraphQL variables that move with the clock; a replay
+# falls back to matching without them when the exact request was not recorded
+_VOLATILE = ("since", "until")
+
+
+def _match_keys(method: str, path: str, query: str, body: bytes) -> Tuple[str, str]:
+    """(exact, loose) cassette keys for a request"""
+    if method == "POST":
+        payload = json.loads(body or b"{}")
+        query_hash = hashlib.sha256(payload.get("query", "").encode("utf-8")).hexdigest()[:16]
+        variables = payload.get("variables") or {}
+        loose = {k: v for k, v in variables.items() if k not in _VOLATILE}
+        return (f"POST {path} {query_hash} {json.dumps(variables, sort_keys=True)}",
+                f"POST {path} {query_hash} {json.dumps(loose, sort_keys=True)}")
+    params = sorted(parse_qsl(query))
+    loose = [(k, v) for k, v in params if k not in _VOLATILE]
+    return f"{method} {path}?{urlencode(params)}", f"{method} {path}?{urlencode(loose)}"
+
+
+class CassetteRecorder:
+    """Proxies to the real API and records every interaction to a cassette file"""
+
+    def __init__(self, path: str, upstream: str = UPSTREAM_URL, token: Optional[str] = None):
+        import requests
+        self.path = path
+        self.upstream = upstream.rstrip("/")
+        self.token = token or os.getenv("GITHUB_TOKEN")
+        self.session = requests.Session()
+        self.interactions: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def handle(self, request: StandInRequest) -> Response:
+        url = f"{self.upstream}{request.path}" + (f"?{request.query}" if request.query else "")
+        headers = {"Accept": request.headers.get("Accept", "application/vnd.github+json")}
+        authorization = request.headers.get("Authorization") or (f"token {self.token}" if self.token else None)
+        if authorization:
+            headers["Authorization"] = authorization
+        if request.body:
+            headers["Content-Type"] = "application/json"
+        # Always the full payload: the stand-in does its own revalidation
+        upstream = self.session.request(request.method, url, data=request.body or None, headers=headers, timeout=60)
+        kept = {k: v for k, v in upstream.headers.items() if k.lower() in ("content-type", "link")}
+        with self._lock:
+            self.interactions.append({
+                "method": request.method,
+                "path": request.path,
+                "query": request.query,
+                "body": request.body.decode("utf-8") if request.body else None,
+                "status": upstream.status_code,
+                "headers": kept,
+                "response": upstream.text,
+            })
+        return _rebase(upstream.status_code, kept, upstream.text, self.upstream, request.base)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"recorded": len(self.interactions)}
+
+    def close(self):
+        with self._lock:
+            cassette = {"version": 1, "upstream": self.upstream, "interactions": self.interactions}
+        with open(self.path, "w") as f:
+            json.dump(cassette, f, indent=1)
+
+
+class CassetteReplay:
+    """Serves a recorded cassette; repeats of a request get its recordings in order, then the last one"""
+
+    def __init__(self, path: str):
+        with open(path) as f:
+            cassette = json.load(f)
+        self.upstream = cassette.get("upstream", UPSTREAM_URL)
+        self._exact: Dict[str, List[Dict[str, Any]]] = {}
+        self._loose: Dict[str, List[Dict[str, Any]]] = {}
+        for interaction in cassette["interactions"]:
+            body = (interaction.get("body") or "").encode("utf-8")
+            exact, loose = _match_keys(interaction["method"], interaction["path"], interaction.get("query", ""), body)
+            self._exact.setdefault(exact, []).append(interaction)
+            self._loose.setdefault(loose, []).append(interaction)
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.unmatched = 0
+
+    def handle(self, request: StandInRequest) -> Response:
+        exact, loose = _match_keys(request.method, request.path, request.query, request.body)
+        key, recorded = exact, self._exact.get(exact)
+        if recorded is None:
+            key, recorded = loose, self._loose.get(loose)
+        with self._lock:
+            if recorded is None:
+                self.unmatched += 1
+                return _not_found(f"No recorded interaction for {request.method} {request.path}")
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+        interaction = recorded[min(index, len(recorded) - 1)]
+        return _rebase(interaction["status"], interaction["headers"], interaction["response"],
+                       self.upstream, request.base)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"unmatched": self.unmatched}
+
+
+def _rebase(status: int, headers: Dict[str, str], text: str, upstream: str, base: str) -> Response:
+    """Point URLs in a recorded response at the stand-in, so clients keep paging through it"""
+    headers = {k: v.replace(upstream, base) for k, v in headers.items()}
+    return status, headers, text.replace(upstream, base).encode("utf-8")
+
+
+class _CountingStream:
+    """File wrapper counting the bytes that pass through it"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+
+    def read(self, *args):
+        data = self.stream.read(*args)
+        self.count += len(data)
+        return data
+
+    def readline(self, *args):
+        data = self.stream.readline(*args)
+        self.count += len(data)
+        return data
+
+    def write(self, data):
+        self.count += len(data)
+        return self.stream.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like api.github.com
+    server_version = "GitHubStandIn"
+    # Headers and body go out in separate writes; with Nagle on, each response waits on a delayed ACK
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.rfile = _CountingStream(self.rfile)
+        self.wfile = _CountingStream(self.wfile)
+
+    def handle_one_request(self):
+        bytes_in, bytes_out = self.rfile.count, self.wfile.count
+        self._route = None
+        super().handle_one_request()
+        if self._route is not None:
+            self.server.standin.record(self._route, self._status,
+                                       self.rfile.count - bytes_in, self.wfile.count - bytes_out)
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        path, _, query = self.path.partition("?")
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, headers, payload = self.server.standin.respond(self.command, path, query, dict(self.headers), body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(payload)
+        if not path.startswith("/_standin/"):
+            self._route, self._status = route(self.command, path), status
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class GitHubStandIn:
+    """Threaded local server answering GitHub API requests from a backend
+
+    The backend (SyntheticGitHub, CassetteReplay or CassetteRecorder) makes
+    the payloads; the server adds what every GitHub response has in
+    common: latency, ETags and 304s, and rate-limit accounting.
+    """
+
+    def __init__(self, backend, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, rate_limit: int = RATE_LIMIT, seed: int = 7):
+        self.backend = backend
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.standin = self
+        self._thread: Optional[threading.Thread] = None
+        self.reset()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment that points the app's GitHub clients at this server"""
+        return {"GITHUB_API_URL": self.url, "GITHUB_GRAPHQL_URL": f"{self.url}/graphql"}
+
+    def start(self) -> "GitHubStandIn":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="GitHubStandIn", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        close = getattr(self.backend, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> "GitHubStandIn":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset(self):
+        """Zero the counters and give every resource a full rate-limit window"""
+        with self._lock:
+            reset_at = int(time.time()) + RATE_WINDOW
+            self._rates = {resource: {"limit": self.rate_limit, "used": 0, "reset": reset_at}
+                           for resource in ("core", "graphql")}
+            self._routes: Dict[str, Dict[str, int]] = {}
+            self._statuses: Dict[str, int] = {}
+
+    def respond(self, method: str, path: str, query: str, headers: Dict[str, str], body: bytes) -> Response:
+        if path == "/_standin/stats":
+            return _json(200, self.stats())
+        if path == "/_standin/reset":
+            self.reset()
+            return _json(200, {"reset": True})
+
+        delay = self.latency_ms + (self._jitter() if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        resource = "graphql" if path == "/graphql" else "core"
+        if path == "/rate_limit":
+            # Free on GitHub too
+            return _json(200, self._rate_limit_payload(), self._rate_headers(resource))
+
+        with self._lock:
+            rate = self._rate(resource)
+            remaining = rate["limit"] - rate["used"]
+        if remaining <= 0:
+            return self._rate_limited(resource)
+
+        request = StandInRequest(method, path, query, body, headers, self.url, remaining - 1)
+        status, response_headers, payload = self.backend.handle(request)
+
+        if method == "GET" and status == 200:
+            etag = f'W/"{hashlib.sha1(payload).hexdigest()}"'
+            response_headers["ETag"] = etag
+            if_none_match = headers.get("If-None-Match")
+            if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+                # Conditional requests answered with 304 do not count against the limit
+                return 304, {**self._rate_headers(resource), "ETag": etag}, b""
+
+        with self._lock:
+            self._rate(resource)["used"] += 1
+        response_headers.setdefault("Content-Type", "application/json; charset=utf-8")
+        response_headers.update(self._rate_headers(resource))
+        return status, response_headers, payload
+
+    def _jitter(self) -> float:
+        with self._lock:
+            return self._random.uniform(0, self.jitter_ms)
+
+    def _rate(self, resource: str) -> Dict[str, int]:
+        """Caller holds the lock"""
+        rate = self._rates[resource]
+        if time.time() >= rate["reset"]:
+            rate["used"] = 0
+            rate["reset"] = int(time.time()) + RATE_WINDOW
+        return rate
+
+    def _rate_headers(self, resource: str) -> Dict[str, str]:
+        with self._lock:
+            rate = self._rate(resource)
+            return {
+                "X-RateLimit-Limit": str(rate["limit"]),
+                "X-RateLimit-Remaining": str(max(0, rate["limit"] - rate["used"])),
+                "X-RateLimit-Reset": str(rate["reset"]),
+                "X-RateLimit-Used": str(rate["used"]),
+                "X-RateLimit-Resource": resource,
+            }
+
+    def _rate_limit_payload(self) -> Dict[str, Any]:
+        with self._lock:
+            resources = {}
+            for resource in self._rates:
+                rate = self._rate(resource)
+                resources[resource] = {"limit": rate["limit"], "used": rate["used"],
+                                       "remaining": max(0, rate["limit"] - rate["used"]), "reset": rate["reset"]}
+        return {"resources": resources, "rate": resources["core"]}
+
+    def _rate_limited(self, resource: str) -> Response:
+        message = "API rate limit exceeded for user ID 1."
+        if resource == "graphql":
+            return _json(200, {"errors": [{"type": "RATE_LIMITED", "message": message}]},
+                         self._rate_headers(resource))
+        return _json(403, {"message": message, "documentation_url": DOCS_URL}, self._rate_headers(resource))
+
+    def record(self, name: str, status: int, bytes_in: int, bytes_out: int):
+        with self._lock:
+            counts = self._routes.setdefault(name, {"calls": 0, "not_modified": 0, "errors": 0,
+                                                    "bytes_in": 0, "bytes_out": 0})
+            counts["calls"] += 1
+            counts["not_modified"] += status == 304
+            counts["errors"] += status >= 400
+            counts["bytes_in"] += bytes_in
+            counts["bytes_out"] += bytes_out
+            self._statuses[str(status)] = self._statuses.get(str(status), 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests, statuses and wire bytes, in total and per route, plus rate-limit usage"""
+        with self._lock:
+            routes = {name: dict(counts) for name, counts in sorted(self._routes.items())}
+            statuses = dict(self._statuses)
+            rate_used = {resource: rate["used"] for resource, rate in self._rates.items()}
+        stats = {
+            "requests": sum(c["calls"] for c in routes.values()),
+            "not_modified": sum(c["not_modified"] for c in routes.values()),
+            "bytes_in": sum(c["bytes_in"] for c in routes.values()),
+            "bytes_out": sum(c["bytes_out"] for c in routes.values()),
+            "statuses": statuses,
+            "rate_limit_used": rate_used,
+            "routes": routes,
+        }
+        backend_stats = getattr(self.backend, "stats", None)
+        if backend_stats is not None:
+            stats.update(backend_stats())
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--synthesize", type=int, metavar="COMMITS", help="serve synthetic repos of this many commits")
+    source.add_argument("--replay", metavar="CASSETTE", help="serve a recorded cassette")
+    source.add_argument("--record", metavar="CASSETTE", help="proxy to --upstream and record to this file")
+    parser.add_argument("--repos", nargs="+", default=["bench/app"], help="synthetic repos to serve")
+    parser.add_argument("--days", type=int, default=90, help="synthetic history starts 2024-01-01 and spans this")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--upstream", default=UPSTREAM_URL)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=RATE_LIMIT, help="requests per hour per resource")
+    args = parser.parse_args()
+
+    if args.synthesize:
+        backend = SyntheticGitHub(args.synthesize, tuple(args.repos), args.seed, args.days)
+    elif args.replay:
+        backend = CassetteReplay(args.replay)
+    else:
+        backend = CassetteRecorder(args.record, args.upstream)
+    standin = GitHubStandIn(backend, args.host, args.port, args.latency_ms, args.jitter_ms,
+                            args.rate_limit, args.seed)
+    for name, value in standin.env().items():
+        print(f"{name}={value}")
+    standin.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.stop()
+        print(json.dumps(standin.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
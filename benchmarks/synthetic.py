@@ -0,0 +1,101 @@
+# benchmarks/synthetic.py
+"""Seeded synthetic commits and pull requests for the benchmarks
+
+Shapes follow what real repositories look like rather than uniform noise:
+
+- authors are Zipf-skewed, so a few developers make most of the commits;
+- commits land on weekdays in working hours, more on Tue-Thu;
+- churn is log-normal with deletions correlated to additions, plus a thin
+  tail of bulk changes (vendoring, renames) that trip the anomaly detector;
+- PR cycle times are log-normal (median about a day), most PRs merge.
+
+The same seed and size always produce the same tables.
+"""
+from typing import Optional, Tuple
+import numpy as np
+from src.data.columnar import CommitTable, PullRequestTable, _StringPool
+
+MESSAGES = [
+    "Fix flaky test", "Refactor handler", "Add endpoint", "Bump dependencies",
+    "Update docs", "Tune query", "Handle empty input", "Remove dead code",
+]
+COMMITS_PER_PR = 4
+BULK_CHANGE_RATE = 0.005
+# Relative commit volume Monday..Sunday
+WEEKDAY_WEIGHTS = np.array([0.9, 1.1, 1.15, 1.1, 0.75, 0.05, 0.05])
+
+
+def default_authors(n_commits: int) -> int:
+    """Team size grows with history, but far slower than the commit count"""
+    return int(np.clip(np.sqrt(n_commits) * 2, 10, 2000))
+
+
+def _timestamps(rng: np.random.Generator, n: int, start: np.datetime64, days: int) -> np.ndarray:
+    day_weights = np.resize(WEEKDAY_WEIGHTS, days)
+    day = rng.choice(days, n, p=day_weights / day_weights.sum())
+    # Working hours around mid-afternoon UTC, spilling into the evening
+    seconds = np.clip(rng.normal(14 * 3600, 3 * 3600, n), 0, 86399).astype(np.int64)
+    return start + (day * 86400 + seconds).astype("timedelta64[s]")
+
+
+def synthetic_tables(n_commits: int, n_authors: Optional[int] = None, n_repos: int = 1,
+                     seed: int = 7, days: int = 90) -> Tuple[CommitTable, PullRequestTable]:
+    """``n_commits`` commits and ``n_commits / COMMITS_PER_PR`` PRs over ``days`` days from 2024-01-01"""
+    rng = np.random.default_rng(seed)
+    n_authors = n_authors or default_authors(n_commits)
+    authors = _StringPool([f"dev{i}" for i in range(n_authors)])
+    repos = _StringPool([f"org/repo{i}" for i in range(n_repos)])
+    start = np.datetime64("2024-01-01T00:00:00", "us")
+
+    commits = np.empty(n_commits, dtype=CommitTable.dtype())
+    commits["sha"] = np.array([f"{seed:08x}{i:032x}" for i in range(n_commits)], dtype=object)
+    commits["message"] = np.array(MESSAGES, dtype=object)[rng.integers(0, len(MESSAGES), n_commits)]
+    commits["author"] = np.minimum(rng.zipf(1.6, n_commits) - 1, n_authors - 1).astype(np.int32)
+    commits["date"] = _timestamps(rng, n_commits, start, days)
+    additions = rng.lognormal(3, 1.4, n_commits)
+    deletions = additions * rng.beta(2, 3, n_commits)
+    files = rng.geometric(0.3, n_commits)
+    bulk = rng.random(n_commits) < BULK_CHANGE_RATE
+    additions[bulk] *= rng.uniform(20, 200, bulk.sum())
+    files[bulk] += rng.integers(50, 500, bulk.sum())
+    commits["additions"] = additions.astype(np.int64)
+    commits["deletions"] = deletions.astype(np.int64)
+    commits["total"] = commits["additions"] + commits["deletions"]
+    commits["files"] = files
+    commits["repo"] = rng.integers(0, n_repos, n_commits).astype(np.int32)
+
+    n_prs = max(1, n_commits // COMMITS_PER_PR)
+    prs = np.empty(n_prs, dtype=PullRequestTable.dtype())
+    prs["number"] = np.arange(1, n_prs + 1)
+    prs["title"] = np.array(MESSAGES, dtype=object)[rng.integers(0, len(MESSAGES), n_prs)]
+    prs["author"] = np.minimum(rng.zipf(1.6, n_prs) - 1, n_authors - 1).astype(np.int32)
+    prs["created_at"] = _timestamps(rng, n_prs, start, days)
+    cycle = (rng.lognormal(np.log(24), 1.1, n_prs) * 3600).astype("timedelta64[s]")
+    merged = rng.random(n_prs) < 0.85
+    prs["merged_at"] = np.where(merged, prs["created_at"] + cycle, np.datetime64("NaT", "us"))
+    prs["updated_at"] = np.where(merged, prs["merged_at"], prs["created_at"] + cycle)
+    prs["state"] = np.where(merged | (rng.random(n_prs) < 0.5), "closed", "open").astype(object)
+    pr_additions = rng.lognormal(4, 1.4, n_prs).astype(np.int64)
+    prs["additions"] = pr_additions
+    prs["deletions"] = (pr_additions * rng.beta(2, 3, n_prs)).astype(np.int64)
+    prs["changed_files"] = rng.geometric(0.15, n_prs)
+    prs["review_comments"] = rng.poisson(3, n_prs)
+    prs["repo"] = rng.integers(0, n_repos, n_prs).astype(np.int32)
+
+    return CommitTable(commits, authors, repos), PullRequestTable(prs, authors, repos)
+
+
+def synthetic_trend(n_points: int, seed: int = 7):
+    """Daily metrics snapshots shaped like get_metrics_trend rows"""
+    rng = np.random.default_rng(seed)
+    timestamps = np.datetime64("2024-01-01T06:00:00", "s") + np.arange(n_points) * np.timedelta64(1, "D")
+    deployments = np.maximum(0, rng.normal(3, 1, n_points))
+    lead_time = rng.lognormal(np.log(24), 0.4, n_points)
+    churn = rng.lognormal(8, 0.5, n_points)
+    return [{
+        "timestamp": timestamps[i].astype(object),
+        "deployment_frequency": float(deployments[i]),
+        "lead_time_hours": float(lead_time[i]),
+        "total_churn": float(churn[i]),
+        "churn_rate": float(churn[i] / 1000),
+    } for i in range(n_points)]
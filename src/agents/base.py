@@ -1,15 +1,24 @@
 # src/agents/base.py
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Any, Optional
 import logging
-from langchain.schema import HumanMessage, SystemMessage
-from src.llm.geminiwrapper import GeminiLLM
+from src.clients import ClientRegistry, get_client_registry
+
+if TYPE_CHECKING:
+    from src.llm.geminiwrapper import GeminiLLM
 
 class BaseAgent(ABC):
-    def __init__(self, name: str):
+    def __init__(self, name: str, clients: Optional[ClientRegistry] = None):
         self.name = name
-        self.llm = GeminiLLM(temperature=0.3)
         self.logger = logging.getLogger(name)
+        # Shared, long-lived clients; agents never build their own
+        self.clients = clients or get_client_registry()
+    
+    @cached_property
+    def llm(self) -> "GeminiLLM":
+        """Shared model handle, built on first use: langchain and the Gemini SDK dominate cold start"""
+        return self.clients.get("llm")
         
     @abstractmethod
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -1,68 +1,121 @@
-from typing import Dict, Any
-from datetime import datetime, timedelta
-from github import Github
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import cached_property
+import multiprocessing
 import os
 from src.agents.base import BaseAgent
+from src.clients import ClientRegistry
+from src.data.columnar import ColumnarTable, CommitTable, PullRequestTable
+from src.metrics.time_range import resolve_time_range
+
+if TYPE_CHECKING:
+    from src.data.harvest import RepoHarvester
+
+
+def _by_login(table: ColumnarTable, login: str) -> ColumnarTable:
+    """Rows authored by a GitHub login; logins are case-insensitive"""
+    login = login.lower()
+    match = next((author for author in table.authors.values if author.lower() == login), login)
+    return table.by_author(match)
+
 
 class DataHarvesterAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("DataHarvester")
-        self.github = Github(os.getenv("GITHUB_TOKEN"))
+    def __init__(self, clients: Optional[ClientRegistry] = None):
+        super().__init__("DataHarvester", clients)
         self.owner = os.getenv("GITHUB_OWNER")
         self.repo_name = os.getenv("GITHUB_REPO")
-        
+        # Multi-repo mode: an explicit "owner/name,owner/name" list or a whole org
+        self.repos = [r.strip() for r in os.getenv("GITHUB_REPOS", "").split(",") if r.strip()]
+        self.org = os.getenv("GITHUB_ORG")
+        self.processes = int(os.getenv("HARVEST_PROCESSES", str(os.cpu_count() or 1)))
+
+    @cached_property
+    def harvester(self) -> Optional["RepoHarvester"]:
+        """Single-repo harvester, built on first use along with its GitHub clients and store"""
+        if self.multi_repo:
+            return None
+        from src.data.harvest import RepoHarvester
+        return RepoHarvester.shared(f"{self.owner}/{self.repo_name}", self.clients)
+
+    @property
+    def multi_repo(self) -> bool:
+        return bool(self.repos or self.org)
+
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Fetch GitHub data based on time range"""
         try:
-            repo = self.github.get_repo(f"{self.owner}/{self.repo_name}")
-            
-            # Calculate date range
-            end_date = datetime.now()
-            if state["time_range"] == "daily":
-                start_date = end_date - timedelta(days=1)
-            elif state["time_range"] == "weekly":
-                start_date = end_date - timedelta(days=7)
-            else:  # monthly
-                start_date = end_date - timedelta(days=30)
-            
-            # Fetch commits
-            commits = []
-            for commit in repo.get_commits(since=start_date, until=end_date):
-                commits.append({
-                    "sha": commit.sha,
-                    "author": commit.author.login if commit.author else "unknown",
-                    "message": commit.commit.message,
-                    "date": commit.commit.author.date,
-                    "additions": commit.stats.additions,
-                    "deletions": commit.stats.deletions,
-                    "total": commit.stats.total,
-                    "files": len(commit.files)
-                })
-            
-            # Fetch pull requests
-            pull_requests = []
-            for pr in repo.get_pulls(state="all", sort="updated", direction="desc"):
-                if pr.created_at >= start_date:
-                    pull_requests.append({
-                        "number": pr.number,
-                        "title": pr.title,
-                        "author": pr.user.login,
-                        "state": pr.state,
-                        "created_at": pr.created_at,
-                        "merged_at": pr.merged_at,
-                        "additions": pr.additions,
-                        "deletions": pr.deletions,
-                        "changed_files": pr.changed_files,
-                        "review_comments": pr.review_comments
-                    })
-            
-            state["commits"] = commits
-            state["pull_requests"] = pull_requests
-            
-            self.logger.info(f"Harvested {len(commits)} commits and {len(pull_requests)} PRs")
-            
+            # Calculate date range: named windows, "last_90_days", "Q3", "2024-07-01..2024-09-30"
+            start_date, end_date = resolve_time_range(state["time_range"])
+
+            if self.multi_repo:
+                self._harvest_sharded(state, start_date, end_date)
+            else:
+                commits, pull_requests = self.harvester.harvest(start_date, end_date)
+                state["commits"] = CommitTable.from_records(commits)
+                state["pull_requests"] = PullRequestTable.from_records(pull_requests)
+
+            if state.get("target_user"):
+                # Per-developer report: every later step sees only their commits and PRs
+                state["commits"] = _by_login(state["commits"], state["target_user"])
+                state["pull_requests"] = _by_login(state["pull_requests"], state["target_user"])
+                # Shard metrics cover the whole team
+                state.pop("repo_metrics", None)
+
+            self.logger.info(
+                f"Harvested {len(state['commits'])} commits and {len(state['pull_requests'])} PRs"
+            )
+
         except Exception as e:
             state["errors"].append(f"Data harvesting error: {str(e)}")
             self.logger.error(f"Error in data harvesting: {e}")
-            
-        return state
\ No newline at end of file
+
+        return state
+
+    def developer_activity(self, time_range: str) -> Dict[str, Dict[str, Any]]:
+        """Per-developer totals for any time range, read from the stored daily rollups
+
+        No GitHub calls: the answer reflects the store as of the last harvest,
+        which keeps the rollups current for every repo it syncs.
+        """
+        start_date, end_date = resolve_time_range(time_range)
+        repos = self._resolve_repos() if self.multi_repo else [self.harvester.full_name]
+        return self.clients.get("db").developer_window(repos, start_date, end_date)
+
+    def _resolve_repos(self) -> List[str]:
+        """Explicit repo list, or every non-archived source repo of the org"""
+        if self.repos:
+            return self.repos
+        org = self.clients.get("github").get_organization(self.org)
+        return sorted(repo.full_name for repo in org.get_repos(type="sources") if not repo.archived)
+
+    def _harvest_sharded(self, state: Dict[str, Any], start_date: datetime, end_date: datetime):
+        """Harvest every repo in a worker process and merge the shards into one state
+
+        One task per repo lets the pool balance load, so the report waits on the
+        slowest repo rather than the sum of all of them. Workers are spawned, not
+        forked, so they do not inherit this process's DB and HTTP connections.
+        """
+        from src.data.harvest import harvest_repo_shard
+        repos = self._resolve_repos()
+        workers = max(1, min(self.processes, len(repos)))
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            shards = list(pool.map(
+                harvest_repo_shard, repos, [start_date] * len(repos), [end_date] * len(repos)
+            ))
+
+        commits, pull_requests, repo_metrics = [], [], {}
+        for shard in shards:
+            if shard["error"]:
+                state["errors"].append(f"Data harvesting error ({shard['repo']}): {shard['error']}")
+                continue
+            commits.append(shard["commits"])
+            pull_requests.append(shard["pull_requests"])
+            repo_metrics[shard["repo"]] = shard["metrics"]
+
+        # Shards come back in repo order; keep the merged tables in a fixed order too
+        state["repos"] = repos
+        state["commits"] = CommitTable.concat(commits).sort_by("date", "repo", "sha", descending=True)
+        state["pull_requests"] = PullRequestTable.concat(pull_requests)
+        state["repo_metrics"] = repo_metrics
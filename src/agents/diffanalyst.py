@@ -1,151 +1,121 @@
 # src/agents/diff_analyst.py
-from typing import Dict, Any, List
-from collections import defaultdict
-import numpy as np
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Union
+import os
 from src.agents.base import BaseAgent
+from src.clients import ClientRegistry
+from src.data.columnar import CommitTable, PullRequestTable
+from src.metrics.anomaly import AnomalyDetector
+from src.metrics.engine import MetricsEngine
+
+if TYPE_CHECKING:
+    from src.storage.database import DatabaseManager
+
+CommitRows = Union[CommitTable, List[Dict]]
+PullRequestRows = Union[PullRequestTable, List[Dict]]
 
 class DiffAnalystAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("DiffAnalyst")
+    def __init__(self, clients: Optional[ClientRegistry] = None):
+        super().__init__("DiffAnalyst", clients)
+        self.detectors: Dict[str, AnomalyDetector] = {}
+    
+    @cached_property
+    def db(self) -> "DatabaseManager":
+        return self.clients.get("db")
         
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze code changes and detect patterns"""
+        state.update(self.analyze_metrics(state))
+        if "metrics" in state:
+            state.update(self.analyze_code(state))
+        return state
+    
+    def analyze_metrics(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Metrics and anomalies; no LLM call, so downstream work can start early"""
         try:
-            commits = state.get("commits", [])
-            prs = state.get("pull_requests", [])
+            commits = CommitTable.from_records(state.get("commits", []))
+            prs = PullRequestTable.from_records(state.get("pull_requests", []))
             
             # Calculate metrics
             metrics = self._calculate_metrics(commits, prs)
             
+            # Fold in DORA/code-health figures computed per repo by the harvest shards
+            for repo, shard_metrics in state.get("repo_metrics", {}).items():
+                metrics["repo_metrics"].setdefault(repo, {}).update(shard_metrics)
+            
             # Detect anomalies
-            anomalies = self._detect_anomalies(commits, metrics)
+            # An @user run sees one developer's commits; it must not move the team's baselines
+            anomalies = self._detect_anomalies(commits, metrics, self._anomaly_scope(state),
+                                               persist=not state.get("target_user"))
             
+            return {"metrics": metrics, "anomalies": anomalies}
+            
+        except Exception as e:
+            state["errors"].append(f"Diff analysis error: {str(e)}")
+            self.logger.error(f"Error in diff analysis: {e}")
+            return {}
+    
+    def analyze_code(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM insights on the computed metrics and anomalies"""
+        try:
             # Generate analysis prompt for LLM
-            analysis_prompt = self._create_analysis_prompt(metrics, anomalies)
+            analysis_prompt = self._create_analysis_prompt(state["metrics"], state.get("anomalies", []))
             
             # Get LLM insights on the patterns
             llm_analysis = self.llm.invoke(analysis_prompt)
             
-            # Update state
-            state["metrics"] = metrics
-            state["anomalies"] = anomalies
-            state["code_analysis"] = llm_analysis
-            
             self.log_conversation(analysis_prompt, llm_analysis)
+            return {"code_analysis": llm_analysis}
             
         except Exception as e:
             state["errors"].append(f"Diff analysis error: {str(e)}")
             self.logger.error(f"Error in diff analysis: {e}")
-            
-        return state
+            return {}
     
-    def _calculate_metrics(self, commits: List[Dict], prs: List[Dict]) -> Dict[str, Any]:
+    def _calculate_metrics(self, commits: CommitRows, prs: PullRequestRows) -> Dict[str, Any]:
         """Calculate DORA and churn metrics"""
-        
-        # Developer metrics
-        dev_metrics = defaultdict(lambda: {
-            "commits": 0,
-            "additions": 0,
-            "deletions": 0,
-            "files_touched": 0,
-            "prs_created": 0,
-            "prs_merged": 0
-        })
-        
-        # Aggregate commit data
-        for commit in commits:
-            author = commit.get("author", "unknown")
-            dev_metrics[author]["commits"] += 1
-            dev_metrics[author]["additions"] += commit.get("additions", 0)
-            dev_metrics[author]["deletions"] += commit.get("deletions", 0)
-            dev_metrics[author]["files_touched"] += commit.get("files", 0)
-        
-        # Aggregate PR data
-        merged_prs = [pr for pr in prs if pr.get("merged_at")]
-        
-        for pr in prs:
-            author = pr.get("author", "unknown")
-            dev_metrics[author]["prs_created"] += 1
-            if pr.get("merged_at"):
-                dev_metrics[author]["prs_merged"] += 1
-        
-        # Calculate team-level metrics
-        total_commits = len(commits)
-        total_additions = sum(c.get("additions", 0) for c in commits)
-        total_deletions = sum(c.get("deletions", 0) for c in commits)
-        
-        # Calculate cycle time for merged PRs
-        cycle_times = []
-        for pr in merged_prs:
-            created = pr.get("created_at")
-            merged = pr.get("merged_at")
-            if created and merged:
-                cycle_time = (merged - created).total_seconds() / 3600  # hours
-                cycle_times.append(cycle_time)
-        
-        avg_cycle_time = np.mean(cycle_times) if cycle_times else 0
-        
-        # Code churn calculation
-        code_churn = total_additions + total_deletions
-        churn_rate = code_churn / total_commits if total_commits > 0 else 0
-        
-        return {
-            "developer_metrics": dict(dev_metrics),
-            "team_metrics": {
-                "total_commits": total_commits,
-                "total_prs": len(prs),
-                "merged_prs": len(merged_prs),
-                "total_additions": total_additions,
-                "total_deletions": total_deletions,
-                "code_churn": code_churn,
-                "churn_rate": churn_rate,
-                "avg_cycle_time_hours": avg_cycle_time,
-                "deployment_frequency": len(merged_prs),  # Simplified for MVP
-            },
-            "dora_metrics": {
-                "deployment_frequency": len(merged_prs),
-                "lead_time_hours": avg_cycle_time,
-                "change_failure_rate": 0,  # Would need CI/CD data
-                "mttr_hours": 0  # Would need incident data
-            }
-        }
+        # Team, developer, repo, DORA and code-health figures in one pass
+        return MetricsEngine.compute(commits, prs)
     
-    def _detect_anomalies(self, commits: List[Dict], metrics: Dict) -> List[Dict]:
-        """Detect unusual patterns in code changes"""
-        anomalies = []
-        
-        # High churn detection
-        churn_values = [c.get("additions", 0) + c.get("deletions", 0) for c in commits]
-        if churn_values:
-            mean_churn = np.mean(churn_values)
-            std_churn = np.std(churn_values)
-            threshold = mean_churn + 2 * std_churn  # 2 standard deviations
-            
-            for commit in commits:
-                churn = commit.get("additions", 0) + commit.get("deletions", 0)
-                if churn > threshold:
-                    anomalies.append({
-                        "type": "high_churn",
-                        "commit": commit.get("sha", "")[:7],
-                        "author": commit.get("author", "unknown"),
-                        "churn": churn,
-                        "message": f"High code churn detected: {churn} lines changed",
-                        "risk_level": "high"
-                    })
-        
-        # Large file changes
-        for commit in commits:
-            if commit.get("files", 0) > 20:
-                anomalies.append({
-                    "type": "many_files_changed",
-                    "commit": commit.get("sha", "")[:7],
-                    "author": commit.get("author", "unknown"),
-                    "files": commit.get("files", 0),
-                    "message": f"Many files changed in single commit: {commit.get('files', 0)} files",
-                    "risk_level": "medium"
-                })
+    def _detect_anomalies(self, commits: CommitRows, metrics: Dict, scope: str = "default",
+                          persist: bool = True) -> List[Dict]:
+        """Detect unusual patterns in code changes
         
-        return anomalies
+        Without ``persist`` the commits are scored on a copy of the scope's
+        detector, so neither its saved nor its in-memory state changes.
+        """
+        commits = CommitTable.from_records(commits)
+        detector = self._get_detector(scope)
+        if not persist:
+            detector = AnomalyDetector.from_dict(detector.to_dict())
+        
+        # Only commits the detector has not seen cost anything; earlier ones
+        # were scored (against the baselines of their time) in previous runs,
+        # and ones older than its horizon are scored without updating it
+        new_anomalies = detector.update(commits)
+        if new_anomalies:
+            self.logger.info(f"Flagged {len(new_anomalies)} new anomalies")
+        if persist:
+            self.db.save_anomaly_state(scope, detector.to_dict())
+        
+        return detector.anomalies_for(commits)
+    
+    def _get_detector(self, scope: str) -> AnomalyDetector:
+        """Detector for a scope, resumed from its persisted state"""
+        detector = self.detectors.get(scope)
+        if detector is None:
+            saved = self.db.load_anomaly_state(scope)
+            detector = AnomalyDetector.from_dict(saved) if saved else AnomalyDetector()
+            self.detectors[scope] = detector
+        return detector
+    
+    @staticmethod
+    def _anomaly_scope(state: Dict[str, Any]) -> str:
+        """Baselines are kept per harvested repo set"""
+        repos = state.get("repos") or []
+        if repos:
+            return ",".join(sorted(repos))
+        return f"{os.getenv('GITHUB_OWNER')}/{os.getenv('GITHUB_REPO')}"
     
     def _create_analysis_prompt(self, metrics: Dict, anomalies: List[Dict]) -> str:
         """Create prompt for LLM analysis"""
@@ -1,50 +1,116 @@
-from typing import Dict, Any, List
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 from datetime import datetime
 from src.agents.base import BaseAgent
-from src.visualization.charts import ChartGenerator
-from src.storage.database import DatabaseManager
-import base64
+from src.clients import ClientRegistry
+from src.llm.streaming import get_chunk_handler
+from src.visualization.renderer import chart_spec
+
+if TYPE_CHECKING:
+    from src.storage.database import DatabaseManager
 
 class InsightNarratorAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("InsightNarrator")
-        self.chart_generator = ChartGenerator()
-        self.db = DatabaseManager()
+    def __init__(self, clients: Optional[ClientRegistry] = None):
+        super().__init__("InsightNarrator", clients)
+    
+    @cached_property
+    def db(self) -> "DatabaseManager":
+        return self.clients.get("db")
         
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generate narrative insights and visualizations"""
+        # Serial equivalent of the workflow's fan-out; each step only reads
+        # metrics, anomalies and code_analysis, plus the trend for its chart
+        state.update(self.narrate(state))
+        state.update(self.build_charts(state))
+        state.update(self.query_trends(state))
+        state.update(self.build_trend_chart(state))
+        state.update(self.persist_metrics(state))
+        state.update(self.summarize(state))
+        return state
+    
+    def narrate(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM narrative over the analyst's findings"""
         try:
-            metrics = state.get("metrics", {})
-            anomalies = state.get("anomalies", [])
-            code_analysis = state.get("code_analysis", "")
-            
-            # Generate narrative
             narrative_prompt = self._create_narrative_prompt(
-                metrics, anomalies, code_analysis, state.get("time_range", "weekly")
+                state.get("metrics", {}), state.get("anomalies", []),
+                state.get("code_analysis", ""), state.get("time_range", "weekly")
             )
             
-            narrative = self.llm.invoke(narrative_prompt)
+            handler = get_chunk_handler(state.get("run_id"))
+            if handler is None:
+                narrative = self.llm.invoke(narrative_prompt)
+            else:
+                # Forward chunks as Gemini produces them
+                chunks = []
+                for chunk in self.llm.stream(narrative_prompt):
+                    chunks.append(chunk)
+                    handler(chunk)
+                narrative = "".join(chunks)
             
             # Log conversation
             self.log_conversation(narrative_prompt, narrative)
             self.db.save_conversation(self.name, narrative_prompt, narrative)
-            
-            # Generate charts
-            charts = self._generate_charts(metrics)
-            
-            # Save metrics to database
-            self.db.save_metrics(metrics, state.get("time_range", "weekly"))
-            
-            # Update state
-            state["narrative"] = narrative
-            state["charts"] = charts
-            state["summary"] = self._create_executive_summary(metrics, anomalies)
+            return {"narrative": narrative}
             
         except Exception as e:
             state["errors"].append(f"Insight generation error: {str(e)}")
             self.logger.error(f"Error in insight generation: {e}")
-            
-        return state
+            return {}
+    
+    def build_charts(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Specs for the charts that depend on this run's metrics only"""
+        return {"charts": self._generate_charts(state.get("metrics", {}))}
+    
+    def persist_metrics(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Save this run's metrics snapshot; @user runs are not team snapshots and are not saved"""
+        if state.get("target_user"):
+            return {}
+        try:
+            self.db.save_metrics(state.get("metrics", {}), state.get("time_range", "weekly"))
+        except Exception as e:
+            state["errors"].append(f"Insight generation error: {str(e)}")
+            self.logger.error(f"Error saving metrics: {e}")
+        return {}
+    
+    def query_trends(self, state: Dict[str, Any], limit: int = 10) -> Dict[str, Any]:
+        """Recent snapshots of the same report type plus this run's point
+        
+        Only snapshots taken before the run started are read, so the result
+        does not depend on whether persist_metrics has committed yet. The
+        snapshots are the team's, so an @user run gets no trend.
+        """
+        if state.get("target_user"):
+            return {"trend": []}
+        try:
+            started = state.get("timestamp") or datetime.utcnow()
+            trend = self.db.get_metrics_trend(
+                limit - 1, time_range=state.get("time_range", "weekly"), before=started
+            )
+            metrics = state.get("metrics", {})
+            if metrics.get("dora_metrics"):
+                trend.append({
+                    'timestamp': started,
+                    'deployment_frequency': metrics['dora_metrics']['deployment_frequency'],
+                    'lead_time_hours': metrics['dora_metrics']['lead_time_hours'],
+                    'total_churn': metrics['team_metrics']['code_churn'],
+                    'churn_rate': metrics['team_metrics']['churn_rate']
+                })
+            return {"trend": trend}
+        except Exception as e:
+            self.logger.error(f"Trend query error: {e}")
+            return {"trend": []}
+    
+    def build_trend_chart(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Append the historical trend chart spec, once there are two points"""
+        trend = state.get("trend", [])
+        charts = list(state.get("charts", []))
+        if len(trend) > 1:
+            charts.append(chart_spec('trends', 'Performance Trends', trend))
+        return {"charts": charts}
+    
+    def summarize(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {"summary": self._create_executive_summary(state.get("metrics", {}), state.get("anomalies", []))}
     
     def _create_narrative_prompt(self, metrics: Dict, anomalies: List, 
                                 code_analysis: str, time_range: str) -> str:
@@ -77,50 +143,18 @@ class InsightNarratorAgent(BaseAgent):
         """
     
     def _generate_charts(self, metrics: Dict) -> List[Dict[str, Any]]:
-        """Generate visualization charts"""
+        """Generate visualization chart specs; images are rendered on demand"""
         charts = []
         
-        try:
-            # Developer activity chart
-            if metrics.get('developer_metrics'):
-                dev_chart = self.chart_generator.create_developer_activity_chart(
-                    metrics['developer_metrics']
-                )
-                charts.append({
-                    'type': 'developer_activity',
-                    'data': base64.b64encode(dev_chart).decode('utf-8'),
-                    'title': 'Developer Activity Overview'
-                })
-            
-            # Code health chart
-            if metrics.get('team_metrics'):
-                health_chart = self.chart_generator.create_code_health_chart(
-                    metrics['team_metrics']
-                )
-                charts.append({
-                    'type': 'code_health',
-                    'data': base64.b64encode(health_chart).decode('utf-8'),
-                    'title': 'Code Health Score'
-                })
-            
-            # Historical trend chart (if available)
-            historical = self.db.session.query(DatabaseManager.MetricsSnapshot).all()
-            if len(historical) > 1:
-                trend_data = [{
-                    'timestamp': h.timestamp,
-                    'deployment_frequency': h.deployment_frequency,
-                    'lead_time_hours': h.lead_time_hours
-                } for h in historical[-10:]]  
-                
-                trend_chart = self.chart_generator.create_trend_chart(trend_data)
-                charts.append({
-                    'type': 'trends',
-                    'data': base64.b64encode(trend_chart).decode('utf-8'),
-                    'title': 'Performance Trends'
-                })
-                
-        except Exception as e:
-            self.logger.error(f"Chart generation error: {e}")
+        # Developer activity chart
+        if metrics.get('developer_metrics'):
+            charts.append(chart_spec(
+                'developer_activity', 'Developer Activity Overview', metrics['developer_metrics']
+            ))
+        
+        # Code health chart
+        if metrics.get('team_metrics'):
+            charts.append(chart_spec('code_health', 'Code Health Score', metrics['team_metrics']))
             
         return charts
     
@@ -0,0 +1,147 @@
+# src/bot/jobs.py
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+import asyncio
+import logging
+import os
+import time
+
+if TYPE_CHECKING:
+    from src.bot.reports import ReportCache
+
+# Report requests are identified by what they compute, not by who asked
+ReportKey = Tuple[str, str, Optional[str]]  # (command, time_range, target_user)
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 20
+
+
+class QueueFull(Exception):
+    """Raised by ``ReportQueue.submit`` when no more reports can be queued"""
+
+
+class ReportQueue:
+    """Bounded queue of workflow runs with single-flight deduplication
+
+    ``submit`` never blocks: it returns a future for the report and the
+    caller acknowledges the user right away. A fixed number of workers run
+    the workflow, so a burst of commands queues up instead of starting a
+    harvest and two LLM calls each. Requests for a report that is already
+    queued or running share that run's future, so identical requests made
+    while it is in flight cost one execution. With a ``reports`` cache,
+    every finished run is stored for later requests to be served from.
+    """
+
+    def __init__(self, workflow, workers: Optional[int] = None, max_queued: Optional[int] = None,
+                 reports: Optional["ReportCache"] = None):
+        self.workflow = workflow
+        self.reports = reports
+        self.workers = int(os.getenv("BOT_WORKERS", DEFAULT_WORKERS)) if workers is None else workers
+        self.max_queued = int(os.getenv("BOT_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)) if max_queued is None else max_queued
+        self.logger = logging.getLogger("ReportQueue")
+        self._queue: Optional[asyncio.Queue] = None
+        self._inflight: Dict[ReportKey, asyncio.Future] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.running = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the workers on the running event loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(max(1, self.workers))]
+
+    async def stop(self):
+        """Cancel the workers; queued and running reports fail with CancelledError"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for future in self._inflight.values():
+            future.cancel()
+        self._inflight.clear()
+
+    def submit(self, command: str, time_range: str = "weekly",
+               target_user: Optional[str] = None) -> Tuple[asyncio.Future, bool]:
+        """Queue a report, or join the identical one already in flight
+
+        Returns the report's future and whether it was coalesced with an
+        earlier request. Await it through ``asyncio.shield`` when several
+        requesters share it, so one cancelled waiter does not cancel the run.
+        """
+        if not self._tasks:
+            raise RuntimeError("ReportQueue.start() has not been called")
+        key = (command, time_range, target_user)
+        self.submitted += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return future, True
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((key, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull(f"{self.max_queued} reports already queued")
+        self._inflight[key] = future
+        return future, False
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queued": self.queued,
+            "running": self.running,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            key, future = await self._queue.get()
+            self.running += 1
+            try:
+                command, time_range, target_user = key
+                started_at, started = datetime.now(timezone.utc), time.perf_counter()
+                result = await self.workflow.arun(command, time_range, target_user)
+                self.completed += 1
+                if not future.done():
+                    future.set_result(result)
+                # A partial report would be served for hours; only cache clean runs
+                if self.reports is not None and not result.get("errors"):
+                    await self._store(key, result, started_at, time.perf_counter() - started)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                self.failed += 1
+                self.logger.error(f"Report {key} failed in worker {index}: {e}")
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                # Later requests start a fresh run rather than reuse this result
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+                self.running -= 1
+                self._queue.task_done()
+
+    async def _store(self, key: ReportKey, result: Dict[str, Any], started_at: datetime, duration_s: float):
+        """Cache a finished run; requesters already have it, so failures are only logged"""
+        command, time_range, target_user = key
+        try:
+            # Stamped with the start of the run: the data is as fresh as the harvest
+            await asyncio.to_thread(self.reports.save, command, time_range, target_user,
+                                    result, duration_s, started_at)
+        except Exception as e:
+            self.logger.warning(f"Caching report {key} failed: {e}")
@@ -0,0 +1,113 @@
+# src/bot/reports.py
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+import logging
+import os
+from src.clients import get_client_registry
+
+# What a served report needs; commit and PR tables are left out
+REPORT_FIELDS = ("summary", "narrative", "charts", "metrics", "anomalies", "code_analysis",
+                 "trend", "errors", "repos", "time_range", "timestamp")
+
+# A cached report is served as-is for this long, then served stale while it refreshes
+DEFAULT_TTL_HOURS = {"daily": 3, "weekly": 12, "monthly": 24}
+DEFAULT_OTHER_TTL_HOURS = 6
+# Older than this and it is recomputed before answering
+DEFAULT_MAX_STALE_HOURS = 7 * 24
+
+
+def report_scope(harvester) -> str:
+    """The repo set a workflow's harvester reports on, as configured"""
+    if harvester.repos:
+        return ",".join(sorted(harvester.repos))
+    if harvester.org:
+        return f"org:{harvester.org}"
+    return f"{harvester.owner}/{harvester.repo_name}"
+
+
+def _jsonable(value: Any) -> Any:
+    """Report state as plain JSON: numpy scalars unwrapped, datetimes as ISO strings"""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "item") and callable(value.item):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class CachedReport:
+    __slots__ = ("state", "charts", "computed_at", "fresh")
+
+    def __init__(self, state: Dict[str, Any], charts: List[Tuple[str, str, bytes]],
+                 computed_at: datetime, fresh: bool):
+        self.state = state
+        self.charts = charts  # (kind, title, png)
+        self.computed_at = computed_at
+        self.fresh = fresh
+
+
+class ReportCache:
+    """Finished reports in the database, with a freshness policy per time range
+
+    ``lookup`` returns the stored report and whether it is still fresh; a
+    stale one is good enough to answer with while a refresh runs. Reports
+    are keyed by the repo scope as well, so deployments that share a
+    database do not serve each other's reports.
+    """
+
+    def __init__(self, scope: str, db=None, ttl_hours: Optional[Dict[str, float]] = None,
+                 max_stale_hours: Optional[float] = None):
+        self.scope = scope
+        self._db = db
+        self.ttl_hours = dict(DEFAULT_TTL_HOURS, **(ttl_hours or {}))
+        for time_range in DEFAULT_TTL_HOURS:
+            if os.getenv(f"REPORT_TTL_{time_range.upper()}_HOURS"):
+                self.ttl_hours[time_range] = float(os.environ[f"REPORT_TTL_{time_range.upper()}_HOURS"])
+        self.other_ttl_hours = float(os.getenv("REPORT_TTL_HOURS", DEFAULT_OTHER_TTL_HOURS))
+        self.max_stale_hours = (float(os.getenv("REPORT_MAX_STALE_HOURS", DEFAULT_MAX_STALE_HOURS))
+                                if max_stale_hours is None else max_stale_hours)
+        self.render_charts = os.getenv("REPORT_RENDER_CHARTS", "1") != "0"
+        self.logger = logging.getLogger("ReportCache")
+
+    @property
+    def db(self):
+        return self._db or get_client_registry().get("db")
+
+    def key(self, command: str, time_range: str, target_user: Optional[str]) -> str:
+        return "|".join((self.scope, command, time_range, target_user or ""))
+
+    def ttl(self, time_range: str) -> timedelta:
+        return timedelta(hours=self.ttl_hours.get(time_range, self.other_ttl_hours))
+
+    def lookup(self, command: str, time_range: str, target_user: Optional[str] = None,
+               now: Optional[datetime] = None) -> Optional[CachedReport]:
+        """Stored report, or None if there is none or it is too old to serve"""
+        stored = self.db.get_report(self.key(command, time_range, target_user))
+        if stored is None:
+            return None
+        age = (now or datetime.now(timezone.utc)) - stored["computed_at"]
+        if age > timedelta(hours=self.max_stale_hours):
+            return None
+        return CachedReport(stored["state"], stored["charts"], stored["computed_at"],
+                            fresh=age <= self.ttl(time_range))
+
+    def save(self, command: str, time_range: str, target_user: Optional[str],
+             state: Dict[str, Any], duration_s: float = 0.0, computed_at: Optional[datetime] = None):
+        """Store a finished run, with its charts rendered so serving it needs no renderer"""
+        report = _jsonable({field: state[field] for field in REPORT_FIELDS if state.get(field) is not None})
+        charts = []
+        if self.render_charts and report.get("charts"):
+            from src.visualization.renderer import render_specs
+            try:
+                images = render_specs(report["charts"], "png")
+                charts = [(spec["type"], spec["title"], image) for spec, image in zip(report["charts"], images)]
+            except Exception as e:
+                # Serve the text without images rather than not at all
+                self.logger.warning(f"Chart rendering for {time_range} report failed: {e}")
+        self.db.save_report(self.key(command, time_range, target_user), report, charts,
+                            computed_at or datetime.now(timezone.utc), duration_s)
@@ -0,0 +1,172 @@
+# src/bot/scheduler.py
+from typing import Dict, Any, List, Optional, Set
+from datetime import datetime, timedelta, timezone, tzinfo
+import asyncio
+import logging
+import os
+from zoneinfo import ZoneInfo
+from src.bot.jobs import QueueFull, ReportQueue
+from src.bot.reports import ReportCache
+
+# Off-peak precompute: each range lands a little after the last, before the working day
+DEFAULT_SCHEDULE = "daily=0 5 * * *; weekly=10 5 * * *; monthly=20 5 * * *"
+
+# (low, high) of each cron field
+_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+def _parse_field(field: str, low: int, high: int) -> Set[int]:
+    values = set()
+    for part in field.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-", 1))
+        else:
+            start = end = int(part)
+            if step:
+                end = high
+        # Day of week 7 is Sunday too
+        if high == 6 and start == end == 7:
+            start = end = 0
+        elif high == 6 and end == 7:
+            values.add(0)
+            end = 6
+        if not (low <= start <= end <= high):
+            raise ValueError(f"Cron field out of range: {field}")
+        values.update(range(start, end + 1, int(step or 1)))
+    return values
+
+
+class CronTrigger:
+    """Five-field cron expression: minute hour day-of-month month day-of-week
+
+    Supports ``*``, lists, ranges and steps. As in cron, when both day
+    fields are restricted a day matching either one fires.
+    """
+
+    def __init__(self, expression: str, tz: tzinfo = timezone.utc):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.tz = tz
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(field, low, high) for field, (low, high) in zip(fields, _FIELDS)
+        )
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        if moment.month not in self.months:
+            return False
+        day = moment.day in self.days
+        # Python's Monday is 0, cron's is 1
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First firing time strictly after ``moment``, as aware UTC"""
+        local = moment.astimezone(self.tz).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Whole days are skipped until one matches; at most a few years of days for any valid expression
+        for _ in range(366 * 5):
+            if self._day_matches(local):
+                for hour in sorted(h for h in self.hours if h >= local.hour):
+                    first_minute = local.minute if hour == local.hour else 0
+                    minutes = [m for m in sorted(self.minutes) if m >= first_minute]
+                    if minutes:
+                        fire = local.replace(hour=hour, minute=minutes[0])
+                        return fire.astimezone(timezone.utc)
+            local = (local + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+
+class ScheduledReport:
+    __slots__ = ("time_range", "trigger", "command", "target_user", "next_run")
+
+    def __init__(self, time_range: str, trigger: CronTrigger, command: str = "insights",
+                 target_user: Optional[str] = None):
+        self.time_range = time_range
+        self.trigger = trigger
+        self.command = command
+        self.target_user = target_user
+        self.next_run: Optional[datetime] = None
+
+
+def parse_schedule(spec: str, tz: tzinfo = timezone.utc) -> List[ScheduledReport]:
+    """``"daily=0 5 * * *; weekly=10 5 * * 1"`` -> one ScheduledReport per entry"""
+    jobs = []
+    for entry in spec.split(";"):
+        if not entry.strip():
+            continue
+        time_range, sep, expression = entry.partition("=")
+        if not sep:
+            raise ValueError(f"Schedule entries look like range=cron: {entry!r}")
+        jobs.append(ScheduledReport(time_range.strip().lower(), CronTrigger(expression.strip(), tz)))
+    return jobs
+
+
+class ReportScheduler:
+    """Precomputes reports on cron triggers so requests are answered from the cache
+
+    Runs go through the bot's ReportQueue, so they share its worker limit
+    and coalesce with identical on-demand requests; the queue stores each
+    finished report. On start, scheduled reports that are missing or stale
+    are queued straight away rather than waiting for their next trigger.
+    """
+
+    def __init__(self, queue: ReportQueue, reports: Optional[ReportCache] = None,
+                 jobs: Optional[List[ScheduledReport]] = None):
+        self.queue = queue
+        self.reports = reports
+        if jobs is None:
+            tz = ZoneInfo(os.getenv("REPORT_TIMEZONE", "UTC"))
+            jobs = parse_schedule(os.getenv("REPORT_SCHEDULE", DEFAULT_SCHEDULE), tz)
+        self.jobs = jobs
+        self.logger = logging.getLogger("ReportScheduler")
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        now = datetime.now(timezone.utc)
+        for job in self.jobs:
+            job.next_run = job.trigger.next_after(now)
+            if self.reports is not None:
+                try:
+                    cached = await asyncio.to_thread(self.reports.lookup, job.command, job.time_range, job.target_user)
+                except Exception as e:
+                    self.logger.warning(f"Report cache lookup failed: {e}")
+                    cached = None
+                if cached is None or not cached.fresh:
+                    self._submit(job)
+        while self.jobs:
+            due = min(job.next_run for job in self.jobs)
+            await asyncio.sleep(max(0.0, (due - datetime.now(timezone.utc)).total_seconds()))
+            now = datetime.now(timezone.utc)
+            for job in self.jobs:
+                if job.next_run <= now:
+                    self._submit(job)
+                    job.next_run = job.trigger.next_after(now)
+
+    def _submit(self, job: ScheduledReport):
+        try:
+            self.queue.submit(job.command, job.time_range, job.target_user)
+            self.logger.info(f"Precomputing {job.time_range} report")
+        except QueueFull:
+            self.logger.warning(f"Queue full; skipped precomputing {job.time_range} until {job.next_run}")
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [{"time_range": job.time_range, "cron": job.trigger.expression,
+                 "next_run": job.next_run.isoformat() if job.next_run else None} for job in self.jobs]
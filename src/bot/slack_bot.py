@@ -0,0 +1,250 @@
+# src/bot/slack_bot.py
+"""Slack bot: /insights [time range] [@github-user]
+
+Commands are acknowledged at once and handed to a ReportQueue, so Slack's
+3-second ack deadline never waits on a harvest or an LLM call. Identical
+requests made while a report is in flight share that run's result.
+
+Finished reports are stored, and a scheduler precomputes the common ranges
+off-peak, so most requests are a database read. A stale stored report is
+still served while a refresh runs in the background.
+
+Run with ``python -m src.bot.slack_bot``; it serves Slack events on
+``/slack/events`` and a health check on ``/health`` (port ``PORT``, 3000).
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+import asyncio
+import logging
+import os
+import re
+
+from dotenv import load_dotenv
+
+from src.bot.jobs import QueueFull, ReportQueue
+from src.bot.reports import CachedReport, ReportCache, report_scope
+from src.bot.scheduler import ReportScheduler
+from src.metrics.time_range import resolve_time_range
+
+USAGE = ("Usage: `/insights [time range] [@github-user]`, e.g. `/insights weekly`, "
+         "`/insights last_90_days`, `/insights Q3 2024 @octocat`, `/insights 2024-07-01..2024-09-30`")
+
+# Slack rejects section blocks longer than this
+SECTION_LIMIT = 3000
+
+_MENTION = re.compile(r"^<@(\w+)(?:\|([^>]+))?>$")
+
+logger = logging.getLogger("SlackBot")
+
+
+def parse_command(text: str) -> Tuple[str, Optional[str]]:
+    """``(time_range, target_user)`` from the command text; raises ValueError if the range is unknown
+
+    ``target_user`` is a GitHub login; the report then covers only that
+    developer's commits and PRs. Slack member mentions are rejected, since a
+    Slack handle says nothing about the GitHub account. Whitespace and case
+    are normalized so equivalent requests coalesce.
+    """
+    words, target_user = [], None
+    for token in (text or "").split():
+        if _MENTION.match(token):
+            raise ValueError("Name a GitHub login (`@octocat`), not a Slack member.")
+        elif token.startswith("@") and len(token) > 1:
+            target_user = token[1:].lower()
+        else:
+            words.append(token.lower())
+    time_range = " ".join(words) or "weekly"
+    resolve_time_range(time_range)
+    return time_range, target_user
+
+
+def _sections(text: str) -> List[Dict[str, Any]]:
+    chunks = [text[i:i + SECTION_LIMIT] for i in range(0, len(text), SECTION_LIMIT)]
+    return [{"type": "section", "text": {"type": "mrkdwn", "text": chunk}} for chunk in chunks]
+
+
+def format_report(report: Dict[str, Any], time_range: str, target_user: Optional[str] = None,
+                  computed_at: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Slack blocks for a finished workflow run; ``computed_at`` marks a stored report"""
+    title = f"Engineering insights: {time_range}" + (f" for {target_user}" if target_user else "")
+    blocks = [{"type": "header", "text": {"type": "plain_text", "text": title[:150]}}]
+    if report.get("summary"):
+        blocks += _sections(report["summary"])
+    if report.get("narrative"):
+        blocks.append({"type": "divider"})
+        blocks += _sections(report["narrative"])
+    if report.get("errors"):
+        errors = "\n".join(f"• {error}" for error in report["errors"][:5])
+        blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": f"Issues:\n{errors}"[:SECTION_LIMIT]}]})
+    if computed_at is not None:
+        as_of = computed_at.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+        blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": f"Data as of {as_of}"}]})
+    return blocks
+
+
+class InsightsBot:
+    """Wires the /insights command to a shared workflow, report cache and queue"""
+
+    def __init__(self, workflow=None, queue: Optional[ReportQueue] = None,
+                 reports: Optional[ReportCache] = None, scheduler: Optional[ReportScheduler] = None):
+        if workflow is None:
+            from src.graph.workflow import DevInsightsWorkflow
+            workflow = DevInsightsWorkflow()
+        self.workflow = workflow
+        if reports is None and os.getenv("REPORT_CACHE", "1") != "0":
+            reports = ReportCache(report_scope(workflow.harvester))
+        self.reports = reports
+        self.queue = queue or ReportQueue(workflow, reports=reports)
+        if scheduler is None and reports is not None and os.getenv("REPORT_SCHEDULE", "default") != "off":
+            scheduler = ReportScheduler(self.queue, reports)
+        self.scheduler = scheduler
+        self.upload_charts = os.getenv("BOT_UPLOAD_CHARTS", "1") != "0"
+        self.cache_hits = 0
+        self.stale_hits = 0
+
+    async def start(self):
+        """Start the workers and scheduler, then warm the graph, clients and chart renderer in the background"""
+        self.queue.start()
+        if self.scheduler is not None:
+            self.scheduler.start()
+        asyncio.get_running_loop().create_task(self._warm())
+
+    async def stop(self):
+        if self.scheduler is not None:
+            await self.scheduler.stop()
+        await self.queue.stop()
+
+    async def _warm(self):
+        from src.visualization.renderer import get_chart_renderer
+        try:
+            await asyncio.to_thread(self.workflow.warm)
+            await asyncio.to_thread(get_chart_renderer().warm)
+        except Exception as e:
+            logger.warning(f"Warm-up failed; clients will be built on first report: {e}")
+
+    async def handle_insights(self, ack, command: Dict[str, Any], respond, client):
+        try:
+            time_range, target_user = parse_command(command.get("text", ""))
+        except ValueError as e:
+            await ack(f"{e}\n{USAGE}")
+            return
+
+        # Before anything that can block: the cache lookup is a database read, and on a
+        # cold process the first one also builds the database client
+        await ack()
+
+        cached = await self._cached(time_range, target_user)
+        if cached is not None:
+            await self._serve_cached(cached, time_range, target_user, command, respond, client)
+            return
+
+        try:
+            report, coalesced = self.queue.submit("insights", time_range, target_user)
+        except QueueFull:
+            await respond("The report queue is full right now; please try again in a minute.")
+            return
+
+        if coalesced:
+            await respond(f"A {time_range} report is already being generated; you'll get it here when it's ready.")
+        else:
+            await respond(f"Generating your {time_range} report (position {self.queue.queued} in the queue)...")
+
+        try:
+            # Other requesters await the same run; shield it from this handler's cancellation
+            result = await asyncio.shield(report)
+        except Exception as e:
+            await respond(f"Sorry, the {time_range} report failed: {e}")
+            return
+
+        await respond(blocks=format_report(result, time_range, target_user),
+                      text=result.get("summary") or f"{time_range} report", response_type="in_channel")
+        if self.upload_charts and result.get("charts"):
+            await self._upload_charts(client, command["channel_id"], result["charts"])
+
+    async def _cached(self, time_range: str, target_user: Optional[str]) -> Optional[CachedReport]:
+        if self.reports is None:
+            return None
+        try:
+            return await asyncio.to_thread(self.reports.lookup, "insights", time_range, target_user)
+        except Exception as e:
+            logger.warning(f"Report cache lookup failed; computing instead: {e}")
+            return None
+
+    async def _serve_cached(self, cached: CachedReport, time_range: str, target_user: Optional[str],
+                            command: Dict[str, Any], respond, client):
+        self.cache_hits += 1
+        if not cached.fresh:
+            # Stale-while-revalidate: answer now, refresh for the next request
+            self.stale_hits += 1
+            try:
+                self.queue.submit("insights", time_range, target_user)
+            except QueueFull:
+                logger.warning(f"Queue full; {time_range} report stays stale for now")
+        await respond(blocks=format_report(cached.state, time_range, target_user, cached.computed_at),
+                      text=cached.state.get("summary") or f"{time_range} report", response_type="in_channel")
+        if self.upload_charts and cached.charts:
+            await self._upload_images(client, command["channel_id"], cached.charts)
+
+    async def _upload_charts(self, client, channel_id: str, charts: List[Dict[str, Any]]):
+        from src.visualization.renderer import render_specs
+        try:
+            # Memoized by content, so coalesced requesters do not re-render
+            images = await asyncio.to_thread(render_specs, charts, "png")
+        except Exception as e:
+            logger.warning(f"Chart rendering failed: {e}")
+            return
+        await self._upload_images(client, channel_id,
+                                  [(spec["type"], spec["title"], image) for spec, image in zip(charts, images)])
+
+    async def _upload_images(self, client, channel_id: str, images: List[Tuple[str, str, bytes]]):
+        try:
+            await client.files_upload_v2(
+                channel=channel_id,
+                file_uploads=[{"content": image, "filename": f"{kind}.png", "title": title}
+                              for kind, title, image in images],
+            )
+        except Exception as e:
+            logger.warning(f"Chart upload to {channel_id} failed: {e}")
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "queue": self.queue.stats(),
+            "cache": {"hits": self.cache_hits, "stale_hits": self.stale_hits},
+            "schedule": self.scheduler.status() if self.scheduler is not None else [],
+        }
+
+
+def create_app(bot: InsightsBot):
+    from slack_bolt.async_app import AsyncApp
+    app = AsyncApp(token=os.getenv("SLACK_BOT_TOKEN"), signing_secret=os.getenv("SLACK_SIGNING_SECRET"))
+    app.command("/insights")(bot.handle_insights)
+    return app
+
+
+def main():
+    from aiohttp import web
+
+    load_dotenv()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    bot = InsightsBot()
+    app = create_app(bot)
+    web_app = app.web_app(path="/slack/events", port=int(os.getenv("PORT", "3000")))
+
+    async def health(_request):
+        return web.json_response(bot.health())
+
+    async def on_startup(_web_app):
+        await bot.start()
+
+    async def on_cleanup(_web_app):
+        await bot.stop()
+
+    web_app.router.add_get("/health", health)
+    web_app.on_startup.append(on_startup)
+    web_app.on_cleanup.append(on_cleanup)
+    web.run_app(web_app, port=int(os.getenv("PORT", "3000")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# src/clients.py
+from typing import Dict, Any, Callable, Optional
+import atexit
+import logging
+import os
+import threading
+import time
+
+# Health checks are skipped for clients checked more recently than this
+HEALTH_CHECK_INTERVAL = 30.0  # seconds
+
+
+class _Entry:
+    __slots__ = ("factory", "health_check", "close", "instance", "created_at", "checked_at", "lock")
+
+    def __init__(self, factory: Callable[[], Any], health_check: Optional[Callable[[Any], Any]],
+                 close: Optional[Callable[[Any], Any]]):
+        self.factory = factory
+        self.health_check = health_check
+        self.close = close
+        self.instance = None
+        self.created_at = 0.0
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+
+class ClientRegistry:
+    """Process-wide home for long-lived clients (LLM, GitHub, GraphQL, database, HTTP)
+
+    Clients are built on first ``get`` and then shared by every agent and
+    workflow in the process, so per-report setup is a dict lookup. Creation
+    is serialized per client, so concurrent first calls build one instance.
+    ``check`` runs a client's health check and drops it if the check fails;
+    the next ``get`` builds a fresh one. ``close`` releases everything and
+    runs at interpreter exit.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("ClientRegistry")
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any],
+                 health_check: Optional[Callable[[Any], Any]] = None,
+                 close: Optional[Callable[[Any], Any]] = None):
+        """Declare how to build, probe and release a client; replaces any existing one"""
+        with self._lock:
+            previous = self._entries.get(name)
+            self._entries[name] = _Entry(factory, health_check, close)
+        if previous is not None:
+            self._release(name, previous)
+
+    def get(self, name: str) -> Any:
+        entry = self._entry(name)
+        instance = entry.instance
+        if instance is None:
+            with entry.lock:
+                instance = entry.instance
+                if instance is None:
+                    instance = entry.factory()
+                    entry.instance, entry.created_at, entry.checked_at = instance, time.time(), time.time()
+        return instance
+
+    def set(self, name: str, instance: Any):
+        """Install a ready-made client, e.g. a stub in tests"""
+        entry = self._entry(name)
+        with entry.lock:
+            entry.instance, entry.created_at, entry.checked_at = instance, time.time(), time.time()
+
+    def check(self, name: str, force: bool = False) -> bool:
+        """Probe a built client; an unhealthy one is released and rebuilt on next get"""
+        entry = self._entry(name)
+        instance = entry.instance
+        if instance is None or entry.health_check is None:
+            return True
+        if not force and time.time() - entry.checked_at < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            healthy = entry.health_check(instance) is not False
+        except Exception as e:
+            self.logger.warning(f"Health check for {name} failed: {e}")
+            healthy = False
+        entry.checked_at = time.time()
+        if not healthy:
+            self.reset(name)
+        return healthy
+
+    def health(self, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Status of every registered client; unbuilt ones are reported, not built"""
+        status = {}
+        for name in list(self._entries):
+            entry = self._entries[name]
+            built = entry.instance is not None
+            status[name] = {
+                "built": built,
+                "healthy": self.check(name, force) if built else None,
+                "age_s": time.time() - entry.created_at if built else None,
+            }
+        return status
+
+    def reset(self, name: str):
+        """Release one client; the next get builds a new one"""
+        entry = self._entry(name)
+        with entry.lock:
+            instance, entry.instance = entry.instance, None
+        if instance is not None:
+            self._release(name, entry, instance)
+
+    def close(self):
+        for name in list(self._entries):
+            self.reset(name)
+
+    def _entry(self, name: str) -> _Entry:
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"No client registered as {name!r}")
+        return entry
+
+    def _release(self, name: str, entry: _Entry, instance: Any = None):
+        instance = instance if instance is not None else entry.instance
+        if instance is None or entry.close is None:
+            return
+        try:
+            entry.close(instance)
+        except Exception as e:
+            self.logger.warning(f"Closing {name} failed: {e}")
+
+
+def _github_concurrency() -> int:
+    return max(1, int(os.getenv("HARVEST_CONCURRENCY", "8")))
+
+
+def _llm():
+    from src.llm.geminiwrapper import GeminiLLM
+    return GeminiLLM(temperature=0.3)
+
+
+def _github():
+    from github import Consts, Github
+    from src.data.http_cache import install_github_cache
+    # Conditional requests: unchanged REST payloads come back as 304s
+    install_github_cache()
+    return Github(os.getenv("GITHUB_TOKEN"), base_url=os.getenv("GITHUB_API_URL", Consts.DEFAULT_BASE_URL),
+                  per_page=100, pool_size=_github_concurrency())
+
+
+def _graphql():
+    from src.data.github_graphql import GitHubGraphQLClient
+    return GitHubGraphQLClient(os.getenv("GITHUB_TOKEN"), pool_size=_github_concurrency())
+
+
+def _graphql_health(client) -> bool:
+    return client.execute("query { rateLimit { remaining } }", {})["rateLimit"]["remaining"] >= 0
+
+
+def _db():
+    from src.storage.database import DatabaseManager
+    return DatabaseManager()
+
+
+def _db_health(db) -> bool:
+    from sqlalchemy import text
+    with db.engine.connect() as connection:
+        return connection.execute(text("SELECT 1")).scalar() == 1
+
+
+def _http():
+    from src.data.http_cache import cached_session
+    return cached_session()
+
+
+def register_defaults(registry: ClientRegistry):
+    registry.register("llm", _llm, health_check=lambda llm: llm.client is not None)
+    registry.register("github", _github, health_check=lambda gh: gh.get_rate_limit(), close=lambda gh: gh.close())
+    registry.register("graphql", _graphql, health_check=_graphql_health, close=lambda c: c.session.close())
+    # Engines are shared per URL and outlive the handle; releasing it drains queued writes
+    registry.register("db", _db, health_check=_db_health, close=lambda db: db.flush())
+    registry.register("http", _http, close=lambda session: session.close())
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Process-wide registry with the default clients registered"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+            register_defaults(_registry)
+            atexit.register(_registry.close)
+        return _registry
@@ -0,0 +1,220 @@
+# src/data/columnar.py
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Sequence, Union
+from datetime import datetime, timezone
+import sys
+import numpy as np
+
+_TIME_UNIT = "datetime64[us]"
+_NAT = np.datetime64("NaT", "us")
+
+
+def _to_datetime64(value: Optional[datetime]) -> np.datetime64:
+    """Aware or naive-UTC datetime to a naive-UTC datetime64"""
+    if value is None:
+        return _NAT
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+def _from_datetime64(value: np.datetime64) -> Optional[datetime]:
+    """datetime64 back to the aware UTC datetime the rest of the code expects"""
+    if np.isnat(value):
+        return None
+    return value.astype(_TIME_UNIT).astype(datetime).replace(tzinfo=timezone.utc)
+
+
+class _StringPool:
+    """Interns repeated strings (authors, repos) as int32 codes"""
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+    def lookup(self, value: str) -> int:
+        """Code for a known value, -1 if absent"""
+        return self._codes.get(value, -1)
+
+
+class ColumnarTable:
+    """Array-backed table of harvested rows
+
+    Columns live in one NumPy structured array, so ``table["additions"]`` is a
+    zero-copy view. Authors and repos are interned into int32 codes and
+    timestamps are datetime64. Iterating yields plain row dicts, which keeps
+    code written against the old list-of-dicts shape working.
+    """
+
+    # (name, dtype, kind) where kind is "int", "time", "text", "author" or "repo"
+    FIELDS: List[tuple] = []
+    # Timestamp column used by between() when no field is given
+    TIME_KEY = ""
+
+    def __init__(self, data: np.ndarray, authors: _StringPool, repos: _StringPool):
+        self.data = data
+        self.authors = authors
+        self.repos = repos
+
+    @classmethod
+    def dtype(cls) -> np.dtype:
+        return np.dtype([(name, dtype) for name, dtype, _ in cls.FIELDS])
+
+    @classmethod
+    def empty(cls) -> "ColumnarTable":
+        return cls(np.empty(0, dtype=cls.dtype()), _StringPool(), _StringPool())
+
+    @classmethod
+    def from_records(cls, records: Union["ColumnarTable", Iterable[Dict[str, Any]]]) -> "ColumnarTable":
+        """Build a table from row dicts; an existing table is returned as is"""
+        if isinstance(records, cls):
+            return records
+        records = list(records)
+        authors, repos = _StringPool(), _StringPool()
+        data = np.empty(len(records), dtype=cls.dtype())
+        for name, _, kind in cls.FIELDS:
+            if kind == "author":
+                column = [authors.code(r.get("author") or "unknown") for r in records]
+            elif kind == "repo":
+                column = [repos.code(r["repo"]) if r.get("repo") else -1 for r in records]
+            elif kind == "time":
+                column = [_to_datetime64(r.get(name)) for r in records]
+            elif kind == "text":
+                column = [r.get(name) or "" for r in records]
+            else:
+                column = [r.get(name) or 0 for r in records]
+            if records:
+                data[name] = column
+        return cls(data, authors, repos)
+
+    @classmethod
+    def concat(cls, tables: Sequence["ColumnarTable"]) -> "ColumnarTable":
+        """Concatenate tables, re-coding their author and repo pools into one"""
+        authors, repos = _StringPool(), _StringPool()
+        parts = []
+        for table in tables:
+            part = table.data.copy()
+            author_map = np.array([authors.code(a) for a in table.authors.values], dtype=np.int32)
+            repo_map = np.array([repos.code(r) for r in table.repos.values] + [-1], dtype=np.int32)
+            if len(part):
+                if len(author_map):
+                    part["author"] = author_map[part["author"]]
+                # -1 ("no repo") indexes the trailing -1 sentinel
+                part["repo"] = repo_map[part["repo"]]
+            parts.append(part)
+        data = np.concatenate(parts) if parts else np.empty(0, dtype=cls.dtype())
+        return cls(data, authors, repos)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __bool__(self) -> bool:
+        return len(self.data) > 0
+
+    def __getitem__(self, key: Union[str, int]) -> Union[np.ndarray, Dict[str, Any]]:
+        if isinstance(key, str):
+            return self.data[key]
+        return self._row(self.data[key])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for record in self.data:
+            yield self._row(record)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} rows)"
+
+    def _row(self, record: np.void) -> Dict[str, Any]:
+        """Dict view of one record, shaped like the harvester's original dicts"""
+        row = {}
+        for name, _, kind in self.FIELDS:
+            value = record[name]
+            if kind == "author":
+                row[name] = self.authors.values[value]
+            elif kind == "repo":
+                if value >= 0:
+                    row[name] = self.repos.values[value]
+            elif kind == "time":
+                row[name] = _from_datetime64(value)
+            elif kind == "text":
+                row[name] = value
+            else:
+                row[name] = int(value)
+        return row
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def author_names(self) -> np.ndarray:
+        """Author login per row (materialized; prefer the int codes in hot paths)"""
+        return np.array(self.authors.values, dtype=object)[self.data["author"]]
+
+    def filter(self, mask: np.ndarray) -> "ColumnarTable":
+        """Rows where ``mask`` is true; pools are shared with the parent table"""
+        return type(self)(self.data[mask], self.authors, self.repos)
+
+    def by_author(self, login: str) -> "ColumnarTable":
+        return self.filter(self.data["author"] == self.authors.lookup(login))
+
+    def by_repo(self, full_name: str) -> "ColumnarTable":
+        code = self.repos.lookup(full_name)
+        if code < 0:
+            return self.filter(np.zeros(len(self.data), dtype=bool))
+        return self.filter(self.data["repo"] == code)
+
+    def between(self, start: datetime, end: datetime, field: Optional[str] = None) -> "ColumnarTable":
+        """Rows whose ``field`` timestamp falls within [start, end]"""
+        column = self.data[field or self.TIME_KEY]
+        return self.filter((column >= _to_datetime64(start)) & (column <= _to_datetime64(end)))
+
+    def sort_by(self, *fields: str, descending: bool = False) -> "ColumnarTable":
+        """Sort on one or more columns, first field most significant
+
+        Author and repo columns sort by intern code (first-seen order), not name.
+        """
+        order = np.lexsort([self.data[f] for f in reversed(fields)])
+        if descending:
+            order = order[::-1]
+        return type(self)(self.data[order], self.authors, self.repos)
+
+
+class CommitTable(ColumnarTable):
+    FIELDS = [
+        ("sha", object, "text"),
+        ("author", np.int32, "author"),
+        ("message", object, "text"),
+        ("date", _TIME_UNIT, "time"),
+        ("additions", np.int64, "int"),
+        ("deletions", np.int64, "int"),
+        ("total", np.int64, "int"),
+        ("files", np.int64, "int"),
+        ("repo", np.int32, "repo"),
+    ]
+    TIME_KEY = "date"
+
+
+class PullRequestTable(ColumnarTable):
+    FIELDS = [
+        ("number", np.int64, "int"),
+        ("title", object, "text"),
+        ("author", np.int32, "author"),
+        ("state", object, "text"),
+        ("created_at", _TIME_UNIT, "time"),
+        ("updated_at", _TIME_UNIT, "time"),
+        ("merged_at", _TIME_UNIT, "time"),
+        ("additions", np.int64, "int"),
+        ("deletions", np.int64, "int"),
+        ("changed_files", np.int64, "int"),
+        ("review_comments", np.int64, "int"),
+        ("repo", np.int32, "repo"),
+    ]
+    TIME_KEY = "created_at"
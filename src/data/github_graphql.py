@@ -0,0 +1,249 @@
+# src/data/github_graphql.py
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+import logging
+import os
+import requests
+from requests.adapters import HTTPAdapter
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Commit history and pull requests share one query document so a single round
+# trip advances both cursors; @include drops a connection once it is exhausted.
+HISTORY_QUERY = """
+query Harvest(
+  $owner: String!, $name: String!, $pageSize: Int!,
+  $since: GitTimestamp, $until: GitTimestamp,
+  $commitCursor: String, $prCursor: String,
+  $withCommits: Boolean!, $withPulls: Boolean!
+) {
+  rateLimit { cost remaining }
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef @include(if: $withCommits) {
+      target {
+        ... on Commit {
+          history(first: $pageSize, since: $since, until: $until, after: $commitCursor) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              message
+              additions
+              deletions
+              changedFilesIfAvailable
+              author { date user { login } }
+            }
+          }
+        }
+      }
+    }
+    pullRequests(
+      first: $pageSize, after: $prCursor,
+      orderBy: {field: UPDATED_AT, direction: DESC}
+    ) @include(if: $withPulls) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        state
+        createdAt
+        updatedAt
+        mergedAt
+        additions
+        deletions
+        changedFiles
+        author { login }
+        reviews(first: 50) { pageInfo { hasNextPage endCursor } nodes { comments { totalCount } } }
+      }
+    }
+  }
+}
+"""
+
+# Rest of a PR's reviews, for the few with more than HISTORY_QUERY returns inline
+REVIEWS_QUERY = """
+query Reviews($owner: String!, $name: String!, $number: Int!, $cursor: String) {
+  rateLimit { cost remaining }
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      reviews(first: 100, after: $cursor) { pageInfo { hasNextPage endCursor } nodes { comments { totalCount } } }
+    }
+  }
+}
+"""
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse a GitHub ISO-8601 timestamp into an aware datetime"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class GitHubGraphQLClient:
+    """Batched GitHub GraphQL client for commit history and pull requests"""
+
+    def __init__(self, token: Optional[str] = None, url: Optional[str] = None,
+                 page_size: int = 100, session: Optional[requests.Session] = None,
+                 pool_size: int = 10):
+        self.token = token or os.getenv("GITHUB_TOKEN")
+        self.url = url or os.getenv("GITHUB_GRAPHQL_URL", GRAPHQL_URL)
+        self.page_size = page_size
+        if session is None:
+            # Sized so concurrent harvest threads each keep a live connection
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self.logger = logging.getLogger("GitHubGraphQL")
+
+    def execute(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a GraphQL query and return its data payload"""
+        response = self.session.post(
+            self.url,
+            json={"query": query, "variables": variables},
+            headers={"Authorization": f"bearer {self.token}"},
+            timeout=30,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get("errors"):
+            messages = "; ".join(e.get("message", "") for e in payload["errors"])
+            raise RuntimeError(f"GitHub GraphQL error: {messages}")
+        return payload["data"]
+
+    def fetch_history(self, owner: str, name: str, since: datetime, until: datetime,
+                      pulls_updated_since: Optional[datetime] = None,
+                      pulls_created_since: Optional[datetime] = None) -> Tuple[List[Dict], List[Dict]]:
+        """Fetch commits and PRs for a window, 100 items per connection per request
+
+        Commits are those dated within [since, until]. PRs are those updated at or
+        after ``pulls_updated_since`` and created at or after ``pulls_created_since``
+        (both default to ``since``).
+        """
+        return self._paginate(
+            owner, name, since, until,
+            pulls_updated_since or since, pulls_created_since or since,
+            with_commits=True, with_pulls=True
+        )
+
+    def fetch_commits(self, owner: str, name: str, since: datetime,
+                      until: datetime) -> List[Dict[str, Any]]:
+        """Fetch only the commit history dated within [since, until]"""
+        commits, _ = self._paginate(owner, name, since, until, since, since,
+                                    with_commits=True, with_pulls=False)
+        return commits
+
+    def fetch_pull_requests(self, owner: str, name: str, updated_since: datetime,
+                            created_since: datetime) -> List[Dict[str, Any]]:
+        """Fetch only PRs updated since ``updated_since`` and created since ``created_since``"""
+        _, pull_requests = self._paginate(owner, name, updated_since, None, updated_since, created_since,
+                                          with_commits=False, with_pulls=True)
+        return pull_requests
+
+    def _paginate(self, owner: str, name: str, since: datetime, until: Optional[datetime],
+                  pulls_updated_since: datetime, pulls_created_since: datetime,
+                  with_commits: bool, with_pulls: bool) -> Tuple[List[Dict], List[Dict]]:
+        """Page through the requested connections until each is exhausted"""
+        commits: List[Dict[str, Any]] = []
+        pull_requests: List[Dict[str, Any]] = []
+        variables = {
+            "owner": owner,
+            "name": name,
+            "pageSize": self.page_size,
+            "since": since.isoformat(),
+            "until": until.isoformat() if until else None,
+            "commitCursor": None,
+            "prCursor": None,
+            "withCommits": with_commits,
+            "withPulls": with_pulls,
+        }
+
+        while variables["withCommits"] or variables["withPulls"]:
+            data = self.execute(HISTORY_QUERY, variables)
+            repository = data["repository"]
+
+            if variables["withCommits"]:
+                branch = repository.get("defaultBranchRef")
+                if branch is None:
+                    # An empty repository has no default branch, hence no commits
+                    variables["withCommits"] = False
+                else:
+                    history = branch["target"]["history"]
+                    commits.extend(self._to_commit(node) for node in history["nodes"])
+                    variables["commitCursor"] = history["pageInfo"]["endCursor"]
+                    variables["withCommits"] = history["pageInfo"]["hasNextPage"]
+
+            if variables["withPulls"]:
+                pulls = repository["pullRequests"]
+                reached_window_start = False
+                for node in pulls["nodes"]:
+                    # Ordered by updatedAt desc: nothing older can be in the window
+                    if _parse_datetime(node["updatedAt"]) < pulls_updated_since:
+                        reached_window_start = True
+                        break
+                    if _parse_datetime(node["createdAt"]) >= pulls_created_since:
+                        pull_request = self._to_pull_request(node)
+                        reviews = node.get("reviews") or {}
+                        if (reviews.get("pageInfo") or {}).get("hasNextPage"):
+                            pull_request["review_comments"] += self._more_review_comments(
+                                owner, name, node["number"], reviews["pageInfo"]["endCursor"]
+                            )
+                        pull_requests.append(pull_request)
+                variables["prCursor"] = pulls["pageInfo"]["endCursor"]
+                variables["withPulls"] = pulls["pageInfo"]["hasNextPage"] and not reached_window_start
+
+            rate_limit = data.get("rateLimit") or {}
+            self.logger.debug(
+                f"GraphQL page cost={rate_limit.get('cost')} remaining={rate_limit.get('remaining')}"
+            )
+
+        return commits, pull_requests
+
+    def _more_review_comments(self, owner: str, name: str, number: int, cursor: str) -> int:
+        """Review comments on a PR's reviews after ``cursor``, so the total matches REST's review_comments"""
+        total = 0
+        while cursor:
+            data = self.execute(REVIEWS_QUERY, {"owner": owner, "name": name, "number": number, "cursor": cursor})
+            reviews = data["repository"]["pullRequest"]["reviews"]
+            total += sum(r["comments"]["totalCount"] for r in reviews["nodes"])
+            cursor = reviews["pageInfo"]["endCursor"] if reviews["pageInfo"]["hasNextPage"] else None
+        return total
+
+    @staticmethod
+    def _to_commit(node: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a history node onto the harvester's commit dict"""
+        author = node.get("author") or {}
+        user = author.get("user") or {}
+        additions = node.get("additions") or 0
+        deletions = node.get("deletions") or 0
+        return {
+            "sha": node["oid"],
+            "author": user.get("login") or "unknown",
+            "message": node.get("message", ""),
+            "date": _parse_datetime(author.get("date")),
+            "additions": additions,
+            "deletions": deletions,
+            "total": additions + deletions,
+            "files": node.get("changedFilesIfAvailable") or 0
+        }
+
+    @staticmethod
+    def _to_pull_request(node: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a pull request node onto the harvester's PR dict"""
+        author = node.get("author") or {}
+        reviews = (node.get("reviews") or {}).get("nodes") or []
+        return {
+            "number": node["number"],
+            "title": node.get("title", ""),
+            "author": author.get("login") or "unknown",
+            # REST only distinguishes open/closed; merged PRs are closed
+            "state": "open" if node.get("state") == "OPEN" else "closed",
+            "created_at": _parse_datetime(node.get("createdAt")),
+            "updated_at": _parse_datetime(node.get("updatedAt")),
+            "merged_at": _parse_datetime(node.get("mergedAt")),
+            "additions": node.get("additions") or 0,
+            "deletions": node.get("deletions") or 0,
+            "changed_files": node.get("changedFiles") or 0,
+            "review_comments": sum(r["comments"]["totalCount"] for r in reviews)
+        }
@@ -0,0 +1,252 @@
+# src/data/harvest.py
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from github import Consts, Github
+import logging
+import os
+from src.data.columnar import CommitTable, PullRequestTable
+from src.data.github_graphql import GitHubGraphQLClient
+from src.data.http_cache import install_github_cache
+from src.clients import ClientRegistry, get_client_registry
+from src.metrics.engine import MetricsEngine
+from src.storage.database import DatabaseManager
+
+# Commits can land on the default branch after their author date (late pushes,
+# merges), so each delta sync re-reads this much history before the watermark.
+SYNC_OVERLAP = timedelta(days=1)
+
+def _split_window(since: datetime, until: datetime, parts: int) -> List[Tuple[datetime, datetime]]:
+    """Split [since, until] into ``parts`` contiguous slices"""
+    step = (until - since) / parts
+    return [(since + step * i, until if i == parts - 1 else since + step * (i + 1))
+            for i in range(parts)]
+
+class RepoHarvester:
+    """Fetches commits and PRs for one owner/name repository
+
+    Configuration comes from the same environment variables the agent uses:
+    GITHUB_TOKEN, GITHUB_API_URL, GITHUB_GRAPHQL_URL, GITHUB_HARVEST_MODE,
+    HARVEST_CONCURRENCY, HARVEST_INCREMENTAL.
+    """
+
+    def __init__(self, full_name: str, github: Optional[Github] = None,
+                 graphql: Optional[GitHubGraphQLClient] = None,
+                 store: Optional[DatabaseManager] = None):
+        self.full_name = full_name
+        self.owner, self.repo_name = full_name.split("/", 1)
+        self.logger = logging.getLogger("RepoHarvester")
+        # Upper bound on in-flight GitHub requests during a harvest
+        self.concurrency = max(1, int(os.getenv("HARVEST_CONCURRENCY", "8")))
+        # "graphql" pulls stats in batched pages, "rest" walks PyGithub objects
+        self.mode = os.getenv("GITHUB_HARVEST_MODE", "graphql").lower()
+        if github is None:
+            # Conditional requests: unchanged REST payloads come back as 304s
+            install_github_cache()
+            github = Github(os.getenv("GITHUB_TOKEN"), base_url=os.getenv("GITHUB_API_URL", Consts.DEFAULT_BASE_URL),
+                            per_page=100, pool_size=self.concurrency)
+        self.github = github
+        self.graphql = graphql or GitHubGraphQLClient(os.getenv("GITHUB_TOKEN"), pool_size=self.concurrency)
+        # Keep a local commit/PR store and only fetch what changed since the last sync
+        self.incremental = os.getenv("HARVEST_INCREMENTAL", "1") != "0"
+        if self.incremental and store is None:
+            store = DatabaseManager()
+        self.store = store
+
+    @classmethod
+    def shared(cls, full_name: str, clients: Optional[ClientRegistry] = None) -> "RepoHarvester":
+        """Harvester on the process's shared GitHub, GraphQL and database clients"""
+        clients = clients or get_client_registry()
+        incremental = os.getenv("HARVEST_INCREMENTAL", "1") != "0"
+        return cls(full_name, github=clients.get("github"), graphql=clients.get("graphql"),
+                   store=clients.get("db") if incremental else None)
+
+    def harvest(self, start_date: datetime, end_date: datetime) -> Tuple[List[Dict], List[Dict]]:
+        """Return commits and PRs for [start_date, end_date]"""
+        if self.incremental:
+            self._sync(start_date, end_date)
+            return (
+                self.store.query_commits(self.full_name, start_date, end_date),
+                self.store.query_pull_requests(self.full_name, start_date, end_date)
+            )
+        return self._fetch(start_date, end_date)
+
+    def _sync(self, start_date: datetime, end_date: datetime):
+        """Bring the local store up to date for [start_date, end_date]"""
+        watermark = self.store.get_watermark(self.full_name)
+
+        if watermark is None:
+            commits, pull_requests = self._fetch(start_date, end_date)
+            synced_from, synced_until = start_date, end_date
+        else:
+            synced_from = min(start_date, watermark.synced_from)
+            # A historical window must not pull the watermark back
+            synced_until = max(end_date, watermark.synced_until)
+            commits, pull_requests = [], []
+
+            # Window reaches further back than anything stored: backfill the gap
+            if start_date < watermark.synced_from:
+                older_commits, older_prs = self._fetch(start_date, watermark.synced_from)
+                commits.extend(older_commits)
+                pull_requests.extend(older_prs)
+
+            # Delta: new commits, plus any stored-range PR whose state or merge time moved.
+            # A window that ends inside the stored range has nothing newer to fetch.
+            if end_date > watermark.synced_until:
+                delta_start = watermark.synced_until - SYNC_OVERLAP
+                new_commits, changed_prs = self._fetch(
+                    delta_start, end_date,
+                    pulls_updated_since=delta_start,
+                    pulls_created_since=synced_from
+                )
+                commits.extend(new_commits)
+                pull_requests.extend(changed_prs)
+
+        self.store.upsert_commits(self.full_name, commits)
+        self.store.upsert_pull_requests(self.full_name, pull_requests)
+        # Rebuild developer rollups for the days this sync touched
+        touched = [c["date"] for c in commits if c.get("date")]
+        touched += [t for pr in pull_requests for t in (pr.get("created_at"), pr.get("merged_at")) if t]
+        if touched:
+            self.store.refresh_developer_rollups(self.full_name, min(touched), max(touched))
+        self.store.set_watermark(self.full_name, synced_from, synced_until)
+
+        self.logger.info(
+            f"Synced {self.full_name}: fetched {len(commits)} commits and {len(pull_requests)} PRs"
+        )
+
+    def _fetch(self, since: datetime, until: datetime,
+               pulls_updated_since: Optional[datetime] = None,
+               pulls_created_since: Optional[datetime] = None) -> Tuple[List[Dict], List[Dict]]:
+        """Fetch commits dated in [since, until] and PRs updated/created since the given bounds
+
+        Commit history is split into time slices that are paged concurrently
+        alongside the PR listing; in REST mode the per-item detail fetches then
+        fan out over the same pool. Output order does not depend on timing:
+        commits newest first, PRs most recently updated first.
+        """
+        pulls_updated_since = pulls_updated_since or since
+        pulls_created_since = pulls_created_since or since
+
+        if self.mode == "graphql" and self.concurrency == 1:
+            # One request advances both cursors; nothing to overlap
+            return self.graphql.fetch_history(
+                self.owner, self.repo_name, since, until,
+                pulls_updated_since=pulls_updated_since,
+                pulls_created_since=pulls_created_since
+            )
+
+        repo = None if self.mode == "graphql" else self.github.get_repo(f"{self.owner}/{self.repo_name}")
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            pulls_future = pool.submit(
+                self._list_pull_requests, repo, pulls_updated_since, pulls_created_since
+            )
+            slice_futures = [
+                pool.submit(self._list_commits, repo, slice_start, slice_end)
+                for slice_start, slice_end in _split_window(since, until, self.concurrency)
+            ]
+            commits = [commit for future in slice_futures for commit in future.result()]
+            pull_requests = pulls_future.result()
+
+            if repo is not None:
+                commits = list(pool.map(self._commit_to_dict, commits))
+                pull_requests = list(pool.map(self._pull_request_to_dict, pull_requests))
+
+        # Slice boundaries are inclusive on both ends, so drop duplicates
+        commits = list({commit["sha"]: commit for commit in commits}.values())
+        commits.sort(key=lambda c: (c["date"], c["sha"]), reverse=True)
+        pull_requests.sort(key=lambda pr: (pr["updated_at"], pr["number"]), reverse=True)
+        return commits, pull_requests
+
+    def _list_commits(self, repo, since: datetime, until: datetime) -> List[Any]:
+        """Page one slice of commit history; REST items still need their detail fetch"""
+        if repo is None:
+            return self.graphql.fetch_commits(self.owner, self.repo_name, since, until)
+        return list(repo.get_commits(since=since, until=until))
+
+    def _list_pull_requests(self, repo, updated_since: datetime, created_since: datetime) -> List[Any]:
+        """Page PRs in the window; REST items still need their detail fetch"""
+        if repo is None:
+            return self.graphql.fetch_pull_requests(
+                self.owner, self.repo_name, updated_since, created_since
+            )
+        return list(self._iter_window_pulls(repo, updated_since, created_since))
+
+    def _iter_window_pulls(self, repo, updated_since: datetime, created_since: datetime):
+        """Yield PRs updated since ``updated_since`` and created since ``created_since``
+
+        Pages are sorted by update time, so paging stops at the first PR last
+        touched before the window instead of walking the whole PR history.
+        """
+        for pr in repo.get_pulls(state="all", sort="updated", direction="desc"):
+            if pr.updated_at < updated_since:
+                break
+            if pr.created_at >= created_since:
+                yield pr
+
+    @staticmethod
+    def _commit_to_dict(commit) -> Dict[str, Any]:
+        """Build the commit dict; stats/files trigger PyGithub's lazy detail fetch"""
+        return {
+            "sha": commit.sha,
+            "author": commit.author.login if commit.author else "unknown",
+            "message": commit.commit.message,
+            "date": commit.commit.author.date,
+            "additions": commit.stats.additions,
+            "deletions": commit.stats.deletions,
+            "total": commit.stats.total,
+            "files": len(commit.files)
+        }
+
+    @staticmethod
+    def _pull_request_to_dict(pr) -> Dict[str, Any]:
+        """Build the PR dict; additions/deletions/etc. trigger PyGithub's lazy detail fetch"""
+        return {
+            "number": pr.number,
+            "title": pr.title,
+            "author": pr.user.login,
+            "state": pr.state,
+            "created_at": pr.created_at,
+            "updated_at": pr.updated_at,
+            "merged_at": pr.merged_at,
+            "additions": pr.additions,
+            "deletions": pr.deletions,
+            "changed_files": pr.changed_files,
+            "review_comments": pr.review_comments
+        }
+
+
+def harvest_repo_shard(full_name: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+    """Process-pool entry point: harvest one repo and compute its own metrics
+
+    Every commit and PR is tagged with its repo so shards can be merged into a
+    single state, and rows are returned as columnar tables to keep the
+    inter-process payload small. Failures are returned rather than raised so
+    one broken repo does not take the whole org report down.
+    """
+    try:
+        # Workers are reused across repos, so their clients are too
+        commits, pull_requests = RepoHarvester.shared(full_name).harvest(start_date, end_date)
+        for item in commits + pull_requests:
+            item["repo"] = full_name
+        commits = CommitTable.from_records(commits)
+        pull_requests = PullRequestTable.from_records(pull_requests)
+        metrics = MetricsEngine.compute(commits, pull_requests)
+        return {
+            "repo": full_name,
+            "commits": commits,
+            "pull_requests": pull_requests,
+            "metrics": {
+                "dora_metrics": metrics["dora_metrics"],
+                "code_health": metrics["code_health"]
+            },
+            "error": None
+        }
+    except Exception as e:
+        return {
+            "repo": full_name,
+            "commits": CommitTable.empty(),
+            "pull_requests": PullRequestTable.empty(),
+            "metrics": {},
+            "error": str(e)
+        }
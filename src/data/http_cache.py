@@ -0,0 +1,240 @@
+# src/data/http_cache.py
+from typing import Dict, Any, Optional
+import hashlib
+import logging
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from github.Requester import (
+    Requester,
+    HTTPRequestsConnectionClass,
+    HTTPSRequestsConnectionClass,
+)
+from src.storage.sqlite_store import SQLiteStore, hit_stats
+
+DEFAULT_CACHE_PATH = ".cache/github_http.sqlite"
+DEFAULT_MAX_MB = 256
+
+# Headers describing the wire encoding of the original payload; the stored body
+# is already decoded, so replaying them would mislead the consumer.
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class HTTPCache:
+    """SQLite store of GET responses with their validators, evicted least-recently-used"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger("HTTPCache")
+        self._lock = threading.Lock()
+        self.hits = 0          # 304 revalidations served from the store
+        self.misses = 0        # full payloads downloaded
+        self._store = SQLiteStore(path, max_bytes=max_bytes, replaces=("responses",))
+
+    @staticmethod
+    def key_for(request: requests.PreparedRequest) -> str:
+        """Cache key: URL plus the headers GitHub varies responses on"""
+        parts = [
+            request.method or "GET",
+            request.url or "",
+            request.headers.get("Authorization", ""),
+            request.headers.get("Accept", ""),
+        ]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for a key, if any"""
+        # Only a 304 makes it a hit, so the entry is touched in record_hit
+        entry = self._store.get(key, touch=False)
+        if entry is None:
+            return None
+        meta, body = entry
+        return {
+            "etag": meta.get("etag"),
+            "last_modified": meta.get("last_modified"),
+            "headers": meta["headers"],
+            "body": body,
+        }
+
+    def record_hit(self, key: str):
+        """Count a revalidated response and mark the entry recently used"""
+        with self._lock:
+            self.hits += 1
+        self._store.touch(key)
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def store(self, key: str, url: str, headers: Dict[str, str], body: bytes):
+        """Save a response that carries an ETag or Last-Modified validator"""
+        headers = {k: v for k, v in headers.items() if k.lower() not in _HOP_HEADERS}
+        etag = headers.get("ETag") or headers.get("etag")
+        last_modified = headers.get("Last-Modified") or headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+        self._store.put(key, body, {"url": url, "etag": etag, "last_modified": last_modified, "headers": headers})
+
+    @property
+    def evictions(self) -> int:
+        return self._store.evictions
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current footprint"""
+        with self._lock:
+            stats = hit_stats(self.hits, self.misses)
+        return {**stats, **self._store.stats()}
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """Transport adapter that revalidates cached GETs with If-None-Match / If-Modified-Since"""
+
+    def __init__(self, cache: HTTPCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+
+        key = self.cache.key_for(request)
+        entry = self.cache.lookup(key)
+        if entry:
+            if entry["etag"]:
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self.cache.record_hit(key)
+            return self._replay(request, response, entry)
+
+        self.cache.record_miss()
+        if response.status_code == 200:
+            self.cache.store(key, request.url, dict(response.headers), response.content)
+        return response
+
+    @staticmethod
+    def _replay(request: requests.PreparedRequest, not_modified: requests.Response,
+                entry: Dict[str, Any]) -> requests.Response:
+        """Rebuild a 200 from the stored body, keeping fresh headers (rate limits) from the 304"""
+        headers = CaseInsensitiveDict(entry["headers"])
+        headers.update({k: v for k, v in not_modified.headers.items() if k.lower() not in _HOP_HEADERS})
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = headers
+        response._content = entry["body"]
+        response.url = request.url
+        response.request = request
+        response.encoding = not_modified.encoding or "utf-8"
+        response.elapsed = not_modified.elapsed
+        response.connection = not_modified.connection
+        not_modified.close()
+        return response
+
+
+_cache: Optional[HTTPCache] = None
+_installed: Optional[HTTPCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HTTPCache]:
+    """Process-wide cache configured from GITHUB_HTTP_CACHE / GITHUB_HTTP_CACHE_MAX_MB"""
+    global _cache
+    path = os.getenv("GITHUB_HTTP_CACHE", DEFAULT_CACHE_PATH)
+    if path.lower() in ("", "0", "off", "none"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            max_mb = float(os.getenv("GITHUB_HTTP_CACHE_MAX_MB", DEFAULT_MAX_MB))
+            _cache = HTTPCache(path, int(max_mb * 1024 * 1024))
+        return _cache
+
+
+def cached_session(cache: Optional[HTTPCache] = None) -> requests.Session:
+    """A requests session whose GETs go through the conditional-request cache"""
+    session = requests.Session()
+    cache = cache or get_http_cache()
+    if cache is not None:
+        adapter = CachingHTTPAdapter(cache)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return session
+
+
+class _CachedConnectionMixin:
+    """PyGithub connection whose session routes through CachingHTTPAdapter
+
+    PyGithub stops persisting connections once classes are injected, so the
+    session is shared per host to keep the keep-alive pool across requests.
+    Without a cache the session uses a plain adapter; the injected classes are
+    still used because they give every request its own connection object,
+    which PyGithub's persistent connection does not when called from threads.
+    """
+
+    cache: Optional[HTTPCache] = None
+    _sessions: Dict[tuple, requests.Session] = {}
+    _sessions_lock = threading.Lock()
+
+    def __init__(self, host: str, port: Optional[int] = None, **kwargs: Any):
+        super().__init__(host, port, **kwargs)
+        key = (self.protocol, self.host, self.port)
+        with self._sessions_lock:
+            shared = self._sessions.get(key)
+            if shared is None:
+                adapter_kwargs = dict(
+                    max_retries=self.retry,
+                    pool_connections=self.pool_size,
+                    pool_maxsize=self.pool_size,
+                )
+                if self.cache is not None:
+                    self.adapter = CachingHTTPAdapter(self.cache, **adapter_kwargs)
+                else:
+                    self.adapter = HTTPAdapter(**adapter_kwargs)
+                self.session.mount(f"{self.protocol}://", self.adapter)
+                self._sessions[key] = self.session
+            else:
+                self.session.close()
+                self.session = shared
+
+    def close(self) -> None:
+        # The session is shared; it lives as long as the process
+        pass
+
+
+_transport_installed = False
+
+
+def install_github_transport(cache: Optional[HTTPCache] = None):
+    """Inject shared-session connection classes into PyGithub, optionally cached"""
+    global _installed, _transport_installed
+    if _transport_installed and _installed is cache:
+        return
+
+    class CachedHTTPConnection(_CachedConnectionMixin, HTTPRequestsConnectionClass):
+        pass
+
+    class CachedHTTPSConnection(_CachedConnectionMixin, HTTPSRequestsConnectionClass):
+        pass
+
+    # Fresh session pool per installed cache
+    sessions: Dict[tuple, requests.Session] = {}
+    for connection_class in (CachedHTTPConnection, CachedHTTPSConnection):
+        connection_class.cache = cache
+        connection_class._sessions = sessions
+    Requester.injectConnectionClasses(CachedHTTPConnection, CachedHTTPSConnection)
+    _installed = cache
+    _transport_installed = True
+
+
+def install_github_cache(cache: Optional[HTTPCache] = None) -> Optional[HTTPCache]:
+    """Route all PyGithub traffic through the conditional-request cache"""
+    cache = cache or get_http_cache()
+    install_github_transport(cache)
+    return cache
@@ -0,0 +1,109 @@
+# src/graph/checkpoint.py
+from typing import Dict, Any, Optional
+from datetime import datetime
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import zlib
+from src.storage.sqlite_store import SQLiteStore, hit_stats
+
+DEFAULT_CHECKPOINT_PATH = ".cache/checkpoints.sqlite"
+DEFAULT_TTL_HOURS = 24
+DEFAULT_MAX_MB = 256
+# Bump when a node's output changes shape, so older checkpoints stop matching
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_key(node: str, inputs: Dict[str, Any], run_id: Optional[str] = None) -> str:
+    """Content address of a node execution: its name, its inputs and, for run-scoped nodes, the run"""
+    digest = hashlib.sha256(f"{CHECKPOINT_VERSION}|{node}|{run_id or ''}".encode("utf-8"))
+    for key in sorted(inputs):
+        # Pickled one by one: objects shared between inputs would otherwise change the bytes
+        value = pickle.dumps(inputs[key], protocol=pickle.HIGHEST_PROTOCOL)
+        digest.update(f"|{key}:{len(value)}|".encode("utf-8"))
+        digest.update(value)
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """Node outputs persisted across runs, keyed by checkpoint_key
+
+    Outputs are pickled and zlib-compressed; entries expire after the TTL and
+    are evicted least-recently-used past a byte budget. Each run's inputs are
+    kept too, so a failed run can be replayed under its original run id and
+    timestamp, hitting every checkpoint up to the step that failed.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+                 ttl_seconds: Optional[float] = DEFAULT_TTL_HOURS * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger("CheckpointStore")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._outputs = SQLiteStore(path, "node_outputs", max_bytes, ttl_seconds, replaces=("checkpoints",))
+        # Run inputs are a few hundred bytes each and only expire
+        self._runs = SQLiteStore(path, "checkpoint_runs", ttl_seconds=ttl_seconds, replaces=("runs",))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._outputs.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return pickle.loads(zlib.decompress(entry[1]))
+
+    def put(self, key: str, node: str, run_id: Optional[str], output: Dict[str, Any]):
+        blob = zlib.compress(pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        self._outputs.put(key, blob, {"node": node, "run_id": run_id})
+
+    def save_run(self, run_id: str, command: str, time_range: str, target_user: Optional[str],
+                 timestamp: datetime):
+        inputs = {"command": command, "time_range": time_range, "target_user": target_user,
+                  "timestamp": timestamp.isoformat()}
+        self._runs.put(run_id, b"", inputs)
+
+    def load_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """A run's original command, time_range, target_user and timestamp"""
+        entry = self._runs.get(run_id, touch=False)
+        if entry is None:
+            return None
+        inputs = entry[0]
+        inputs["timestamp"] = datetime.fromisoformat(inputs["timestamp"])
+        return inputs
+
+    @property
+    def evictions(self) -> int:
+        return self._outputs.evictions
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = hit_stats(self.hits, self.misses)
+        return {**stats, **self._outputs.stats()}
+
+
+_store: Optional[CheckpointStore] = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """Process-wide store configured from WORKFLOW_CHECKPOINT_* env vars
+
+    WORKFLOW_CHECKPOINTS is "sqlite" (default) or "off".
+    """
+    global _store
+    backend = os.getenv("WORKFLOW_CHECKPOINTS", "sqlite").lower()
+    if backend in ("", "0", "off", "none"):
+        return None
+    with _store_lock:
+        if _store is None:
+            ttl_hours = float(os.getenv("WORKFLOW_CHECKPOINT_TTL_HOURS", DEFAULT_TTL_HOURS))
+            max_mb = float(os.getenv("WORKFLOW_CHECKPOINT_MAX_MB", DEFAULT_MAX_MB))
+            path = os.getenv("WORKFLOW_CHECKPOINT_PATH", DEFAULT_CHECKPOINT_PATH)
+            _store = CheckpointStore(path, int(max_mb * 1024 * 1024), ttl_hours * 3600 if ttl_hours > 0 else None)
+        return _store
@@ -1,26 +1,39 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, TypedDict, Annotated
 from datetime import datetime
-from langgraph.graph import GraphState
+from src.data.columnar import CommitTable, PullRequestTable
 
-class AgentState(GraphState):
+def merge_stage_errors(left: Dict[str, List[str]], right: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Nodes of one step finish in any order; keying by node keeps the merge order-free"""
+    return {**left, **right}
+
+class AgentState(TypedDict, total=False):
     # Input context
-    command: str = ""
-    time_range: str = "weekly"  # daily, weekly, monthly
-    target_user: Optional[str] = None
+    command: str
+    time_range: str  # daily, weekly, monthly, last_N_days, Q3 [2024], YYYY-MM-DD..YYYY-MM-DD
+    target_user: Optional[str]
+    repos: List[str]  # multi-repo harvests only
     
     # GitHub data
-    commits: List[Dict[str, Any]] = []
-    pull_requests: List[Dict[str, Any]] = []
-    code_changes: Dict[str, Any] = {}
+    commits: CommitTable
+    pull_requests: PullRequestTable
+    code_changes: Dict[str, Any]
+    repo_metrics: Dict[str, Dict[str, Any]]  # per-repo metrics from harvest shards
+    harvest_key: str  # checkpoint key of the harvest; identifies the tables above
     
     # Analyzed metrics
-    metrics: Dict[str, Any] = {}
-    anomalies: List[Dict[str, Any]] = []
+    metrics: Dict[str, Any]
+    anomalies: List[Dict[str, Any]]
+    code_analysis: str
+    trend: List[Dict[str, Any]]  # prior snapshots plus this run's point
     
     # Generated insights
-    narrative: str = ""
-    charts: List[Dict[str, Any]] = []
+    narrative: str
+    charts: List[Dict[str, Any]]  # chart specs; see visualization.renderer.render_spec
+    summary: str
     
     # Metadata
-    timestamp: datetime = datetime.now()
-    errors: List[str] = []
\ No newline at end of file
+    run_id: str  # keys per-run hooks such as the narrative chunk handler
+    timestamp: datetime
+    errors: List[str]
+    # Errors raised inside graph nodes, folded into ``errors`` in DAG order at the end
+    stage_errors: Annotated[Dict[str, List[str]], merge_stage_errors]
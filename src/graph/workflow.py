@@ -1,69 +1,275 @@
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, AsyncIterator, Callable, Optional
 from datetime import datetime
-from langgraph.graph import StateGraph, END
+from functools import cached_property
+import asyncio
+import logging
+import uuid
+from src.clients import ClientRegistry, get_client_registry
 from src.graph.state import AgentState
 from src.agents.dataharvester import DataHarvesterAgent
 from src.agents.diffanalyst import DiffAnalystAgent
 from src.agents.insightnarrator import InsightNarratorAgent
-from src.metrics.calculator import MetricsCalculator
+from src.graph.checkpoint import CheckpointStore, checkpoint_key, get_checkpoint_store
+from src.llm.streaming import ChunkHandler, get_chunk_handler, register_chunk_handler, unregister_chunk_handler
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableLambda
+
+# Topological order of the DAG; stage errors are folded into state["errors"] in this order
+NODE_ORDER = [
+    "harvest_data",
+    "analyze_metrics",
+    "analyze_code", "build_charts", "persist_metrics", "query_trends",
+    "narrate", "build_trend_chart",
+    "assemble_report",
+]
+
+# State each node reads; a node's checkpoint is keyed by the hash of these
+NODE_INPUTS = {
+    "harvest_data": ("command", "time_range", "target_user", "timestamp"),
+    # The harvested tables stand in as the key of the checkpoint that holds them
+    "analyze_metrics": ("harvest_key", "time_range"),
+    "analyze_code": ("metrics", "anomalies"),
+    "build_charts": ("metrics",),
+    "persist_metrics": ("metrics", "time_range", "target_user"),
+    "query_trends": ("metrics", "time_range", "target_user", "timestamp"),
+    "narrate": ("metrics", "anomalies", "code_analysis", "time_range"),
+    "build_trend_chart": ("trend", "charts"),
+}
+# Nodes that read or write the outside world are only reused when resuming the same run.
+# narrate logs its conversation for the audit trail; a new run's LLM call is met by the response cache
+RUN_SCOPED_NODES = {"harvest_data", "persist_metrics", "query_trends", "narrate"}
+# Nodes whose checkpoint key is published on a channel, for downstream keys to hash instead of their outputs
+KEY_CHANNELS = {"harvest_data": "harvest_key"}
 
 class DevInsightsWorkflow:
-    def __init__(self):
-        self.harvester = DataHarvesterAgent()
-        self.analyst = DiffAnalystAgent()
-        self.narrator = InsightNarratorAgent()
-        self.metrics_calc = MetricsCalculator()
-        
-        # Build workflow
-        self.workflow = self._build_workflow()
+    def __init__(self, clients: Optional[ClientRegistry] = None,
+                 checkpoints: Optional[CheckpointStore] = None):
+        # Agents share the process's clients, so building a workflow per report is cheap
+        self.clients = clients or get_client_registry()
+        self.harvester = DataHarvesterAgent(self.clients)
+        self.analyst = DiffAnalystAgent(self.clients)
+        self.narrator = InsightNarratorAgent(self.clients)
+        self._checkpoints = checkpoints
+    
+    @cached_property
+    def workflow(self):
+        """Compiled graph, built on first run so construction stays import-light"""
+        return self._build_workflow()
+    
+    @cached_property
+    def checkpoints(self) -> Optional[CheckpointStore]:
+        """Node output store; None when WORKFLOW_CHECKPOINTS is off"""
+        return self._checkpoints or get_checkpoint_store()
+    
+    def warm(self):
+        """Pay the deferred startup costs now: graph, LLM clients and database"""
+        self.workflow
+        for agent in (self.analyst, self.narrator):
+            agent.llm
+            agent.db
+        self.harvester.harvester
+    
+    def _build_workflow(self):
+        """Build the LangGraph workflow
         
-    def _build_workflow(self) -> StateGraph:
-        """Build the LangGraph workflow"""
+        harvest_data -> analyze_metrics fans out to the analyst's LLM call,
+        chart specs, snapshot persistence and the trend query, which run in
+        the same step. narrate waits on all four; the trend chart spec is
+        built alongside it, and assemble_report joins the two. Charts are
+        only rendered when a consumer asks for an image (render_spec), so
+        the critical path is harvest plus the two LLM calls.
+        """
+        from langgraph.graph import StateGraph, END
         workflow = StateGraph(AgentState)
         
         # Add nodes
-        workflow.add_node("harvest_data", self.harvester.process)
-        workflow.add_node("analyze_diffs", self._enhanced_analysis)
-        workflow.add_node("generate_insights", self.narrator.process)
+        workflow.add_node("harvest_data", self._node("harvest_data", self.harvester.process))
+        workflow.add_node("analyze_metrics", self._node("analyze_metrics", self.analyst.analyze_metrics))
+        workflow.add_node("analyze_code", self._node("analyze_code", self.analyst.analyze_code))
+        workflow.add_node("build_charts", self._node("build_charts", self.narrator.build_charts))
+        workflow.add_node("persist_metrics", self._node("persist_metrics", self.narrator.persist_metrics))
+        workflow.add_node("query_trends", self._node("query_trends", self.narrator.query_trends))
+        workflow.add_node("narrate", self._node("narrate", self.narrator.narrate))
+        workflow.add_node("build_trend_chart", self._node("build_trend_chart", self.narrator.build_trend_chart))
+        workflow.add_node("assemble_report", self._assemble_report)
         
         # Add edges
-        workflow.add_edge("harvest_data", "analyze_diffs")
-        workflow.add_edge("analyze_diffs", "generate_insights")
-        workflow.add_edge("generate_insights", END)
+        workflow.add_edge("harvest_data", "analyze_metrics")
+        for branch in ("analyze_code", "build_charts", "persist_metrics", "query_trends"):
+            workflow.add_edge("analyze_metrics", branch)
+            # Every branch is one step long, so narrate is triggered once, after all of them
+            workflow.add_edge(branch, "narrate")
+        workflow.add_edge("query_trends", "build_trend_chart")
+        workflow.add_edge("narrate", "assemble_report")
+        workflow.add_edge("build_trend_chart", "assemble_report")
+        workflow.add_edge("assemble_report", END)
         
         # Set entry point
         workflow.set_entry_point("harvest_data")
         
         return workflow.compile()
     
-    def _enhanced_analysis(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Enhanced analysis with metrics calculation"""
-        # First run diff analyst
-        state = self.analyst.process(state)
+    def _node(self, name: str, step: Callable[[Dict[str, Any]], Dict[str, Any]]) -> "RunnableLambda":
+        """Wrap an agent step as a graph node with sync and async entry points
         
-        # Enhance with additional metrics calculations
-        commits = state.get("commits", [])
-        prs = state.get("pull_requests", [])
+        The step sees a private errors list; what it appends is returned under
+        ``stage_errors[name]``. Nodes running in the same step therefore never
+        write the same channel, which keeps the merged state independent of
+        completion order.
         
-        # Calculate additional metrics
-        dora_metrics = self.metrics_calc.calculate_dora_metrics(commits, prs)
-        code_health = self.metrics_calc.calculate_code_health_metrics(commits)
+        With a checkpoint store, a step that finishes without errors has the
+        values it changed saved under the hash of its NODE_INPUTS, and a
+        later execution with identical inputs reuses them instead of running
+        the step. A failed step is never saved, so a retry reruns only it.
+        Nodes in KEY_CHANNELS also return the key their outputs are saved
+        under, once they are.
+        """
+        def run(state: Dict[str, Any]) -> Dict[str, Any]:
+            # Channels nobody has written yet read as None; agents expect them absent
+            scratch = {k: v for k, v in state.items() if v is not None}
+            scratch["errors"] = []
+            key = self._checkpoint_key(name, scratch)
+            saved = self.checkpoints.get(key) if key else None
+            if saved is not None:
+                # Only the channels the step wrote: nodes of one step must not write the same channel
+                updates = dict(saved)
+                handler = get_chunk_handler(scratch.get("run_id"))
+                if handler is not None and saved.get("narrative"):
+                    # Streaming consumers still see the narrative, as one chunk
+                    handler(saved["narrative"])
+                if name in KEY_CHANNELS:
+                    updates[KEY_CHANNELS[name]] = key
+                updates["stage_errors"] = {name: []}
+                return updates
+            
+            inputs = dict(scratch)
+            updates = step(scratch)
+            updates = {k: v for k, v in updates.items() if k not in ("errors", "stage_errors")}
+            if key and not scratch["errors"]:
+                # Some agents return the whole state they were given; keep only what the step changed
+                changed = {k: v for k, v in updates.items() if inputs.get(k) is not v}
+                try:
+                    self.checkpoints.put(key, name, scratch.get("run_id"), changed)
+                    if name in KEY_CHANNELS:
+                        updates[KEY_CHANNELS[name]] = key
+                except Exception as e:
+                    logging.getLogger("DevInsightsWorkflow").warning(f"Checkpointing {name} failed: {e}")
+            updates["stage_errors"] = {name: scratch["errors"]}
+            return updates
         
-        # Merge with existing metrics
-        if "metrics" in state:
-            state["metrics"]["dora_metrics"] = dora_metrics
-            state["metrics"]["code_health"] = code_health
+        async def arun(state: Dict[str, Any]) -> Dict[str, Any]:
+            # Agent steps block on HTTP, the LLM and the DB; keep the event loop free
+            return await asyncio.to_thread(run, state)
         
-        return state
+        from langchain_core.runnables import RunnableLambda
+        return RunnableLambda(run, afunc=arun, name=name)
+    
+    def _checkpoint_key(self, name: str, state: Dict[str, Any]) -> Optional[str]:
+        if self.checkpoints is None:
+            return None
+        if any(channel in NODE_INPUTS[name] and channel not in state for channel in KEY_CHANNELS.values()):
+            # The upstream outputs were never saved, so nothing identifies them short of hashing them
+            return None
+        inputs = {k: state[k] for k in NODE_INPUTS[name] if k in state}
+        run_id = state.get("run_id") if name in RUN_SCOPED_NODES else None
+        try:
+            return checkpoint_key(name, inputs, run_id)
+        except Exception as e:
+            # Unpicklable inputs just run uncheckpointed
+            logging.getLogger("DevInsightsWorkflow").warning(f"Cannot checkpoint {name}: {e}")
+            return None
+    
+    def _assemble_report(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Fan-in: executive summary, and errors in DAG order"""
+        state = {k: v for k, v in state.items() if v is not None}
+        stage_errors = state.get("stage_errors", {})
+        errors = list(state.get("errors", []))
+        for name in NODE_ORDER:
+            errors.extend(stage_errors.get(name, []))
+        return {**self.narrator.summarize(state), "errors": errors}
     
-    def run(self, command: str, time_range: str = "weekly", 
-            target_user: str = None) -> Dict[str, Any]:
-        """Execute the workflow"""
-        initial_state = {
+    def _initial_state(self, command: str, time_range: str, target_user: str,
+                       run_id: Optional[str] = None, timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+        state = {
             "command": command,
             "time_range": time_range,
             "target_user": target_user,
-            "timestamp": datetime.now()
+            "run_id": run_id or uuid.uuid4().hex,
+            # Naive UTC, like the snapshot timestamps it is compared against
+            "timestamp": timestamp or datetime.utcnow(),
+            "errors": [],
+            "stage_errors": {}
         }
+        if self.checkpoints is not None and run_id is None:
+            self.checkpoints.save_run(state["run_id"], command, time_range, target_user, state["timestamp"])
+        return state
+    
+    def _resume_state(self, run_id: str) -> Dict[str, Any]:
+        """Initial state of an earlier run, so its checkpoints match again"""
+        run = self.checkpoints.load_run(run_id) if self.checkpoints is not None else None
+        if run is None:
+            raise KeyError(f"No checkpointed run {run_id}")
+        return self._initial_state(run["command"], run["time_range"], run["target_user"],
+                                   run_id=run_id, timestamp=run["timestamp"])
+    
+    def run(self, command: str, time_range: str = "weekly",
+            target_user: str = None,
+            on_narrative_chunk: Optional[ChunkHandler] = None) -> Dict[str, Any]:
+        """Execute the workflow
+        
+        ``on_narrative_chunk`` is called with each piece of the narrative as the
+        model produces it (on a worker thread), before the report completes.
+        """
+        return self._invoke(self._initial_state(command, time_range, target_user), on_narrative_chunk)
+    
+    def resume(self, run_id: str, on_narrative_chunk: Optional[ChunkHandler] = None) -> Dict[str, Any]:
+        """Rerun an earlier run by its ``run_id``: steps that succeeded are reused, the rest run"""
+        return self._invoke(self._resume_state(run_id), on_narrative_chunk)
+    
+    def _invoke(self, state: Dict[str, Any], on_narrative_chunk: Optional[ChunkHandler]) -> Dict[str, Any]:
+        if on_narrative_chunk is not None:
+            register_chunk_handler(state["run_id"], on_narrative_chunk)
+        try:
+            return self.workflow.invoke(state)
+        finally:
+            unregister_chunk_handler(state["run_id"])
+    
+    async def arun(self, command: str, time_range: str = "weekly",
+                   target_user: str = None,
+                   on_narrative_chunk: Optional[ChunkHandler] = None) -> Dict[str, Any]:
+        """Execute the workflow on the running event loop"""
+        return await self._ainvoke(self._initial_state(command, time_range, target_user), on_narrative_chunk)
+    
+    async def aresume(self, run_id: str, on_narrative_chunk: Optional[ChunkHandler] = None) -> Dict[str, Any]:
+        return await self._ainvoke(self._resume_state(run_id), on_narrative_chunk)
+    
+    async def _ainvoke(self, state: Dict[str, Any], on_narrative_chunk: Optional[ChunkHandler]) -> Dict[str, Any]:
+        if on_narrative_chunk is not None:
+            register_chunk_handler(state["run_id"], on_narrative_chunk)
+        try:
+            return await self.workflow.ainvoke(state)
+        finally:
+            unregister_chunk_handler(state["run_id"])
+    
+    async def astream(self, command: str, time_range: str = "weekly",
+                      target_user: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield {"type": "narrative_chunk", "text": ...} events, then {"type": "report", "state": ...}"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def on_chunk(text: str):
+            # Called from a worker thread
+            loop.call_soon_threadsafe(queue.put_nowait, text)
         
-        return self.workflow.invoke(initial_state)
\ No newline at end of file
+        task = asyncio.ensure_future(self.arun(command, time_range, target_user, on_narrative_chunk=on_chunk))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                text = await queue.get()
+                if text is None:
+                    break
+                yield {"type": "narrative_chunk", "text": text}
+            yield {"type": "report", "state": task.result()}
+        finally:
+            task.cancel()
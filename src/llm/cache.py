@@ -0,0 +1,167 @@
+# src/llm/cache.py
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from src.storage.sqlite_store import SQLiteStore, hit_stats
+
+DEFAULT_CACHE_PATH = ".cache/llm_responses.sqlite"
+DEFAULT_TTL_HOURS = 24
+DEFAULT_MAX_MB = 64
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def cache_key(prompt: str, model_name: str, temperature: float, max_output_tokens: int,
+              stop: Optional[List[str]] = None) -> str:
+    """Content address of a generation request"""
+    payload = json.dumps(
+        [prompt, model_name, temperature, max_output_tokens, stop or []],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Base for LLM response caches; backends implement _get/_set/_entries"""
+
+    def __init__(self, ttl_seconds: Optional[float] = DEFAULT_TTL_HOURS * 3600):
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(type(self).__name__)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        self._set(key, value)
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        """Stored response for a key, or None if missing or expired"""
+
+    @abstractmethod
+    def _set(self, key: str, value: str):
+        """Store a response, expiring after ``ttl_seconds``"""
+
+    @abstractmethod
+    def _entries(self) -> int:
+        """Number of stored responses"""
+
+    @property
+    @abstractmethod
+    def evictions(self) -> int:
+        """Entries dropped so far to stay within the bound"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            stats = hit_stats(self.hits, self.misses)
+        return {**stats, "evictions": self.evictions, "entries": self._entries()}
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Per-process LRU cache bounded by entry count"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: Optional[float] = DEFAULT_TTL_HOURS * 3600):
+        super().__init__(ttl_seconds)
+        self.max_entries = max_entries
+        self._evictions = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str):
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def _entries(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+
+class SQLiteResponseCache(ResponseCache):
+    """Responses persisted across runs, evicted least-recently-used past a byte budget"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+                 ttl_seconds: Optional[float] = DEFAULT_TTL_HOURS * 3600):
+        super().__init__(ttl_seconds)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._store = SQLiteStore(path, max_bytes=max_bytes, ttl_seconds=ttl_seconds, replaces=("responses",))
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._store.get(key)
+        return entry[1].decode("utf-8") if entry is not None else None
+
+    def _set(self, key: str, value: str):
+        self._store.put(key, value.encode("utf-8"))
+
+    def _entries(self) -> int:
+        return self._store.entries()
+
+    @property
+    def evictions(self) -> int:
+        return self._store.evictions
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "bytes": self._store.stats()["bytes"]}
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache configured from LLM_CACHE_* env vars
+
+    LLM_CACHE_BACKEND is "sqlite" (default), "memory" or "off".
+    """
+    global _cache
+    backend = os.getenv("LLM_CACHE_BACKEND", "sqlite").lower()
+    if backend in ("", "0", "off", "none"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            ttl_hours = float(os.getenv("LLM_CACHE_TTL_HOURS", DEFAULT_TTL_HOURS))
+            ttl_seconds = ttl_hours * 3600 if ttl_hours > 0 else None
+            if backend == "memory":
+                max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+                _cache = InMemoryResponseCache(max_entries, ttl_seconds)
+            else:
+                max_mb = float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_MB))
+                path = os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+                _cache = SQLiteResponseCache(path, int(max_mb * 1024 * 1024), ttl_seconds)
+        return _cache
@@ -1,8 +1,10 @@
 import os
-from typing import Any, List, Optional
+from typing import Any, Iterator, List, Optional
 from langchain.llms.base import LLM
 from langchain.callbacks.manager import CallbackManagerForLLMRun
+from langchain_core.outputs import GenerationChunk
 import google.generativeai as genai
+from src.llm.cache import ResponseCache, cache_key, get_response_cache
 
 class GeminiLLM(LLM):
     """Custom LangChain wrapper for Google Gemini"""
@@ -10,11 +12,15 @@ class GeminiLLM(LLM):
     model_name: str = "gemini-1.5-flash"
     temperature: float = 0.7
     max_output_tokens: int = 2048
+    client: Any = None  #: :meta private:
+    # Generations keyed on prompt and sampling settings; None disables caching
+    response_cache: Optional[ResponseCache] = None
     
     def __init__(self, **kwargs):
+        kwargs.setdefault("response_cache", get_response_cache())
         super().__init__(**kwargs)
         genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-        self.model = genai.GenerativeModel(self.model_name)
+        self.client = genai.GenerativeModel(self.model_name)
     
     @property
     def _llm_type(self) -> str:
@@ -27,17 +33,67 @@ class GeminiLLM(LLM):
         run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> str:
-        generation_config = genai.types.GenerationConfig(
-            temperature=self.temperature,
-            max_output_tokens=self.max_output_tokens,
-        )
+        # Callers wanting a fresh generation pass use_cache=False
+        key = self._cache_key(prompt, stop, kwargs.pop("use_cache", True))
+        if key:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
         
-        response = self.model.generate_content(
+        response = self.client.generate_content(
             prompt,
-            generation_config=generation_config
+            generation_config=self._generation_config(stop)
         )
         
+        if key:
+            self.response_cache.set(key, response.text)
         return response.text
+    
+    def _stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        """Yield text as Gemini produces it; a cached response comes back as one chunk"""
+        key = self._cache_key(prompt, stop, kwargs.pop("use_cache", True))
+        cached = self.response_cache.get(key) if key else None
+        if cached is not None:
+            texts = [cached]
+        else:
+            response = self.client.generate_content(
+                prompt,
+                generation_config=self._generation_config(stop),
+                stream=True
+            )
+            texts = (part.text for part in response)
+        
+        parts = []
+        for text in texts:
+            if not text:
+                continue
+            parts.append(text)
+            chunk = GenerationChunk(text=text)
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+        
+        # Only a completed stream is cached; an abandoned one may be truncated
+        if key and cached is None:
+            self.response_cache.set(key, "".join(parts))
+    
+    def _cache_key(self, prompt: str, stop: Optional[List[str]], use_cache: bool) -> Optional[str]:
+        if not use_cache or self.response_cache is None:
+            return None
+        return cache_key(prompt, self.model_name, self.temperature, self.max_output_tokens, stop)
+    
+    def _generation_config(self, stop: Optional[List[str]]) -> "genai.types.GenerationConfig":
+        return genai.types.GenerationConfig(
+            temperature=self.temperature,
+            max_output_tokens=self.max_output_tokens,
+            stop_sequences=stop,
+        )
 
     @property
     def _identifying_params(self) -> dict:
@@ -0,0 +1,28 @@
+# src/llm/streaming.py
+from typing import Callable, Dict, Optional
+import threading
+
+ChunkHandler = Callable[[str], None]
+
+# Handlers are looked up by run id rather than carried in the graph state, which
+# only holds data; nodes run on worker threads, hence the lock.
+_handlers: Dict[str, ChunkHandler] = {}
+_lock = threading.Lock()
+
+
+def register_chunk_handler(run_id: str, handler: ChunkHandler):
+    """Forward narrative chunks of a workflow run to ``handler``"""
+    with _lock:
+        _handlers[run_id] = handler
+
+
+def unregister_chunk_handler(run_id: str):
+    with _lock:
+        _handlers.pop(run_id, None)
+
+
+def get_chunk_handler(run_id: Optional[str]) -> Optional[ChunkHandler]:
+    if run_id is None:
+        return None
+    with _lock:
+        return _handlers.get(run_id)
@@ -0,0 +1,375 @@
+# src/metrics/anomaly.py
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import math
+import numpy as np
+from src.data.columnar import CommitTable
+
+# Baselines switch from exact Welford to exponentially weighted updates after this
+# many samples, and quantile sketches rotate epochs at the same size.
+DEFAULT_WINDOW = 200
+# Samples an author needs before their own baseline replaces the team's
+DEFAULT_MIN_SAMPLES = 20
+# How far back a commit may be dated and still be treated as new
+REPLAY_HORIZON = timedelta(days=30)
+MAX_FLAGGED = 5000
+
+
+class RunningStats:
+    """Mean and variance with O(1) updates
+
+    Exact (Welford) for the first ``window`` samples, then exponentially
+    weighted so the baseline tracks the last ~window commits.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0  # population variance, like np.std
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        if self.count <= self.window:
+            self.mean += delta / self.count
+            self.var += (delta * (x - self.mean) - self.var) / self.count
+        else:
+            alpha = 2.0 / (self.window + 1)
+            self.mean += alpha * delta
+            self.var = (1 - alpha) * (self.var + alpha * delta * delta)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.var, 0.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "mean": self.mean, "var": self.var}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], window: int = DEFAULT_WINDOW) -> "RunningStats":
+        stats = cls(window)
+        stats.count, stats.mean, stats.var = data["count"], data["mean"], data["var"]
+        return stats
+
+
+class P2Quantile:
+    """Single-quantile estimate in constant space (Jain & Chlamtac's P² algorithm)"""
+
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self.heights: List[float] = []
+        self.positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self.increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float):
+        self.count += 1
+        h = self.heights
+        if len(h) < 5:
+            h.append(x)
+            h.sort()
+            return
+
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if h[i] <= x < h[i + 1])
+
+        for i in range(k + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        n = self.positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1.0 if d > 0 else -1.0
+                candidate = h[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not h[i - 1] < candidate < h[i + 1]:
+                    j = i + int(d)
+                    candidate = h[i] + d * (h[j] - h[i]) / (n[j] - n[i])
+                h[i] = candidate
+                n[i] += d
+
+    def value(self) -> Optional[float]:
+        if not self.heights:
+            return None
+        if self.count < 5:
+            return self.heights[round(self.p * (len(self.heights) - 1))]
+        return self.heights[2]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"p": self.p, "count": self.count, "heights": self.heights,
+                "positions": self.positions, "desired": self.desired}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "P2Quantile":
+        sketch = cls(data["p"])
+        sketch.count = data["count"]
+        sketch.heights = list(data["heights"])
+        sketch.positions = list(data["positions"])
+        sketch.desired = list(data["desired"])
+        return sketch
+
+
+class RollingQuantile:
+    """Quantile over roughly the last ``window`` samples
+
+    Two P² sketches cover consecutive epochs; when the current one fills it
+    replaces the previous and a fresh one starts, so old data ages out.
+    """
+
+    def __init__(self, p: float, window: int = DEFAULT_WINDOW):
+        self.p = p
+        self.window = window
+        self.current = P2Quantile(p)
+        self.previous: Optional[P2Quantile] = None
+
+    def add(self, x: float):
+        self.current.add(x)
+        if self.current.count >= self.window:
+            self.previous, self.current = self.current, P2Quantile(self.p)
+
+    def value(self) -> Optional[float]:
+        # The fuller epoch gives the steadier estimate
+        if self.previous is not None and self.previous.count >= self.current.count:
+            return self.previous.value()
+        return self.current.value()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"current": self.current.to_dict(),
+                "previous": self.previous.to_dict() if self.previous else None}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], p: float, window: int = DEFAULT_WINDOW) -> "RollingQuantile":
+        quantile = cls(p, window)
+        quantile.current = P2Quantile.from_dict(data["current"])
+        if data.get("previous"):
+            quantile.previous = P2Quantile.from_dict(data["previous"])
+        return quantile
+
+
+class Baseline:
+    """Churn and files-touched statistics for one author or the whole team"""
+
+    QUANTILE = 0.95
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.churn = RunningStats(window)
+        self.files = RunningStats(window)
+        self.churn_q = RollingQuantile(self.QUANTILE, window)
+        self.files_q = RollingQuantile(self.QUANTILE, window)
+
+    @property
+    def count(self) -> int:
+        return self.churn.count
+
+    def add(self, churn: float, files: float):
+        self.churn.add(churn)
+        self.files.add(files)
+        self.churn_q.add(churn)
+        self.files_q.add(files)
+
+    def churn_threshold(self, sigmas: float) -> float:
+        """Above both mean + kσ and the rolling p95, so a heavy tail alone does not flag"""
+        return max(self.churn.mean + sigmas * self.churn.std, self.churn_q.value() or 0.0)
+
+    def files_threshold(self, sigmas: float) -> float:
+        return max(self.files.mean + sigmas * self.files.std, self.files_q.value() or 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"churn": self.churn.to_dict(), "files": self.files.to_dict(),
+                "churn_q": self.churn_q.to_dict(), "files_q": self.files_q.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], window: int = DEFAULT_WINDOW) -> "Baseline":
+        baseline = cls(window)
+        baseline.churn = RunningStats.from_dict(data["churn"], window)
+        baseline.files = RunningStats.from_dict(data["files"], window)
+        baseline.churn_q = RollingQuantile.from_dict(data["churn_q"], cls.QUANTILE, window)
+        baseline.files_q = RollingQuantile.from_dict(data["files_q"], cls.QUANTILE, window)
+        return baseline
+
+
+class AnomalyDetector:
+    """Streaming commit anomaly detector with per-author baselines
+
+    Each commit is scored against its author's baseline (or the team's while
+    the author has fewer than ``min_samples`` commits) before being folded into
+    both, so the cost per commit is constant. Already-processed commits are
+    skipped using a date watermark plus the SHAs seen within REPLAY_HORIZON,
+    which makes it safe to feed the same overlapping windows run after run.
+    Flagged commits are kept (bounded) so a report can list anomalies found in
+    earlier runs for commits still in its window; commits older than the
+    horizon are scored without touching the baselines.
+    """
+
+    SIGMAS = 2.0
+    # Static rule used until any baseline has warmed up
+    COLD_START_FILES = 20
+    # Never flag commits touching fewer files than this, whatever the baseline
+    MIN_FILES = 10
+
+    def __init__(self, window: int = DEFAULT_WINDOW, min_samples: int = DEFAULT_MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self.team = Baseline(window)
+        self.authors: Dict[str, Baseline] = {}
+        self.watermark: Optional[datetime] = None
+        self.recent: "OrderedDict[str, Optional[str]]" = OrderedDict()  # sha -> ISO date
+        self.flagged: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+
+    def observe(self, sha: str, author: str, date: Optional[datetime],
+                churn: int, files: int) -> List[Dict[str, Any]]:
+        """Score one commit, then update the baselines; returns its anomalies"""
+        if not self._is_new(sha, date):
+            return []
+
+        anomalies = self.score(sha, author, churn, files)
+        author_baseline = self.authors.get(author)
+        if author_baseline is None:
+            author_baseline = self.authors[author] = Baseline(self.window)
+        author_baseline.add(churn, files)
+        self.team.add(churn, files)
+        self._mark_processed(sha, date)
+
+        if anomalies:
+            self.flagged[sha] = anomalies
+            while len(self.flagged) > MAX_FLAGGED:
+                self.flagged.popitem(last=False)
+        return anomalies
+
+    def score(self, sha: str, author: str, churn: int, files: int) -> List[Dict[str, Any]]:
+        """Anomalies of one commit against the current baselines; changes no state"""
+        author_baseline = self.authors.get(author)
+        if author_baseline is not None and author_baseline.count >= self.min_samples:
+            baseline, scope = author_baseline, "author"
+        else:
+            baseline, scope = self.team, "team"
+
+        anomalies = []
+        short_sha = sha[:7]
+        if baseline.count >= self.min_samples:
+            churn_limit = baseline.churn_threshold(self.SIGMAS)
+            if churn > churn_limit:
+                anomalies.append({
+                    "type": "high_churn",
+                    "commit": short_sha,
+                    "author": author,
+                    "churn": churn,
+                    "baseline": scope,
+                    "message": f"High code churn detected: {churn} lines changed "
+                               f"({scope} baseline {churn_limit:.0f})",
+                    "risk_level": "high"
+                })
+            files_limit = max(baseline.files_threshold(self.SIGMAS), self.MIN_FILES)
+        else:
+            files_limit = self.COLD_START_FILES
+        if files > files_limit:
+            anomalies.append({
+                "type": "many_files_changed",
+                "commit": short_sha,
+                "author": author,
+                "files": files,
+                "baseline": scope,
+                "message": f"Many files changed in single commit: {files} files",
+                "risk_level": "medium"
+            })
+        return anomalies
+
+    def update(self, commits: CommitTable) -> List[Dict[str, Any]]:
+        """Feed a harvested table oldest-first; returns anomalies of newly seen commits"""
+        commits = CommitTable.from_records(commits)
+        order = np.argsort(commits["date"], kind="stable")
+        shas = commits["sha"][order]
+        authors = commits.author_names()[order]
+        dates = commits["date"][order].astype(datetime)
+        churn = (commits["additions"] + commits["deletions"])[order]
+        files = commits["files"][order]
+
+        anomalies = []
+        for i in range(len(order)):
+            anomalies.extend(self.observe(shas[i], authors[i], dates[i], int(churn[i]), int(files[i])))
+        return anomalies
+
+    def anomalies_for(self, commits: CommitTable) -> List[Dict[str, Any]]:
+        """Anomalies of a table's commits, in table order
+
+        Commits flagged when they were observed report those anomalies.
+        Commits dated before the replay horizon are never folded into the
+        baselines, so a historical window's are scored read-only against
+        the current ones instead.
+        """
+        commits = CommitTable.from_records(commits)
+        horizon = self.watermark - REPLAY_HORIZON if self.watermark is not None else None
+        shas = commits["sha"]
+        dates = commits["date"].astype(datetime)
+        authors = churn = files = None
+
+        anomalies = []
+        for i, sha in enumerate(shas):
+            flagged = self.flagged.get(sha)
+            if flagged is not None:
+                anomalies.extend(flagged)
+            elif horizon is not None and dates[i] is not None and dates[i] < horizon:
+                if authors is None:
+                    authors = commits.author_names()
+                    churn = commits["additions"] + commits["deletions"]
+                    files = commits["files"]
+                anomalies.extend(self.score(sha, authors[i], int(churn[i]), int(files[i])))
+        return anomalies
+
+    def _is_new(self, sha: str, date: Optional[datetime]) -> bool:
+        if sha in self.recent:
+            return False
+        if date is not None and self.watermark is not None:
+            return date >= self.watermark - REPLAY_HORIZON
+        return True
+
+    def _mark_processed(self, sha: str, date: Optional[datetime]):
+        if date is not None and (self.watermark is None or date > self.watermark):
+            self.watermark = date
+        self.recent[sha] = date.isoformat() if date is not None else None
+        # Commits dated before the horizon are rejected by date alone
+        horizon = (self.watermark - REPLAY_HORIZON).isoformat() if self.watermark else None
+        while self.recent and horizon:
+            oldest_sha, oldest_date = next(iter(self.recent.items()))
+            if oldest_date is None or oldest_date >= horizon:
+                break
+            self.recent.popitem(last=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state for persistence between runs"""
+        return {
+            "window": self.window,
+            "min_samples": self.min_samples,
+            "team": self.team.to_dict(),
+            "authors": {author: b.to_dict() for author, b in self.authors.items()},
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "recent": list(self.recent.items()),
+            "flagged": list(self.flagged.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AnomalyDetector":
+        window = data.get("window", DEFAULT_WINDOW)
+        detector = cls(window, data.get("min_samples", DEFAULT_MIN_SAMPLES))
+        detector.team = Baseline.from_dict(data["team"], window)
+        detector.authors = {author: Baseline.from_dict(b, window) for author, b in data["authors"].items()}
+        if data.get("watermark"):
+            detector.watermark = datetime.fromisoformat(data["watermark"])
+        detector.recent = OrderedDict((sha, date) for sha, date in data.get("recent", []))
+        detector.flagged = OrderedDict((sha, anomalies) for sha, anomalies in data.get("flagged", []))
+        return detector
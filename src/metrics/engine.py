@@ -0,0 +1,166 @@
+# src/metrics/engine.py
+from typing import Dict, Any, List, Union
+import numpy as np
+from src.data.columnar import CommitTable, PullRequestTable
+
+
+def _grouped_sum(codes: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+    """Per-group integer sums; bincount weights come back as float"""
+    return np.bincount(codes, weights=values, minlength=size).astype(np.int64)
+
+
+class MetricsEngine:
+    """Team, developer, repo, DORA and code-health metrics in one vectorized pass
+
+    Every aggregate the report needs is derived from a handful of column
+    reductions: per-author and per-repo bincounts plus a single lead-time
+    vector. DiffAnalystAgent._calculate_metrics and the MetricsCalculator
+    functions are views over the result.
+    """
+
+    @staticmethod
+    def compute(commits: Union[CommitTable, List[Dict]],
+                prs: Union[PullRequestTable, List[Dict]]) -> Dict[str, Any]:
+        commits = CommitTable.from_records(commits)
+        prs = PullRequestTable.from_records(prs)
+
+        additions = commits["additions"]
+        deletions = commits["deletions"]
+        sizes = additions + deletions
+        created, merged = prs["created_at"], prs["merged_at"]
+        merged_mask = ~np.isnat(merged)
+        lead_mask = merged_mask & ~np.isnat(created)
+        lead_times = (merged[lead_mask] - created[lead_mask]) / np.timedelta64(1, "h")
+
+        total_commits = len(commits)
+        total_additions = int(additions.sum())
+        total_deletions = int(deletions.sum())
+        code_churn = total_additions + total_deletions
+        merged_count = int(merged_mask.sum())
+        avg_lead_time = float(lead_times.mean()) if len(lead_times) else 0
+
+        developer_metrics = MetricsEngine._developer_metrics(commits, prs, merged_mask)
+
+        dora_metrics = {
+            "deployment_frequency": merged_count,  # merged PRs as proxy
+            "lead_time_hours": avg_lead_time,
+            "change_failure_rate": 0.0,  # Would need CI/CD data
+            "mttr_hours": 0.0  # Would need incident data
+        }
+
+        if total_commits:
+            code_health = {
+                "total_churn": code_churn,
+                "churn_rate": code_churn / total_commits,
+                "commit_size_avg": float(sizes.mean()),
+                "commit_size_std": float(sizes.std(ddof=1)) if total_commits > 1 else 0,
+                "refactor_ratio": total_deletions / total_additions if total_additions > 0 else 0,
+                "additions": total_additions,
+                "deletions": total_deletions
+            }
+        else:
+            code_health = {"churn_rate": 0, "commit_size_avg": 0, "refactor_ratio": 0}
+
+        return {
+            "developer_metrics": developer_metrics,
+            "developer_velocity": MetricsEngine.developer_velocity(developer_metrics),
+            "repo_metrics": MetricsEngine._repo_metrics(commits, prs, merged_mask, lead_mask, lead_times),
+            "team_metrics": {
+                "total_commits": total_commits,
+                "total_prs": len(prs),
+                "merged_prs": merged_count,
+                "total_additions": total_additions,
+                "total_deletions": total_deletions,
+                "code_churn": code_churn,
+                "churn_rate": code_churn / total_commits if total_commits > 0 else 0,
+                "avg_cycle_time_hours": avg_lead_time,
+                "deployment_frequency": merged_count,  # Simplified for MVP
+            },
+            "dora_metrics": dora_metrics,
+            "code_health": code_health
+        }
+
+    @staticmethod
+    def _developer_metrics(commits: CommitTable, prs: PullRequestTable,
+                           merged_mask: np.ndarray) -> Dict[str, Dict[str, int]]:
+        """Group-by-author reductions, keyed by login in first-seen order"""
+        n_commit_authors = len(commits.authors.values)
+        codes = commits["author"]
+        commit_counts = np.bincount(codes, minlength=n_commit_authors)
+        addition_sums = _grouped_sum(codes, commits["additions"], n_commit_authors)
+        deletion_sums = _grouped_sum(codes, commits["deletions"], n_commit_authors)
+        file_sums = _grouped_sum(codes, commits["files"], n_commit_authors)
+
+        n_pr_authors = len(prs.authors.values)
+        pr_codes = prs["author"]
+        pr_counts = np.bincount(pr_codes, minlength=n_pr_authors)
+        merged_counts = np.bincount(pr_codes[merged_mask], minlength=n_pr_authors)
+
+        def empty() -> Dict[str, int]:
+            return {"commits": 0, "additions": 0, "deletions": 0,
+                    "files_touched": 0, "prs_created": 0, "prs_merged": 0}
+
+        developers: Dict[str, Dict[str, int]] = {}
+        for code in np.flatnonzero(commit_counts):
+            dev = developers.setdefault(commits.authors.values[code], empty())
+            dev["commits"] = int(commit_counts[code])
+            dev["additions"] = int(addition_sums[code])
+            dev["deletions"] = int(deletion_sums[code])
+            dev["files_touched"] = int(file_sums[code])
+        for code in np.flatnonzero(pr_counts):
+            dev = developers.setdefault(prs.authors.values[code], empty())
+            dev["prs_created"] = int(pr_counts[code])
+            dev["prs_merged"] = int(merged_counts[code])
+        return developers
+
+    @staticmethod
+    def _repo_metrics(commits: CommitTable, prs: PullRequestTable, merged_mask: np.ndarray,
+                      lead_mask: np.ndarray, lead_times: np.ndarray) -> Dict[str, Dict[str, Any]]:
+        """Group-by-repo reductions; empty unless rows carry a repo"""
+        repos = sorted(set(commits.repos.values) | set(prs.repos.values))
+        if not repos:
+            return {}
+
+        # Re-code both tables onto the sorted repo list; -1 rows fall in a spill bucket
+        size = len(repos) + 1
+        index = {repo: i for i, repo in enumerate(repos)}
+        commit_map = np.array([index[r] for r in commits.repos.values] + [size - 1], dtype=np.int64)
+        pr_map = np.array([index[r] for r in prs.repos.values] + [size - 1], dtype=np.int64)
+        commit_repos = commit_map[commits["repo"]]
+        pr_repos = pr_map[prs["repo"]]
+
+        commit_counts = np.bincount(commit_repos, minlength=size)
+        addition_sums = _grouped_sum(commit_repos, commits["additions"], size)
+        deletion_sums = _grouped_sum(commit_repos, commits["deletions"], size)
+        pr_counts = np.bincount(pr_repos, minlength=size)
+        merged_counts = np.bincount(pr_repos[merged_mask], minlength=size)
+        lead_sums = np.bincount(pr_repos[lead_mask], weights=lead_times, minlength=size)
+        lead_counts = np.bincount(pr_repos[lead_mask], minlength=size)
+
+        return {
+            repo: {
+                "total_commits": int(commit_counts[i]),
+                "total_additions": int(addition_sums[i]),
+                "total_deletions": int(deletion_sums[i]),
+                "code_churn": int(addition_sums[i] + deletion_sums[i]),
+                "total_prs": int(pr_counts[i]),
+                "merged_prs": int(merged_counts[i]),
+                "avg_cycle_time_hours": float(lead_sums[i] / lead_counts[i]) if lead_counts[i] else 0
+            }
+            for i, repo in enumerate(repos)
+        }
+
+    @staticmethod
+    def developer_velocity(developer_metrics: Dict[str, Dict]) -> Dict[str, Any]:
+        """Per-developer productivity ratios derived from the grouped sums"""
+        velocities = {}
+        for dev, metrics in developer_metrics.items():
+            commits = metrics.get("commits", 0)
+            changes = metrics.get("additions", 0) + metrics.get("deletions", 0)
+            velocities[dev] = {
+                "commit_frequency": commits,
+                "code_velocity": changes,
+                "avg_commit_size": changes / commits if commits > 0 else 0,
+                "pr_merge_rate": metrics.get("prs_merged", 0) / (metrics.get("prs_created", 0) or 1) * 100
+            }
+        return velocities
@@ -0,0 +1,78 @@
+# src/metrics/rollup.py
+from typing import Dict, Any, Iterable, List, Tuple
+from datetime import date, datetime, time, timedelta, timezone
+import numpy as np
+
+# Per-developer daily sums, in the order rows and prefix sums store them
+ROLLUP_FIELDS = ("commits", "additions", "deletions", "files", "prs_opened", "prs_merged", "cycle_time_hours")
+
+
+def _day(value, round_up: bool = False) -> date:
+    """UTC day of a date or datetime; ``round_up`` moves a mid-day instant to the next day"""
+    if not isinstance(value, datetime):
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    if round_up and value.time() != time.min:
+        return value.date() + timedelta(days=1)
+    return value.date()
+
+
+class DeveloperRollupIndex:
+    """Prefix sums over per-developer daily rollups
+
+    ``cumulative[a, d]`` holds developer ``a``'s totals for every day before
+    ``first_day + d``, so any ``[start, end)`` window is two row reads per
+    developer, whatever its length.
+    """
+
+    def __init__(self, authors: List[str], first_day: date, cumulative: np.ndarray):
+        self.authors = authors
+        self.first_day = first_day
+        self.cumulative = cumulative
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Any, ...]]) -> "DeveloperRollupIndex":
+        """Build from (author, day, *ROLLUP_FIELDS) rows; repos are summed together"""
+        rows = list(rows)
+        if not rows:
+            return cls([], date.today(), np.zeros((0, 1, len(ROLLUP_FIELDS))))
+        authors = sorted({row[0] for row in rows})
+        codes = {author: i for i, author in enumerate(authors)}
+        first_day = min(row[1] for row in rows)
+        n_days = (max(row[1] for row in rows) - first_day).days + 1
+
+        author_idx = np.fromiter((codes[row[0]] for row in rows), dtype=np.int64, count=len(rows))
+        day_idx = np.fromiter(((row[1] - first_day).days for row in rows), dtype=np.int64, count=len(rows))
+        values = np.array([row[2:] for row in rows], dtype=np.float64)
+
+        daily = np.zeros((len(authors), n_days + 1, len(ROLLUP_FIELDS)))
+        # Day slot 0 stays zero so cumulative[:, d] sums days before d
+        np.add.at(daily, (author_idx, day_idx + 1), values)
+        return cls(authors, first_day, np.cumsum(daily, axis=1))
+
+    def _slot(self, day: date) -> int:
+        return int(np.clip((day - self.first_day).days, 0, self.cumulative.shape[1] - 1))
+
+    def window(self, start, end) -> Dict[str, Dict[str, Any]]:
+        """Per-developer totals for days in ``[start, end)``, shaped like developer_metrics
+
+        ``start``/``end`` are dates or datetimes; datetimes are widened to
+        whole UTC days. Developers with no activity in the window are left out.
+        """
+        if not self.authors:
+            return {}
+        totals = self.cumulative[:, self._slot(_day(end, round_up=True))] - self.cumulative[:, self._slot(_day(start))]
+        developers = {}
+        for i in np.flatnonzero(totals.any(axis=1)):
+            commits, additions, deletions, files, opened, merged, cycle_hours = totals[i]
+            developers[self.authors[i]] = {
+                "commits": int(commits),
+                "additions": int(additions),
+                "deletions": int(deletions),
+                "files_touched": int(files),
+                "prs_created": int(opened),
+                "prs_merged": int(merged),
+                "avg_cycle_time_hours": float(cycle_hours / merged) if merged else 0
+            }
+        return developers
@@ -0,0 +1,62 @@
+# src/metrics/time_range.py
+from typing import Optional, Tuple
+from datetime import date, datetime, time, timedelta, timezone
+import re
+
+# Named windows the bot and the workflow have always accepted
+NAMED_WINDOWS = {"daily": 1, "weekly": 7, "monthly": 30, "quarterly": 90}
+
+_LAST_DAYS = re.compile(r"^(?:last[_ ]?)?(\d+)[_ ]?(?:d|days?)$")
+_QUARTER = re.compile(r"^(?:(\d{4})[-_ ]?)?q([1-4])(?:[-_ ]?(\d{4}))?$")
+_CUSTOM = re.compile(r"^(\d{4}-\d{2}-\d{2})\s*(?:\.\.|to|/)\s*(\d{4}-\d{2}-\d{2})$")
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def resolve_time_range(time_range: str, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Turn a report time range into an aware-UTC ``[start, end)`` window
+
+    Accepts the named windows (daily, weekly, monthly, quarterly), trailing
+    day counts ("last_90_days", "last 90 days", "90d"), quarters ("Q3" is
+    the most recent Q3 that has started; "Q3 2024", "2024-Q3") and custom
+    date ranges ("2024-07-01..2024-09-30", end date inclusive). Windows
+    that reach into the future end at ``now``; ones that start there are
+    rejected.
+    """
+    now = now or datetime.now(timezone.utc)
+    spec = time_range.strip().lower()
+
+    if spec in NAMED_WINDOWS:
+        return now - timedelta(days=NAMED_WINDOWS[spec]), now
+
+    match = _LAST_DAYS.match(spec)
+    if match:
+        days = int(match.group(1))
+        if days < 1:
+            raise ValueError(f"Empty time range: {time_range}")
+        return now - timedelta(days=days), now
+
+    match = _QUARTER.match(spec)
+    if match:
+        quarter = int(match.group(2))
+        year = int(match.group(1) or match.group(3) or now.year)
+        if not (match.group(1) or match.group(3)) and date(year, 3 * quarter - 2, 1) > now.date():
+            year -= 1
+        start = _midnight(date(year, 3 * quarter - 2, 1))
+        end = _midnight(date(year + 1, 1, 1) if quarter == 4 else date(year, 3 * quarter + 1, 1))
+        if start >= now:
+            raise ValueError(f"Time range starts in the future: {time_range}")
+        return start, min(end, now)
+
+    match = _CUSTOM.match(spec)
+    if match:
+        first, last = (date.fromisoformat(group) for group in match.groups())
+        if last < first:
+            raise ValueError(f"Time range ends before it starts: {time_range}")
+        if _midnight(first) >= now:
+            raise ValueError(f"Time range starts in the future: {time_range}")
+        return _midnight(first), min(_midnight(last + timedelta(days=1)), now)
+
+    raise ValueError(f"Unknown time range: {time_range}")
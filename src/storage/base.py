@@ -0,0 +1,5 @@
+# src/storage/base.py
+from sqlalchemy.ext.declarative import declarative_base
+
+# Shared by every storage module so one create_all covers all tables
+Base = declarative_base()
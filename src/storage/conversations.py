@@ -0,0 +1,384 @@
+# src/storage/conversations.py
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, Index, exists, func, or_, update
+from datetime import datetime, timedelta
+from functools import lru_cache
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from src.storage.base import Base
+
+try:
+    import zstandard
+except ImportError:  # zlib with a preset dictionary is the fallback
+    zstandard = None
+
+ZSTD_LEVEL = 6
+ZLIB_LEVEL = 6
+DICTIONARY_SIZE = 32 * 1024    # zlib uses at most 32 KiB of preset dictionary
+DICTIONARY_SAMPLES = 500
+TRAIN_AFTER_PROMPTS = 100      # first dictionary is trained once this many prompts are stored
+ORPHAN_GRACE = timedelta(hours=1)
+CHUNK = 500
+
+
+class ConversationRecord(Base):
+    """One LLM exchange; prompt and response bodies live in conversation_blobs"""
+    __tablename__ = 'conversations'
+
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+    agent_name = Column(String(100))
+    prompt_hash = Column(String(64))
+    response_hash = Column(String(64))
+
+    __table_args__ = (
+        Index('ix_conversations_agent_name_timestamp', 'agent_name', 'timestamp'),
+        Index('ix_conversations_timestamp', 'timestamp'),
+        Index('ix_conversations_prompt_hash', 'prompt_hash'),
+        Index('ix_conversations_response_hash', 'response_hash'),
+    )
+
+class ConversationBlob(Base):
+    """Compressed text, stored once per distinct content"""
+    __tablename__ = 'conversation_blobs'
+
+    hash = Column(String(64), primary_key=True)  # sha256 of the UTF-8 text
+    codec = Column(String(10))                   # "zstd", "zlib" or "raw"
+    dictionary_id = Column(Integer)
+    data = Column(LargeBinary)
+    size = Column(Integer)                       # uncompressed bytes
+    stored_size = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used = Column(DateTime, default=datetime.utcnow)
+
+class CompressionDictionary(Base):
+    __tablename__ = 'compression_dictionaries'
+
+    id = Column(Integer, primary_key=True)
+    codec = Column(String(10))
+    data = Column(LargeBinary)
+    samples = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+@lru_cache(maxsize=8)
+def _zstd_dict(data: bytes) -> "zstandard.ZstdCompressionDict":
+    # Trained dictionaries carry a magic header; anything else loads as raw content
+    return zstandard.ZstdCompressionDict(data)
+
+
+def compress(data: bytes, codec: str, dictionary: Optional[bytes] = None) -> bytes:
+    if codec == "zstd":
+        dict_data = _zstd_dict(dictionary) if dictionary else None
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(data)
+    if codec == "zlib":
+        compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary) if dictionary else zlib.compressobj(ZLIB_LEVEL)
+        return compressor.compress(data) + compressor.flush()
+    if codec == "raw":
+        return data
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def decompress(data: bytes, codec: str, dictionary: Optional[bytes] = None) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed conversations")
+        dict_data = _zstd_dict(dictionary) if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+    if codec == "zlib":
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+    if codec == "raw":
+        return data
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def train_dictionary(samples: List[bytes], codec: str, size: int = DICTIONARY_SIZE) -> Optional[bytes]:
+    """Dictionary for compressing texts like ``samples``, or None if they share nothing"""
+    if not samples:
+        return None
+    if codec == "zstd":
+        try:
+            return zstandard.train_dictionary(size, samples).as_bytes()
+        except zstandard.ZstdError:
+            pass  # too few or too uniform samples; shared content still helps
+    return _shared_content(samples, size)
+
+
+def _shared_content(samples: List[bytes], size: int) -> Optional[bytes]:
+    """Lines that recur across samples, i.e. the prompt templates' fixed text"""
+    counts: Counter = Counter()
+    for sample in samples:
+        counts.update(set(sample.splitlines(keepends=True)))
+    shared = [line for line, n in counts.items() if n > 1 and line.strip()]
+    # Both codecs reach the end of the dictionary most cheaply: most common last
+    shared.sort(key=lambda line: (counts[line], len(line)))
+    return b"".join(shared)[-size:] or None
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ConversationEntry:
+    """A conversation waiting to be written"""
+    __slots__ = ("timestamp", "agent_name", "prompt", "response")
+
+    def __init__(self, timestamp: datetime, agent_name: str, prompt: str, response: str):
+        self.timestamp = timestamp
+        self.agent_name = agent_name
+        self.prompt = prompt
+        self.response = response
+
+
+class ConversationStore:
+    """Full-fidelity conversation log with deduplicated, compressed bodies
+
+    Prompts are mostly template text, so each distinct body is stored once
+    under its hash and compressed against a dictionary trained on stored
+    prompts. Blobs remember the dictionary they were written with; older
+    dictionaries stay readable until compact() re-encodes their blobs.
+    All methods work in the caller's session and leave committing to it.
+    """
+
+    def __init__(self, codec: Optional[str] = None):
+        self.logger = logging.getLogger("ConversationStore")
+        self.codec = codec or os.getenv("CONVERSATION_CODEC") or default_codec()
+        if self.codec == "zstd" and zstandard is None:
+            self.logger.warning("zstandard is not installed; compressing conversations with zlib")
+            self.codec = "zlib"
+        self._lock = threading.Lock()
+        self._dictionaries: Dict[int, bytes] = {}
+        self._current: Optional[int] = None
+        self._current_loaded = False
+        self._new_prompts = 0
+
+    def write(self, session, entries: List[ConversationEntry]):
+        """Add conversations, storing only bodies not already present"""
+        now = datetime.utcnow()
+        bodies: Dict[str, bytes] = {}
+        prompts = set()
+        for entry in entries:
+            prompt = entry.prompt.encode("utf-8")
+            response = (entry.response or "").encode("utf-8")
+            prompt_hash, response_hash = _digest(prompt), _digest(response)
+            bodies[prompt_hash] = prompt
+            bodies[response_hash] = response
+            prompts.add(prompt_hash)
+            session.add(ConversationRecord(
+                timestamp=entry.timestamp,
+                agent_name=entry.agent_name,
+                prompt_hash=prompt_hash,
+                response_hash=response_hash
+            ))
+
+        hashes = list(bodies)
+        existing = set()
+        for i in range(0, len(hashes), CHUNK):
+            chunk = hashes[i:i + CHUNK]
+            existing.update(h for (h,) in session.query(ConversationBlob.hash).filter(ConversationBlob.hash.in_(chunk)))
+        # Touch reused blobs so compaction does not sweep them out from under this write
+        touched = list(existing)
+        for i in range(0, len(touched), CHUNK):
+            session.execute(
+                update(ConversationBlob).where(ConversationBlob.hash.in_(touched[i:i + CHUNK])).values(last_used=now)
+            )
+
+        dictionary_id, dictionary = self._current_dictionary(session)
+        for body_hash, body in bodies.items():
+            if body_hash in existing:
+                continue
+            session.add(self._encode(body_hash, body, dictionary_id, dictionary, now))
+            if body_hash in prompts:
+                self._new_prompts += 1
+
+    def needs_dictionary(self) -> bool:
+        """True once enough prompts are stored to train the first dictionary"""
+        return self._current_loaded and self._current is None and self._new_prompts >= TRAIN_AFTER_PROMPTS
+
+    def history(self, session, agent_name: Optional[str] = None, since: Optional[datetime] = None,
+                limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent conversations, newest first, with full prompt and response"""
+        query = session.query(ConversationRecord)
+        if agent_name:
+            query = query.filter(ConversationRecord.agent_name == agent_name)
+        if since:
+            query = query.filter(ConversationRecord.timestamp >= since)
+        records = query.order_by(ConversationRecord.timestamp.desc()).limit(limit).all()
+        texts = self.load(session, {h for r in records for h in (r.prompt_hash, r.response_hash)})
+        return [{
+            "timestamp": r.timestamp,
+            "agent_name": r.agent_name,
+            "prompt": texts.get(r.prompt_hash),
+            "response": texts.get(r.response_hash)
+        } for r in records]
+
+    def load(self, session, hashes) -> Dict[str, str]:
+        """Decompressed bodies by hash"""
+        hashes = list(hashes)
+        texts = {}
+        for i in range(0, len(hashes), CHUNK):
+            for blob in session.query(ConversationBlob).filter(ConversationBlob.hash.in_(hashes[i:i + CHUNK])):
+                texts[blob.hash] = self._decode(session, blob).decode("utf-8")
+        return texts
+
+    def train(self, session, samples: int = DICTIONARY_SAMPLES) -> Optional[int]:
+        """Train a dictionary on the most recent prompts and make it current"""
+        blobs = (
+            session.query(ConversationBlob)
+            .filter(exists().where(ConversationRecord.prompt_hash == ConversationBlob.hash))
+            .order_by(ConversationBlob.created_at.desc())
+            .limit(samples)
+            .all()
+        )
+        data = train_dictionary([self._decode(session, blob) for blob in blobs], self.codec)
+        if data is None:
+            return None
+        dictionary = CompressionDictionary(codec=self.codec, data=data, samples=len(blobs))
+        session.add(dictionary)
+        session.flush()
+        with self._lock:
+            self._dictionaries[dictionary.id] = data
+            self._current, self._current_loaded = dictionary.id, True
+            self._new_prompts = 0
+        self.logger.info(f"Trained {self.codec} dictionary {dictionary.id} ({len(data)} bytes) on {len(blobs)} prompts")
+        return dictionary.id
+
+    def compact(self, session, retention_days: Optional[float] = None, retrain: bool = False) -> Dict[str, Any]:
+        """Apply retention, re-encode blobs with the current dictionary, and drop unreferenced data"""
+        now = datetime.utcnow()
+        stats: Dict[str, Any] = {"records_deleted": 0}
+        if retention_days is not None:
+            stats["records_deleted"] = (
+                session.query(ConversationRecord)
+                .filter(ConversationRecord.timestamp < now - timedelta(days=retention_days))
+                .delete(synchronize_session=False)
+            )
+
+        referenced = or_(
+            exists().where(ConversationRecord.prompt_hash == ConversationBlob.hash),
+            exists().where(ConversationRecord.response_hash == ConversationBlob.hash)
+        )
+        stats["blobs_deleted"] = (
+            session.query(ConversationBlob)
+            .filter(ConversationBlob.last_used < now - ORPHAN_GRACE, ~referenced)
+            .delete(synchronize_session=False)
+        )
+
+        dictionary_id, dictionary = self._current_dictionary(session)
+        if retrain or dictionary_id is None:
+            dictionary_id = self.train(session) or dictionary_id
+            dictionary = self._dictionaries.get(dictionary_id)
+        stats["dictionary_id"] = dictionary_id
+        stats["blobs_recompressed"] = self._recompress(session, dictionary_id, dictionary) if dictionary_id else 0
+
+        in_use = {d for (d,) in session.query(ConversationBlob.dictionary_id).distinct() if d is not None}
+        stale = session.query(CompressionDictionary.id).filter(CompressionDictionary.id != dictionary_id)
+        stale_ids = [d for (d,) in stale if d not in in_use]
+        if stale_ids:
+            session.query(CompressionDictionary).filter(CompressionDictionary.id.in_(stale_ids)).delete(synchronize_session=False)
+        stats["dictionaries_deleted"] = len(stale_ids)
+        stats.update(self.stats(session))
+        return stats
+
+    def stats(self, session) -> Dict[str, Any]:
+        count, size, stored = session.query(
+            func.count(ConversationBlob.hash), func.sum(ConversationBlob.size), func.sum(ConversationBlob.stored_size)
+        ).one()
+        return {
+            "conversations": session.query(func.count(ConversationRecord.id)).scalar(),
+            "blobs": count,
+            "bytes": size or 0,
+            "stored_bytes": stored or 0,
+            "ratio": (size / stored) if stored else 0.0
+        }
+
+    def _recompress(self, session, dictionary_id: int, dictionary: bytes) -> int:
+        """Re-encode compressed blobs written with an older dictionary or none"""
+        recompressed = 0
+        after = ""
+        while True:
+            blobs = (
+                session.query(ConversationBlob)
+                .filter(ConversationBlob.hash > after, ConversationBlob.codec != "raw",
+                        or_(ConversationBlob.dictionary_id.is_(None), ConversationBlob.dictionary_id != dictionary_id))
+                .order_by(ConversationBlob.hash)
+                .limit(CHUNK)
+                .all()
+            )
+            if not blobs:
+                return recompressed
+            for blob in blobs:
+                body = self._decode(session, blob)
+                encoded = self._encode(blob.hash, body, dictionary_id, dictionary, blob.last_used)
+                if encoded.stored_size < blob.stored_size:
+                    blob.codec, blob.dictionary_id = encoded.codec, encoded.dictionary_id
+                    blob.data, blob.stored_size = encoded.data, encoded.stored_size
+                    recompressed += 1
+            after = blobs[-1].hash
+            session.flush()
+
+    def _encode(self, body_hash: str, body: bytes, dictionary_id: Optional[int],
+                dictionary: Optional[bytes], now: datetime) -> ConversationBlob:
+        codec, data = self.codec, compress(body, self.codec, dictionary)
+        if len(data) >= len(body):
+            codec, data, dictionary_id = "raw", body, None
+        return ConversationBlob(
+            hash=body_hash, codec=codec, dictionary_id=dictionary_id if dictionary else None,
+            data=data, size=len(body), stored_size=len(data), created_at=now, last_used=now
+        )
+
+    def _decode(self, session, blob: ConversationBlob) -> bytes:
+        dictionary = self._dictionary(session, blob.dictionary_id) if blob.dictionary_id else None
+        return decompress(blob.data, blob.codec, dictionary)
+
+    def _dictionary(self, session, dictionary_id: int) -> bytes:
+        with self._lock:
+            data = self._dictionaries.get(dictionary_id)
+        if data is None:
+            row = session.get(CompressionDictionary, dictionary_id)
+            data = row.data
+            with self._lock:
+                self._dictionaries[dictionary_id] = data
+        return data
+
+    def _current_dictionary(self, session) -> Tuple[Optional[int], Optional[bytes]]:
+        if not self._current_loaded:
+            row = (
+                session.query(CompressionDictionary.id)
+                .filter(CompressionDictionary.codec == self.codec)
+                .order_by(CompressionDictionary.id.desc())
+                .first()
+            )
+            with self._lock:
+                self._current, self._current_loaded = (row[0] if row else None), True
+        if self._current is None:
+            return None, None
+        return self._current, self._dictionary(session, self._current)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversation store retention and compaction")
+    parser.add_argument("--retention-days", type=float,
+                        default=float(os.environ["CONVERSATION_RETENTION_DAYS"]) if os.getenv("CONVERSATION_RETENTION_DAYS") else None,
+                        help="delete conversations older than this (default: keep all)")
+    parser.add_argument("--retrain", action="store_true", help="train a fresh dictionary from recent prompts")
+    args = parser.parse_args()
+
+    from src.storage.database import DatabaseManager
+    stats = DatabaseManager().compact_conversations(args.retention_days, retrain=args.retrain)
+    print(json.dumps(stats, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
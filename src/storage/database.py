@@ -1,11 +1,18 @@
 # src/storage/database.py
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, JSON, Text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from sqlalchemy import create_engine, event, func, make_url, and_, case, or_, update, Column, Integer, String, Float, Date, DateTime, JSON, Text, LargeBinary, Index
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker, scoped_session
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+import atexit
 import os
+import threading
+from src.metrics.rollup import DeveloperRollupIndex, ROLLUP_FIELDS
+from src.storage.base import Base
+from src.storage.conversations import ConversationEntry, ConversationStore
+from src.storage.write_behind import WriteBehindQueue, DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL, DEFAULT_MAX_PENDING
 
-Base = declarative_base()
+DEFAULT_DATABASE_URL = "sqlite:///dev_insights.db"
 
 class MetricsSnapshot(Base):
     __tablename__ = 'metrics_snapshots'
@@ -28,7 +35,39 @@ class MetricsSnapshot(Base):
     # Raw data
     raw_metrics = Column(JSON)
     
+    __table_args__ = (
+        Index('ix_metrics_snapshots_time_range_timestamp', 'time_range', 'timestamp'),
+        Index('ix_metrics_snapshots_timestamp', 'timestamp'),
+    )
+    
+class MetricsRollup(Base):
+    """Per-day and per-week aggregates of snapshots, maintained as they are saved"""
+    __tablename__ = 'metrics_rollups'
+    
+    granularity = Column(String(10), primary_key=True)  # "daily" or "weekly"
+    time_range = Column(String(50), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)   # UTC midnight / Monday
+    
+    snapshots = Column(Integer, default=0)
+    deployment_frequency_sum = Column(Float, default=0.0)
+    lead_time_hours_sum = Column(Float, default=0.0)
+    total_churn_sum = Column(Integer, default=0)
+    churn_rate_sum = Column(Float, default=0.0)
+    last_timestamp = Column(DateTime)
+    
+# Projection used by trend queries; raw_metrics is never loaded
+TREND_COLUMNS = ('timestamp', 'deployment_frequency', 'lead_time_hours', 'total_churn', 'churn_rate')
+ROLLUP_GRANULARITIES = ('daily', 'weekly')
+
+def _bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Start of the day or ISO week containing ``timestamp``"""
+    day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == 'weekly':
+        return day - timedelta(days=day.weekday())
+    return day
+    
 class AgentConversation(Base):
+    """Truncated exchanges logged before the conversation store; read-only"""
     __tablename__ = 'agent_conversations'
     
     id = Column(Integer, primary_key=True)
@@ -37,16 +76,242 @@ class AgentConversation(Base):
     prompt = Column(Text)
     response = Column(Text)
     
+class CommitRecord(Base):
+    __tablename__ = 'commits'
+    
+    repo = Column(String(200), primary_key=True)
+    sha = Column(String(40), primary_key=True)
+    author = Column(String(100))
+    message = Column(Text)
+    date = Column(DateTime)
+    additions = Column(Integer)
+    deletions = Column(Integer)
+    total = Column(Integer)
+    files = Column(Integer)
+    
+    __table_args__ = (Index('ix_commits_repo_date', 'repo', 'date'),)
+    
+class PullRequestRecord(Base):
+    __tablename__ = 'pull_requests'
+    
+    repo = Column(String(200), primary_key=True)
+    number = Column(Integer, primary_key=True)
+    title = Column(Text)
+    author = Column(String(100))
+    state = Column(String(20))
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    merged_at = Column(DateTime)
+    additions = Column(Integer)
+    deletions = Column(Integer)
+    changed_files = Column(Integer)
+    review_comments = Column(Integer)
+    
+    __table_args__ = (
+        Index('ix_pull_requests_repo_created_at', 'repo', 'created_at'),
+        Index('ix_pull_requests_repo_merged_at', 'repo', 'merged_at'),
+    )
+    
+class DeveloperDailyRollup(Base):
+    """Per-developer activity per UTC day, rebuilt from commits/pull_requests after each sync"""
+    __tablename__ = 'developer_daily_rollups'
+    
+    repo = Column(String(200), primary_key=True)
+    author = Column(String(100), primary_key=True)
+    day = Column(Date, primary_key=True)
+    
+    commits = Column(Integer, default=0)
+    additions = Column(Integer, default=0)
+    deletions = Column(Integer, default=0)
+    files = Column(Integer, default=0)
+    prs_opened = Column(Integer, default=0)    # by creation day
+    prs_merged = Column(Integer, default=0)    # by merge day
+    cycle_time_hours = Column(Float, default=0.0)  # creation-to-merge hours of PRs merged that day
+    
+    __table_args__ = (Index('ix_developer_daily_rollups_repo_day', 'repo', 'day'),)
+    
+class SyncWatermark(Base):
+    __tablename__ = 'sync_watermarks'
+    
+    repo = Column(String(200), primary_key=True)  # "owner/name"
+    synced_from = Column(DateTime)   # earliest instant the store covers
+    synced_until = Column(DateTime)  # last instant fetched from GitHub
+    
+class AnomalyDetectorState(Base):
+    __tablename__ = 'anomaly_detector_state'
+    
+    scope = Column(String(500), primary_key=True)  # repo or repo set the baselines cover
+    state = Column(JSON)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+class ReportSnapshot(Base):
+    """Latest finished report per request, precomputed or kept from an on-demand run"""
+    __tablename__ = 'report_snapshots'
+    
+    key = Column(String(500), primary_key=True)  # scope|command|time_range|target_user
+    computed_at = Column(DateTime, index=True)
+    duration_s = Column(Float)
+    state = Column(JSON)  # narrative, summary, chart specs, metrics
+    
+class ReportChart(Base):
+    """Rendered chart images of a report snapshot, in report order"""
+    __tablename__ = 'report_charts'
+    
+    key = Column(String(500), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    kind = Column(String(50))
+    title = Column(String(200))
+    image = Column(LargeBinary)
+    
+def _to_db_time(value: Optional[datetime]) -> Optional[datetime]:
+    """Store timestamps as naive UTC"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+    
+def _from_db_time(value: Optional[datetime]) -> Optional[datetime]:
+    """Return stored timestamps as aware UTC, matching what GitHub returns"""
+    return value.replace(tzinfo=timezone.utc) if value is not None else None
+    
+def _create_engine(url: str):
+    """Pooled engine; file-backed SQLite runs in WAL mode so readers never block the writer"""
+    options: Dict[str, Any] = {"pool_pre_ping": True}
+    parsed = make_url(url)
+    in_memory = parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+    if not in_memory:
+        options["pool_size"] = int(os.getenv("DB_POOL_SIZE", "10"))
+        options["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    engine = create_engine(url, **options)
+    
+    if parsed.get_backend_name() == "sqlite" and not in_memory:
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            # WAL keeps commits durable against crashes at NORMAL without an fsync per transaction
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA busy_timeout=5000")
+            cursor.close()
+    return engine
+    
+# One engine, schema check and writer per database URL, shared by every DatabaseManager
+_databases: Dict[str, Tuple[Any, Optional[WriteBehindQueue], ConversationStore]] = {}
+_databases_lock = threading.Lock()
+
+def _close_writers():
+    """Commit whatever is still queued; registered with atexit"""
+    with _databases_lock:
+        for _, writer, _ in _databases.values():
+            if writer is not None:
+                writer.close()
+    
+atexit.register(_close_writers)
+    
 class DatabaseManager:
     def __init__(self):
-        self.engine = create_engine(os.getenv("DATABASE_URL", "sqlite:///dev_insights.db"))
-        Base.metadata.create_all(self.engine)
-        Session = sessionmaker(bind=self.engine)
-        self.session = Session()
+        url = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
+        with _databases_lock:
+            if url not in _databases:
+                _databases[url] = self._open(url)
+        self.engine, self.writer, self.conversations = _databases[url]
+        self.session_factory = sessionmaker(bind=self.engine)
+        # Each thread gets its own session, so concurrent workflow steps never share one
+        self.Session = scoped_session(self.session_factory)
+        # Prefix-sum indexes over developer rollups, keyed by repo set
+        self._developer_indexes: Dict[Tuple[str, ...], Tuple[Any, DeveloperRollupIndex]] = {}
+        self._developer_indexes_lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """Session bound to the calling thread"""
+        return self.Session()
+    
+    @classmethod
+    def _open(cls, url: str) -> Tuple[Any, Optional[WriteBehindQueue], ConversationStore]:
+        engine = _create_engine(url)
+        Base.metadata.create_all(engine)
+        # create_all only indexes tables it creates; add indexes introduced since
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(engine, checkfirst=True)
+        session_factory = sessionmaker(bind=engine)
+        with session_factory() as session:
+            cls._backfill_rollups(session)
+            cls._backfill_developer_rollups(session)
+        
+        conversations = ConversationStore()
+        writer = None
+        if os.getenv("DB_WRITE_BEHIND", "1") != "0":
+            writer = WriteBehindQueue(
+                lambda rows: cls._write_rows(session_factory, conversations, rows),
+                batch_size=int(os.getenv("DB_WRITE_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+                flush_interval=float(os.getenv("DB_WRITE_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)),
+                max_pending=int(os.getenv("DB_WRITE_MAX_PENDING", DEFAULT_MAX_PENDING))
+            )
+        return engine, writer, conversations
+    
+    @staticmethod
+    def _backfill_rollups(session):
+        """Build rollups once for snapshots saved before rollups existed"""
+        if session.query(MetricsRollup.granularity).first() is not None:
+            return
+        rows = session.query(
+            MetricsSnapshot.timestamp, MetricsSnapshot.time_range, MetricsSnapshot.deployment_frequency,
+            MetricsSnapshot.lead_time_hours, MetricsSnapshot.total_churn, MetricsSnapshot.churn_rate
+        ).filter(MetricsSnapshot.timestamp.isnot(None)).order_by(MetricsSnapshot.timestamp)
+        DatabaseManager._update_rollups(session, [MetricsSnapshot(**row._asdict()) for row in rows.all()])
+        session.commit()
+    
+    @staticmethod
+    def _backfill_developer_rollups(session):
+        """Build developer rollups once for commits stored before rollups existed"""
+        if session.query(DeveloperDailyRollup.repo).first() is not None:
+            return
+        spans = session.query(CommitRecord.repo, func.min(CommitRecord.date), func.max(CommitRecord.date)).group_by(CommitRecord.repo)
+        for repo, first, last in spans.all():
+            if first is not None:
+                DatabaseManager._rebuild_developer_rollups(session, repo, first, last)
+        session.commit()
+    
+    @staticmethod
+    def _write_rows(session_factory, conversations: ConversationStore, rows: List[Any]):
+        """Insert a batch of new rows in one transaction
+        
+        Snapshots are folded into the rollups and conversations go through
+        the conversation store.
+        """
+        entries = [row for row in rows if isinstance(row, ConversationEntry)]
+        with session_factory() as session, session.begin():
+            session.add_all(row for row in rows if not isinstance(row, ConversationEntry))
+            snapshots = [row for row in rows if isinstance(row, MetricsSnapshot)]
+            if snapshots:
+                DatabaseManager._update_rollups(session, snapshots)
+            if entries:
+                conversations.write(session, entries)
+        
+        if conversations.needs_dictionary():
+            with session_factory() as session, session.begin():
+                conversations.train(session)
+    
+    def _insert(self, row: Any):
+        """Queue a row for the background writer, or commit it now if write-behind is off"""
+        if self.writer is not None:
+            self.writer.put(row)
+            return
+        try:
+            self._write_rows(self.session_factory, self.conversations, [row])
+        except IntegrityError:
+            # A concurrent writer stored the same conversation body first; it is found this time
+            self._write_rows(self.session_factory, self.conversations, [row])
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued snapshots and conversations are committed"""
+        return self.writer.flush(timeout) if self.writer is not None else True
     
     def save_metrics(self, metrics: dict, time_range: str):
-        """Save metrics snapshot"""
+        """Queue a metrics snapshot; it lands in the daily/weekly rollups when committed"""
         snapshot = MetricsSnapshot(
+            timestamp=datetime.utcnow(),
             time_range=time_range,
             deployment_frequency=metrics['dora_metrics']['deployment_frequency'],
             lead_time_hours=metrics['dora_metrics']['lead_time_hours'],
@@ -57,15 +322,340 @@ class DatabaseManager:
             avg_commit_size=metrics['team_metrics'].get('avg_commit_size', 0),
             raw_metrics=metrics
         )
-        self.session.add(snapshot)
-        self.session.commit()
+        self._insert(snapshot)
+        
+    @staticmethod
+    def _update_rollups(session, snapshots: List[MetricsSnapshot]):
+        """Add snapshots to their daily and weekly buckets, in the caller's transaction"""
+        # Sum per bucket first so each bucket is updated once per batch
+        buckets: Dict[tuple, List[Any]] = {}
+        for snapshot in snapshots:
+            for granularity in ROLLUP_GRANULARITIES:
+                key = (granularity, snapshot.time_range, _bucket_start(snapshot.timestamp, granularity))
+                sums = buckets.setdefault(key, [0, 0.0, 0.0, 0, 0.0, None])
+                sums[0] += 1
+                sums[1] += snapshot.deployment_frequency or 0
+                sums[2] += snapshot.lead_time_hours or 0
+                sums[3] += snapshot.total_churn or 0
+                sums[4] += snapshot.churn_rate or 0
+                sums[5] = max(sums[5] or snapshot.timestamp, snapshot.timestamp)
+        
+        for key, sums in buckets.items():
+            # Increment in place so concurrent writers (threads or processes) never lose counts
+            bucket = (MetricsRollup.granularity == key[0], MetricsRollup.time_range == key[1],
+                      MetricsRollup.bucket_start == key[2])
+            increments = {
+                MetricsRollup.snapshots: MetricsRollup.snapshots + sums[0],
+                MetricsRollup.deployment_frequency_sum: MetricsRollup.deployment_frequency_sum + sums[1],
+                MetricsRollup.lead_time_hours_sum: MetricsRollup.lead_time_hours_sum + sums[2],
+                MetricsRollup.total_churn_sum: MetricsRollup.total_churn_sum + sums[3],
+                MetricsRollup.churn_rate_sum: MetricsRollup.churn_rate_sum + sums[4],
+                MetricsRollup.last_timestamp: case(
+                    (MetricsRollup.last_timestamp < sums[5], sums[5]), else_=MetricsRollup.last_timestamp
+                )
+            }
+            if session.execute(update(MetricsRollup).where(*bucket).values(increments)).rowcount:
+                continue
+            try:
+                with session.begin_nested():
+                    session.add(MetricsRollup(
+                        granularity=key[0], time_range=key[1], bucket_start=key[2],
+                        snapshots=sums[0], deployment_frequency_sum=sums[1], lead_time_hours_sum=sums[2],
+                        total_churn_sum=sums[3], churn_rate_sum=sums[4], last_timestamp=sums[5]
+                    ))
+            except IntegrityError:
+                # Another writer created the bucket first
+                session.execute(update(MetricsRollup).where(*bucket).values(increments))
+        
+    def get_metrics_trend(self, limit: int = 10, time_range: Optional[str] = None,
+                          since: Optional[datetime] = None, before: Optional[datetime] = None,
+                          granularity: str = 'snapshot') -> List[Dict[str, Any]]:
+        """Latest trend points, oldest first
+        
+        ``granularity`` is "snapshot" for individual reports, or "daily" /
+        "weekly" for per-bucket averages read from the rollup tables. Either
+        way the query is an index range scan bounded by ``limit``, so its cost
+        does not grow with history. ``before`` excludes points at or after it
+        (for snapshots) or buckets starting at or after it (for rollups).
+        Snapshots still in the write-behind queue are not visible; call
+        flush() first when they must be.
+        """
+        with self.session_factory() as session:
+            if granularity == 'snapshot':
+                query = session.query(*(getattr(MetricsSnapshot, c) for c in TREND_COLUMNS))
+                if time_range:
+                    query = query.filter(MetricsSnapshot.time_range == time_range)
+                if since:
+                    query = query.filter(MetricsSnapshot.timestamp >= _to_db_time(since))
+                if before:
+                    query = query.filter(MetricsSnapshot.timestamp < _to_db_time(before))
+                rows = query.order_by(MetricsSnapshot.timestamp.desc()).limit(limit).all()
+                return [dict(zip(TREND_COLUMNS, row)) for row in reversed(rows)]
+            
+            if granularity not in ROLLUP_GRANULARITIES:
+                raise ValueError(f"Unknown trend granularity: {granularity}")
+            query = session.query(MetricsRollup).filter(MetricsRollup.granularity == granularity)
+            if time_range:
+                query = query.filter(MetricsRollup.time_range == time_range)
+            if since:
+                query = query.filter(MetricsRollup.bucket_start >= _bucket_start(_to_db_time(since), granularity))
+            if before:
+                query = query.filter(MetricsRollup.bucket_start < _to_db_time(before))
+            rows = query.order_by(MetricsRollup.bucket_start.desc()).limit(limit).all()
+            return [{
+                'timestamp': r.bucket_start,
+                'deployment_frequency': r.deployment_frequency_sum / r.snapshots,
+                'lead_time_hours': r.lead_time_hours_sum / r.snapshots,
+                'total_churn': r.total_churn_sum / r.snapshots,
+                'churn_rate': r.churn_rate_sum / r.snapshots,
+                'snapshots': r.snapshots
+            } for r in reversed(rows)]
         
     def save_conversation(self, agent_name: str, prompt: str, response: str):
-        """Save agent conversation for audit"""
-        conv = AgentConversation(
-            agent_name=agent_name,
-            prompt=prompt[:1000],  # Truncate for storage
-            response=response[:1000]
+        """Queue agent conversation for audit, prompt and response in full"""
+        self._insert(ConversationEntry(datetime.utcnow(), agent_name, prompt, response))
+    
+    def get_conversations(self, agent_name: Optional[str] = None, since: Optional[datetime] = None,
+                          limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent logged conversations, newest first"""
+        with self.session_factory() as session:
+            return self.conversations.history(session, agent_name, _to_db_time(since), limit)
+    
+    def compact_conversations(self, retention_days: Optional[float] = None,
+                              retrain: bool = False) -> Dict[str, Any]:
+        """Retention and compaction for the conversation log; returns what changed
+        
+        Drops conversations older than ``retention_days`` (legacy truncated
+        rows included), trains a dictionary if there is none (or ``retrain``),
+        re-encodes blobs written with an older one and removes unreferenced
+        blobs and dictionaries.
+        """
+        self.flush()
+        with self.session_factory() as session, session.begin():
+            if retention_days is not None:
+                cutoff = datetime.utcnow() - timedelta(days=retention_days)
+                session.query(AgentConversation).filter(AgentConversation.timestamp < cutoff).delete(synchronize_session=False)
+            return self.conversations.compact(session, retention_days, retrain)
+        
+    def refresh_developer_rollups(self, repo: str, start: datetime, end: datetime):
+        """Rebuild a repo's developer rollups for every UTC day touching [start, end]"""
+        with self.session_factory() as session, session.begin():
+            self._rebuild_developer_rollups(session, repo, _to_db_time(start), _to_db_time(end))
+        # Backfilled days move only synced_from, so the version check alone can miss them
+        with self._developer_indexes_lock:
+            for key in [key for key in self._developer_indexes if repo in key]:
+                del self._developer_indexes[key]
+    
+    @staticmethod
+    def _rebuild_developer_rollups(session, repo: str, start: datetime, end: datetime):
+        first, last = start.date(), end.date()
+        since, until = datetime.combine(first, time.min), datetime.combine(last + timedelta(days=1), time.min)
+        days: Dict[Tuple[str, date], List[Any]] = {}
+        
+        def bucket(author: str, when: datetime) -> List[Any]:
+            return days.setdefault((author, when.date()), [0] * len(ROLLUP_FIELDS))
+        
+        commits = session.query(
+            CommitRecord.author, CommitRecord.date, CommitRecord.additions, CommitRecord.deletions, CommitRecord.files
+        ).filter(CommitRecord.repo == repo, CommitRecord.date >= since, CommitRecord.date < until)
+        for author, when, additions, deletions, files in commits:
+            sums = bucket(author, when)
+            sums[0] += 1
+            sums[1] += additions or 0
+            sums[2] += deletions or 0
+            sums[3] += files or 0
+        
+        pull_requests = session.query(
+            PullRequestRecord.author, PullRequestRecord.created_at, PullRequestRecord.merged_at
+        ).filter(
+            PullRequestRecord.repo == repo,
+            or_(and_(PullRequestRecord.created_at >= since, PullRequestRecord.created_at < until),
+                and_(PullRequestRecord.merged_at >= since, PullRequestRecord.merged_at < until))
+        )
+        for author, created_at, merged_at in pull_requests:
+            if created_at is not None and since <= created_at < until:
+                bucket(author, created_at)[4] += 1
+            if merged_at is not None and since <= merged_at < until:
+                sums = bucket(author, merged_at)
+                sums[5] += 1
+                if created_at is not None:
+                    sums[6] += (merged_at - created_at).total_seconds() / 3600
+        
+        session.query(DeveloperDailyRollup).filter(
+            DeveloperDailyRollup.repo == repo, DeveloperDailyRollup.day >= first, DeveloperDailyRollup.day <= last
+        ).delete(synchronize_session=False)
+        session.add_all(
+            DeveloperDailyRollup(repo=repo, author=author, day=day, **dict(zip(ROLLUP_FIELDS, sums)))
+            for (author, day), sums in days.items()
+        )
+    
+    def developer_window(self, repos: List[str], start: datetime, end: datetime) -> Dict[str, Dict[str, Any]]:
+        """Per-developer totals over [start, end) from the rollups, summed across ``repos``
+        
+        Answered from a prefix-sum index in O(developers); the index is
+        rebuilt only after one of the repos has synced again, here or in
+        another process.
+        """
+        key = tuple(sorted(repos))
+        watermarks = [self.get_watermark(repo) for repo in key]
+        version = tuple((w.synced_from, w.synced_until) if w is not None else None for w in watermarks)
+        with self._developer_indexes_lock:
+            cached = self._developer_indexes.get(key)
+        if cached is None or cached[0] != version:
+            with self.session_factory() as session:
+                rows = session.query(
+                    DeveloperDailyRollup.author, DeveloperDailyRollup.day,
+                    *(getattr(DeveloperDailyRollup, field) for field in ROLLUP_FIELDS)
+                ).filter(DeveloperDailyRollup.repo.in_(key)).all()
+            cached = (version, DeveloperRollupIndex.from_rows(rows))
+            with self._developer_indexes_lock:
+                self._developer_indexes[key] = cached
+        return cached[1].window(start, end)
+    
+    def save_report(self, key: str, state: Dict[str, Any], charts: List[Tuple[str, str, bytes]],
+                    computed_at: datetime, duration_s: float):
+        """Replace the stored report for a key; ``charts`` are (kind, title, png) in order"""
+        with self.session_factory() as session, session.begin():
+            session.merge(ReportSnapshot(key=key, computed_at=_to_db_time(computed_at),
+                                         duration_s=duration_s, state=state))
+            session.query(ReportChart).filter(ReportChart.key == key).delete()
+            session.add_all(ReportChart(key=key, position=i, kind=kind, title=title, image=image)
+                            for i, (kind, title, image) in enumerate(charts))
+        
+    def get_report(self, key: str, with_charts: bool = True) -> Optional[Dict[str, Any]]:
+        """Stored report for a key: state, computed_at, duration_s and charts, if any"""
+        with self.session_factory() as session:
+            snapshot = session.get(ReportSnapshot, key)
+            if snapshot is None:
+                return None
+            charts = []
+            if with_charts:
+                rows = session.query(ReportChart).filter(ReportChart.key == key).order_by(ReportChart.position)
+                charts = [(row.kind, row.title, row.image) for row in rows]
+            return {
+                "state": snapshot.state,
+                "computed_at": _from_db_time(snapshot.computed_at),
+                "duration_s": snapshot.duration_s,
+                "charts": charts
+            }
+        
+    def get_watermark(self, repo: str) -> Optional[SyncWatermark]:
+        """Return the sync watermark for an owner/name repo, if any"""
+        watermark = self.session.get(SyncWatermark, repo)
+        if watermark is None:
+            return None
+        return SyncWatermark(
+            repo=repo,
+            synced_from=_from_db_time(watermark.synced_from),
+            synced_until=_from_db_time(watermark.synced_until)
+        )
+        
+    def set_watermark(self, repo: str, synced_from: datetime, synced_until: datetime):
+        """Record the interval the store now covers for a repo"""
+        self.session.merge(SyncWatermark(
+            repo=repo,
+            synced_from=_to_db_time(synced_from),
+            synced_until=_to_db_time(synced_until)
+        ))
+        self.session.commit()
+        
+    def load_anomaly_state(self, scope: str) -> Optional[Dict[str, Any]]:
+        """Return the persisted anomaly detector state for a scope, if any"""
+        row = self.session.get(AnomalyDetectorState, scope)
+        return row.state if row is not None else None
+        
+    def save_anomaly_state(self, scope: str, state: Dict[str, Any]):
+        """Persist anomaly detector state so the next run continues from it"""
+        self.session.merge(AnomalyDetectorState(scope=scope, state=state))
+        self.session.commit()
+        
+    def upsert_commits(self, repo: str, commits: List[Dict[str, Any]]):
+        """Insert commits not yet stored; commits are immutable so known SHAs are skipped"""
+        if not commits:
+            return
+        shas = [c["sha"] for c in commits]
+        existing = set()
+        for i in range(0, len(shas), 500):
+            existing.update(
+                sha for (sha,) in self.session.query(CommitRecord.sha)
+                .filter(CommitRecord.repo == repo, CommitRecord.sha.in_(shas[i:i + 500]))
+            )
+        new_rows = {}
+        for commit in commits:
+            if commit["sha"] in existing:
+                continue
+            new_rows[commit["sha"]] = CommitRecord(
+                repo=repo,
+                sha=commit["sha"],
+                author=commit.get("author", "unknown"),
+                message=commit.get("message", ""),
+                date=_to_db_time(commit.get("date")),
+                additions=commit.get("additions", 0),
+                deletions=commit.get("deletions", 0),
+                total=commit.get("total", 0),
+                files=commit.get("files", 0)
+            )
+        self.session.add_all(new_rows.values())
+        self.session.commit()
+        
+    def upsert_pull_requests(self, repo: str, pull_requests: List[Dict[str, Any]]):
+        """Insert new PRs and refresh state, merge time and stats of known ones"""
+        for pr in pull_requests:
+            self.session.merge(PullRequestRecord(
+                repo=repo,
+                number=pr["number"],
+                title=pr.get("title", ""),
+                author=pr.get("author", "unknown"),
+                state=pr.get("state"),
+                created_at=_to_db_time(pr.get("created_at")),
+                updated_at=_to_db_time(pr.get("updated_at")),
+                merged_at=_to_db_time(pr.get("merged_at")),
+                additions=pr.get("additions", 0),
+                deletions=pr.get("deletions", 0),
+                changed_files=pr.get("changed_files", 0),
+                review_comments=pr.get("review_comments", 0)
+            ))
+        self.session.commit()
+        
+    def query_commits(self, repo: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Return stored commits dated within [start, end], newest first"""
+        rows = (
+            self.session.query(CommitRecord)
+            .filter(CommitRecord.repo == repo,
+                    CommitRecord.date >= _to_db_time(start),
+                    CommitRecord.date <= _to_db_time(end))
+            .order_by(CommitRecord.date.desc())
+        )
+        return [{
+            "sha": c.sha,
+            "author": c.author,
+            "message": c.message,
+            "date": _from_db_time(c.date),
+            "additions": c.additions,
+            "deletions": c.deletions,
+            "total": c.total,
+            "files": c.files
+        } for c in rows]
+        
+    def query_pull_requests(self, repo: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Return stored PRs created within [start, end], most recently updated first"""
+        rows = (
+            self.session.query(PullRequestRecord)
+            .filter(PullRequestRecord.repo == repo,
+                    PullRequestRecord.created_at >= _to_db_time(start),
+                    PullRequestRecord.created_at <= _to_db_time(end))
+            .order_by(PullRequestRecord.updated_at.desc())
         )
-        self.session.add(conv)
-        self.session.commit()
\ No newline at end of file
+        return [{
+            "number": pr.number,
+            "title": pr.title,
+            "author": pr.author,
+            "state": pr.state,
+            "created_at": _from_db_time(pr.created_at),
+            "updated_at": _from_db_time(pr.updated_at),
+            "merged_at": _from_db_time(pr.merged_at),
+            "additions": pr.additions,
+            "deletions": pr.deletions,
+            "changed_files": pr.changed_files,
+            "review_comments": pr.review_comments
+        } for pr in rows]
@@ -0,0 +1,122 @@
+# src/storage/sqlite_store.py
+from typing import Dict, Any, Iterable, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLiteStore:
+    """Byte-budgeted key/value table in a local SQLite file
+
+    Each entry is a blob plus a small JSON ``meta`` dict. Entries may
+    expire; past ``max_bytes`` expired entries go first, then the least
+    recently used until the store is under 90% of its budget. The HTTP,
+    LLM response and checkpoint caches are built on this; they keep their
+    own hit/miss counters because each defines a hit differently.
+    ``replaces`` names tables of an earlier layout in the same file, which
+    are dropped.
+    """
+
+    def __init__(self, path: str, table: str = "entries", max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None, replaces: Iterable[str] = ()):
+        self.path = path
+        self.table = table
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for legacy in replaces:
+            self._conn.execute(f"DROP TABLE IF EXISTS {legacy}")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY, meta TEXT, value BLOB, size INTEGER, expires_at REAL, last_access REAL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_last_access ON {table} (last_access)")
+        self._conn.execute(f"DELETE FROM {table} WHERE expires_at < ?", (time.time(),))
+        self._conn.commit()
+        self._size = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+
+    def get(self, key: str, touch: bool = True) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """``(meta, value)`` for a live key; ``touch`` marks it recently used"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT meta, value, size, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            meta, value, size, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._size -= size
+                self._conn.commit()
+                return None
+            if touch:
+                self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+        return json.loads(meta) if meta else {}, value
+
+    def touch(self, key: str):
+        with self._lock:
+            self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def put(self, key: str, value: bytes, meta: Optional[Dict[str, Any]] = None):
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else None
+        size = len(value)
+        with self._lock:
+            previous = self._conn.execute(f"SELECT size FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(meta) if meta else None, value, size, expires_at, now),
+            )
+            self._size += size - (previous[0] if previous else 0)
+            if self.max_bytes is not None and self._size > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+            self._size = 0
+
+    def _evict(self):
+        """Drop expired entries, then least-recently-used ones until under 90% of the budget"""
+        now = time.time()
+        expired = self._conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table} WHERE expires_at < ?", (now,)
+        ).fetchone()
+        self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (now,))
+        self.evictions += expired[0]
+        self._size -= expired[1]
+
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY last_access").fetchall()
+        for key, size in rows:
+            if self._size <= target:
+                break
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._size -= size
+            self.evictions += 1
+
+    def entries(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Footprint and evictions; callers add their own hit/miss counters"""
+        return {"evictions": self.evictions, "entries": self.entries(), "bytes": self._size}
+
+
+def hit_stats(hits: int, misses: int) -> Dict[str, Any]:
+    lookups = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else 0.0}
@@ -0,0 +1,113 @@
+# src/storage/write_behind.py
+from typing import Any, Callable, List, Optional
+import logging
+import queue
+import threading
+import time
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 0.05  # seconds a partial batch waits for more rows
+DEFAULT_MAX_PENDING = 10000
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """Background writer that commits queued rows in batches
+
+    Producers ``put`` ORM instances and return immediately. A single worker
+    thread drains up to ``batch_size`` of them (waiting at most
+    ``flush_interval`` for a batch to fill) and hands them to ``write``, which
+    persists the batch in one transaction. ``put`` blocks once
+    ``max_pending`` rows are waiting, so a slow disk slows producers down
+    instead of growing memory without bound.
+    """
+
+    def __init__(self, write: Callable[[List[Any]], None],
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 name: str = "db-write-behind"):
+        self.write = write
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger("WriteBehindQueue")
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self.batches = 0
+        self.written = 0
+        self.failed = 0
+        # Daemon so a forgotten close() never hangs the interpreter; the
+        # atexit hook in database.py flushes before daemon threads are stopped
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, row: Any):
+        if self._closed:
+            raise RuntimeError("write-behind queue is closed")
+        self._queue.put(row)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every row queued so far is committed (or has failed)"""
+        if timeout is None:
+            self._queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush pending rows and stop the worker"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            stop = batch[0] is _STOP
+            deadline = time.monotonic() + self.flush_interval
+            while not stop and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    row = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is _STOP:
+                    stop = True
+                batch.append(row)
+
+            rows = [row for row in batch if row is not _STOP]
+            try:
+                if rows:
+                    self._write(rows)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, rows: List[Any]):
+        try:
+            self.write(rows)
+            self.batches += 1
+            self.written += len(rows)
+            return
+        except Exception as e:
+            self.logger.warning(f"Batch of {len(rows)} rows failed ({e}); retrying one by one")
+        # One bad row should not take the rest of the batch with it
+        for row in rows:
+            try:
+                self.write([row])
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                self.logger.error(f"Dropping {type(row).__name__} after write failure: {e}")
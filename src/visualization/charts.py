@@ -1,10 +1,11 @@
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 from typing import Dict, List, Any
 import io
-import base64
+from src.visualization.renderer import get_chart_renderer
 
 class ChartGenerator:
     """Generate charts for metrics visualization"""
@@ -12,6 +13,23 @@ class ChartGenerator:
     @staticmethod
     def create_developer_activity_chart(dev_metrics: Dict[str, Dict]) -> bytes:
         """Create bar chart of developer activity"""
+        return get_chart_renderer().render("developer_activity", dev_metrics)
+    
+    @staticmethod
+    def create_code_health_chart(metrics: Dict[str, Any]) -> bytes:
+        """Create code health visualization"""
+        return get_chart_renderer().render("code_health", metrics)
+    
+    @staticmethod
+    def create_trend_chart(historical_data: List[Dict]) -> bytes:
+        """Create trend chart for metrics over time"""
+        if not historical_data:
+            return ChartGenerator._create_empty_chart()
+        return get_chart_renderer().render("trends", historical_data)
+    
+    @staticmethod
+    def developer_activity_figure(dev_metrics: Dict[str, Dict]) -> go.Figure:
+        """Bar chart of developer activity"""
         fig = make_subplots(
             rows=1, cols=2,
             subplot_titles=("Commits by Developer", "Code Changes by Developer")
@@ -34,13 +52,11 @@ class ChartGenerator:
         )
         
         fig.update_layout(height=400, showlegend=False, title_text="Developer Activity")
-        
-        # Convert to PNG bytes
-        return fig.to_image(format="png")
+        return fig
     
     @staticmethod
-    def create_code_health_chart(metrics: Dict[str, Any]) -> bytes:
-        """Create code health visualization"""
+    def code_health_figure(metrics: Dict[str, Any]) -> go.Figure:
+        """Gauge of the code health score"""
         fig = go.Figure()
         
         # Create gauge chart for code health score
@@ -69,14 +85,11 @@ class ChartGenerator:
         ))
         
         fig.update_layout(height=300)
-        return fig.to_image(format="png")
+        return fig
     
     @staticmethod
-    def create_trend_chart(historical_data: List[Dict]) -> bytes:
-        """Create trend chart for metrics over time"""
-        if not historical_data:
-            return ChartGenerator._create_empty_chart()
-        
+    def trend_figure(historical_data: List[Dict]) -> go.Figure:
+        """Deployment frequency and lead time over time"""
         df = pd.DataFrame(historical_data)
         
         fig = make_subplots(
@@ -110,7 +123,59 @@ class ChartGenerator:
         )
         
         fig.update_layout(height=500, showlegend=False)
-        return fig.to_image(format="png")
+        return fig
+    
+    # Matplotlib equivalents for the lightweight backend (no kaleido); the
+    # object API keeps them safe to draw from several threads
+    
+    @staticmethod
+    def developer_activity_plot(dev_metrics: Dict[str, Dict]) -> Figure:
+        developers = list(dev_metrics.keys())
+        commits = [dev_metrics[dev]['commits'] for dev in developers]
+        changes = [dev_metrics[dev]['additions'] + dev_metrics[dev]['deletions'] for dev in developers]
+        
+        fig = Figure(figsize=(10, 4))
+        left, right = fig.subplots(1, 2)
+        left.bar(developers, commits, color='lightblue')
+        left.set_title("Commits by Developer")
+        right.bar(developers, changes, color='lightgreen')
+        right.set_title("Code Changes by Developer")
+        for ax in (left, right):
+            ax.tick_params(axis='x', labelrotation=45)
+        fig.suptitle("Developer Activity")
+        fig.tight_layout()
+        return fig
+    
+    @staticmethod
+    def code_health_plot(metrics: Dict[str, Any]) -> Figure:
+        churn_rate = metrics.get('churn_rate', 0)
+        health_score = max(0, 100 - (churn_rate * 10))  # Simple health score
+        
+        fig = Figure(figsize=(6, 2))
+        ax = fig.subplots()
+        ax.barh([0], [50], color='lightgray')
+        ax.barh([0], [30], left=[50], color='gray')
+        ax.barh([0], [health_score], height=0.4, color='darkblue')
+        ax.axvline(90, color='red', linewidth=4)
+        ax.set_xlim(0, 100)
+        ax.set_yticks([])
+        ax.set_title(f"Code Health Score: {health_score:.0f}")
+        fig.tight_layout()
+        return fig
+    
+    @staticmethod
+    def trend_plot(historical_data: List[Dict]) -> Figure:
+        df = pd.DataFrame(historical_data)
+        
+        fig = Figure(figsize=(8, 5))
+        top, bottom = fig.subplots(2, 1, sharex=True)
+        top.plot(df['timestamp'], df['deployment_frequency'], marker='o', color='green')
+        top.set_title("Deployment Frequency Trend")
+        bottom.plot(df['timestamp'], df['lead_time_hours'], marker='o', color='orange')
+        bottom.set_title("Lead Time Trend")
+        fig.autofmt_xdate()
+        fig.tight_layout()
+        return fig
     
     @staticmethod
     def _create_empty_chart() -> bytes:
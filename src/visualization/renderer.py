@@ -0,0 +1,206 @@
+# src/visualization/renderer.py
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import importlib.util
+import io
+import json
+import logging
+import multiprocessing
+import os
+import threading
+
+# Chart kind -> (plotly figure builder, matplotlib figure builder) on ChartGenerator
+CHART_KINDS = {
+    "developer_activity": ("developer_activity_figure", "developer_activity_plot"),
+    "code_health": ("code_health_figure", "code_health_plot"),
+    "trends": ("trend_figure", "trend_plot"),
+}
+DEFAULT_WORKERS = 2
+DEFAULT_CACHE_MB = 32
+
+FORMATS = ("png", "svg", "json")
+
+ChartJob = Tuple[str, Any]  # (kind, inputs)
+
+
+def chart_spec(kind: str, title: str, inputs: Any) -> Dict[str, Any]:
+    """Declarative chart: what to draw and from which data, not the image
+
+    ``inputs`` references data already in the report state (metrics, trend),
+    so a spec costs a small dict rather than an encoded image.
+    """
+    return {"type": kind, "title": title, "inputs": inputs}
+
+
+def render_spec(spec: Dict[str, Any], fmt: str = "png") -> bytes:
+    """Image bytes for a chart spec: png/svg, or plotly figure JSON for interactive clients"""
+    return get_chart_renderer().render(spec["type"], spec["inputs"], fmt)
+
+
+def render_specs(specs: Sequence[Dict[str, Any]], fmt: str = "png") -> List[bytes]:
+    """Render a report's chart specs concurrently, in order"""
+    return get_chart_renderer().render_many([(spec["type"], spec["inputs"]) for spec in specs], fmt)
+
+
+def render_chart(kind: str, inputs: Any, fmt: str = "png", backend: str = "plotly") -> bytes:
+    """Build and rasterize one chart; runs inside pool workers"""
+    # Imported here: charts.py imports this module for get_chart_renderer
+    from src.visualization.charts import ChartGenerator
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported chart format: {fmt}")
+    figure_builder, plot_builder = CHART_KINDS[kind]
+    if fmt == "json":
+        # Figure JSON needs no rasterizer, whatever the backend
+        return getattr(ChartGenerator, figure_builder)(inputs).to_json().encode("utf-8")
+    if backend == "plotly":
+        return getattr(ChartGenerator, figure_builder)(inputs).to_image(format=fmt)
+    fig = getattr(ChartGenerator, plot_builder)(inputs)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt)
+    return buf.getvalue()
+
+
+def _warm_worker(backend: str):
+    """Pay the renderer start-up (kaleido launches a Chromium process) once per worker"""
+    render_chart("code_health", {"churn_rate": 0}, "png", backend)
+
+
+def _default_backend() -> str:
+    """plotly when kaleido is installed, else matplotlib"""
+    return "plotly" if importlib.util.find_spec("kaleido") is not None else "matplotlib"
+
+
+class ChartRenderer:
+    """Renders charts on a warm process pool, memoized by content hash
+
+    Workers are started once and warmed up front, so a report only pays the
+    rasterization itself; a report's charts are rendered concurrently. With
+    ``workers=0`` rendering happens in the calling thread, which suits the
+    matplotlib backend on small containers.
+    """
+
+    def __init__(self, backend: Optional[str] = None, workers: Optional[int] = None,
+                 cache_bytes: int = DEFAULT_CACHE_MB * 1024 * 1024):
+        backend = (backend or os.getenv("CHART_BACKEND", "auto")).lower()
+        self.backend = _default_backend() if backend == "auto" else backend
+        if self.backend not in ("plotly", "matplotlib"):
+            raise ValueError(f"Unknown chart backend: {self.backend}")
+        self.workers = int(os.getenv("CHART_WORKERS", DEFAULT_WORKERS)) if workers is None else workers
+        self.cache_bytes = cache_bytes
+        self.logger = logging.getLogger("ChartRenderer")
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_size = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+
+    def warm(self):
+        """Start the worker processes and their renderers ahead of the first report"""
+        pool = self._get_pool()
+        if pool is not None:
+            for _ in range(self.workers):
+                pool.submit(_warm_worker, self.backend)
+
+    def render(self, kind: str, inputs: Any, fmt: str = "png") -> bytes:
+        return self.render_many([(kind, inputs)], fmt)[0]
+
+    def render_many(self, jobs: Sequence[ChartJob], fmt: str = "png") -> List[bytes]:
+        """Render several charts concurrently; results are in job order"""
+        keys = [self.key_for(kind, inputs, fmt) for kind, inputs in jobs]
+        results: List[Optional[bytes]] = [self._lookup(key) for key in keys]
+
+        pending: Dict[int, Future] = {}
+        # JSON is serialization only; not worth a round trip to a worker
+        pool = self._get_pool() if fmt != "json" else None
+        for i, (kind, inputs) in enumerate(jobs):
+            if results[i] is None and pool is not None:
+                pending[i] = pool.submit(render_chart, kind, inputs, fmt, self.backend)
+
+        for i, (kind, inputs) in enumerate(jobs):
+            if results[i] is not None:
+                continue
+            if i in pending:
+                try:
+                    results[i] = pending[i].result()
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM-killed); start over on the next call
+                    self.logger.warning("Chart worker pool broke; rendering in-process")
+                    self._reset_pool()
+                    results[i] = render_chart(kind, inputs, fmt, self.backend)
+            else:
+                results[i] = render_chart(kind, inputs, fmt, self.backend)
+            self._store(keys[i], results[i])
+        return results
+
+    def key_for(self, kind: str, inputs: Any, fmt: str) -> str:
+        """Content hash of everything that determines the rendered bytes"""
+        payload = json.dumps([kind, inputs, fmt, self.backend], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._cache.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def _store(self, key: str, data: bytes):
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = data
+            self._cache_size += len(data)
+            while self._cache_size > self.cache_bytes and self._cache:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_size -= len(evicted)
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # Spawned, not forked: the parent holds DB and HTTP connections and threads
+                context = multiprocessing.get_context("spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._pool
+
+    def _reset_pool(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._cache),
+                "bytes": self._cache_size,
+            }
+
+    def shutdown(self):
+        self._reset_pool()
+
+
+_renderer: Optional[ChartRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_chart_renderer() -> ChartRenderer:
+    """Process-wide renderer configured from CHART_BACKEND / CHART_WORKERS"""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = ChartRenderer()
+        return _renderer
@@ -1,8 +1,8 @@
 # test_apis.py
 import os
 from dotenv import load_dotenv
-import requests
 import google.generativeai as genai
+from src.data.http_cache import cached_session
 
 load_dotenv()
 
@@ -13,7 +13,8 @@ github_token = os.getenv("GITHUB_TOKEN")
 github_owner = os.getenv("GITHUB_OWNER")
 
 headers = {"Authorization": f"token {github_token}"}
-response = requests.get(f"https://api.github.com/users/{github_owner}", headers=headers)
+session = cached_session()
+response = session.get(f"https://api.github.com/users/{github_owner}", headers=headers)
 
 if response.status_code == 200:
     print("✅ GitHub API: Connected")
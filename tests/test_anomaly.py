@@ -0,0 +1,73 @@
+# tests/test_anomaly.py
+from datetime import datetime, timedelta, timezone
+import json
+from src.agents.diffanalyst import DiffAnalystAgent
+from src.clients import ClientRegistry
+from src.data.columnar import CommitTable
+from src.metrics.anomaly import AnomalyDetector, REPLAY_HORIZON
+
+NOW = datetime(2026, 10, 16, 12, tzinfo=timezone.utc)
+
+
+def commits(start: datetime, n: int, prefix: str, big: int = -1) -> CommitTable:
+    """``n`` hourly commits of ~50 lines over 3 files; commit ``big`` is a 5000-line, 80-file outlier"""
+    rows = []
+    for i in range(n):
+        outlier = i == big
+        rows.append({
+            "sha": f"{prefix}{i:04d}", "author": f"dev{i % 3}", "message": "",
+            "date": start + timedelta(hours=i),
+            "additions": 5000 if outlier else 40 + i % 7, "deletions": 0 if outlier else 10,
+            "files": 80 if outlier else 3,
+        })
+    return CommitTable.from_records(rows)
+
+
+def test_replayed_window_is_not_scored_twice():
+    detector = AnomalyDetector()
+    table = commits(NOW - timedelta(days=5), 100, "a", big=90)
+    first = detector.update(table)
+    assert {a["commit"] for a in first} == {"a0090"}
+    state = json.dumps(detector.to_dict())
+
+    assert detector.update(table) == []
+    assert json.dumps(detector.to_dict()) == state
+    # Still reported for a later report over the same window
+    assert {a["type"] for a in detector.anomalies_for(table)} == {"high_churn", "many_files_changed"}
+
+
+def test_historical_window_is_scored_read_only():
+    detector = AnomalyDetector()
+    detector.update(commits(NOW - timedelta(days=5), 100, "a"))
+    state = json.dumps(detector.to_dict())
+
+    history = commits(NOW - REPLAY_HORIZON - timedelta(days=90), 50, "h", big=10)
+    assert detector.update(history) == []
+    anomalies = detector.anomalies_for(history)
+    assert {a["commit"] for a in anomalies} == {"h0010"}
+    assert all(a["baseline"] == "author" for a in anomalies)
+    # Neither the baselines nor the watermark moved
+    assert json.dumps(detector.to_dict()) == state
+
+
+def test_analyst_reports_anomalies_for_historical_windows():
+    class StubDB:
+        def __init__(self):
+            self.state = {}
+
+        def load_anomaly_state(self, scope):
+            return self.state.get(scope)
+
+        def save_anomaly_state(self, scope, state):
+            self.state[scope] = state
+
+    clients = ClientRegistry()
+    clients.register("db", StubDB)
+    analyst = DiffAnalystAgent(clients)
+    analyst._detect_anomalies(commits(NOW - timedelta(days=5), 100, "a"), {}, "acme/app")
+
+    # A fresh agent resumes from the persisted state, as the next report would
+    analyst = DiffAnalystAgent(clients)
+    history = commits(datetime(2026, 1, 5, tzinfo=timezone.utc), 50, "h", big=20)
+    anomalies = analyst._detect_anomalies(history, {}, "acme/app")
+    assert {a["commit"] for a in anomalies} == {"h0020"}
@@ -0,0 +1,34 @@
+# tests/test_developer_rollups.py
+from datetime import datetime, timezone
+import pytest
+from src.storage.database import DatabaseManager
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'insights.db'}")
+    monkeypatch.setenv("DB_WRITE_BEHIND", "0")
+    return DatabaseManager()
+
+
+def _sync(db, start: datetime, end: datetime, shas):
+    """What RepoHarvester._sync does with a fetched window"""
+    db.upsert_commits("acme/app", [{"sha": sha, "author": "dev", "date": start, "additions": 10, "files": 1}
+                                   for sha in shas])
+    db.refresh_developer_rollups("acme/app", start, end)
+
+
+def test_backfilled_days_reach_the_window_index(db):
+    _sync(db, utc(2026, 9, 1), utc(2026, 10, 1), ["new"])
+    db.set_watermark("acme/app", utc(2026, 9, 1), utc(2026, 10, 1))
+    assert db.developer_window(["acme/app"], utc(2026, 1, 1), utc(2026, 10, 1))["dev"]["commits"] == 1
+
+    # A historical backfill moves synced_from only
+    _sync(db, utc(2026, 3, 1), utc(2026, 9, 1), ["old1", "old2"])
+    assert db.developer_window(["acme/app"], utc(2026, 1, 1), utc(2026, 10, 1))["dev"]["commits"] == 3
+    db.set_watermark("acme/app", utc(2026, 3, 1), utc(2026, 10, 1))
+    assert db.developer_window(["acme/app"], utc(2026, 3, 1), utc(2026, 4, 1))["dev"]["commits"] == 2
@@ -0,0 +1,57 @@
+# tests/test_github_graphql.py
+from datetime import datetime, timezone
+from src.data.github_graphql import GitHubGraphQLClient, HISTORY_QUERY, REVIEWS_QUERY
+
+SINCE = datetime(2026, 10, 1, tzinfo=timezone.utc)
+UNTIL = datetime(2026, 10, 16, tzinfo=timezone.utc)
+
+
+def _reviews(counts, cursor=None):
+    return {"pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+            "nodes": [{"comments": {"totalCount": count}} for count in counts]}
+
+
+def _pull(number, reviews):
+    return {"number": number, "title": "", "state": "MERGED", "createdAt": "2026-10-02T00:00:00Z",
+            "updatedAt": "2026-10-03T00:00:00Z", "mergedAt": "2026-10-03T00:00:00Z", "additions": 1,
+            "deletions": 0, "changedFiles": 1, "author": {"login": "octocat"}, "reviews": reviews}
+
+
+class ScriptedClient(GitHubGraphQLClient):
+    """Answers each query from canned pages and records what was asked"""
+
+    def __init__(self, repository, review_pages=None):
+        super().__init__(token="test", url="http://graphql.invalid")
+        self.repository = repository
+        self.review_pages = review_pages or {}
+        self.calls = []
+
+    def execute(self, query, variables):
+        self.calls.append((query, dict(variables)))
+        if query == REVIEWS_QUERY:
+            reviews = self.review_pages[(variables["number"], variables["cursor"])]
+            return {"repository": {"pullRequest": {"reviews": reviews}}}
+        assert query == HISTORY_QUERY
+        return {"repository": self.repository}
+
+
+def test_empty_repository_has_no_commits_but_keeps_paging_prs():
+    client = ScriptedClient({
+        "defaultBranchRef": None,
+        "pullRequests": {"pageInfo": {"hasNextPage": False, "endCursor": "p1"}, "nodes": [_pull(1, _reviews([]))]},
+    })
+    commits, pull_requests = client.fetch_history("acme", "empty", SINCE, UNTIL)
+    assert commits == []
+    assert [pr["number"] for pr in pull_requests] == [1]
+    assert len(client.calls) == 1
+
+
+def test_review_comments_are_counted_past_the_first_page_of_reviews():
+    client = ScriptedClient(
+        {"pullRequests": {"pageInfo": {"hasNextPage": False, "endCursor": "p1"},
+                          "nodes": [_pull(7, _reviews([1] * 50, cursor="r50")), _pull(8, _reviews([2, 3]))]}},
+        {(7, "r50"): _reviews([1] * 100, cursor="r150"), (7, "r150"): _reviews([4])},
+    )
+    pull_requests = client.fetch_pull_requests("acme", "app", SINCE, SINCE)
+    assert {pr["number"]: pr["review_comments"] for pr in pull_requests} == {7: 154, 8: 5}
+    assert [variables["cursor"] for query, variables in client.calls if query == REVIEWS_QUERY] == ["r50", "r150"]
@@ -0,0 +1,104 @@
+# tests/test_harvest_sync.py
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+from src.data.harvest import RepoHarvester, SYNC_OVERLAP
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class FakeStore:
+    """The watermark and upsert calls RepoHarvester._sync makes"""
+
+    def __init__(self, synced_from=None, synced_until=None):
+        self.watermark = (SimpleNamespace(synced_from=synced_from, synced_until=synced_until)
+                          if synced_from else None)
+        self.commits = []
+
+    def get_watermark(self, repo):
+        return self.watermark
+
+    def set_watermark(self, repo, synced_from, synced_until):
+        self.watermark = SimpleNamespace(synced_from=synced_from, synced_until=synced_until)
+
+    def upsert_commits(self, repo, commits):
+        self.commits.extend(commits)
+
+    def upsert_pull_requests(self, repo, pull_requests):
+        pass
+
+    def refresh_developer_rollups(self, repo, start, end):
+        pass
+
+
+class FakeGraphQL:
+    """Records every window fetched and returns one commit dated at its start"""
+
+    def __init__(self):
+        self.fetches = []
+
+    def fetch_history(self, owner, name, since, until, pulls_updated_since=None, pulls_created_since=None):
+        self.fetches.append((since, until))
+        return [{"sha": since.isoformat(), "date": since}], []
+
+
+@pytest.fixture
+def harvester(monkeypatch):
+    monkeypatch.setenv("GITHUB_HARVEST_MODE", "graphql")
+    monkeypatch.setenv("HARVEST_CONCURRENCY", "1")
+    monkeypatch.setenv("HARVEST_INCREMENTAL", "1")
+
+    def build(store):
+        return RepoHarvester("acme/app", github=object(), graphql=FakeGraphQL(), store=store)
+    return build
+
+
+def test_first_sync_fetches_window_and_sets_watermark(harvester):
+    store = FakeStore()
+    h = harvester(store)
+    h._sync(utc(2026, 10, 1), utc(2026, 10, 8))
+    assert h.graphql.fetches == [(utc(2026, 10, 1), utc(2026, 10, 8))]
+    assert (store.watermark.synced_from, store.watermark.synced_until) == (utc(2026, 10, 1), utc(2026, 10, 8))
+
+
+def test_later_window_fetches_only_the_delta(harvester):
+    store = FakeStore(utc(2026, 10, 1), utc(2026, 10, 8))
+    h = harvester(store)
+    h._sync(utc(2026, 10, 2), utc(2026, 10, 9))
+    assert h.graphql.fetches == [(utc(2026, 10, 8) - SYNC_OVERLAP, utc(2026, 10, 9))]
+    assert store.watermark.synced_until == utc(2026, 10, 9)
+
+
+def test_earlier_start_backfills_the_gap(harvester):
+    store = FakeStore(utc(2026, 10, 1), utc(2026, 10, 8))
+    h = harvester(store)
+    h._sync(utc(2026, 9, 1), utc(2026, 10, 9))
+    assert h.graphql.fetches[0] == (utc(2026, 9, 1), utc(2026, 10, 1))
+    assert store.watermark.synced_from == utc(2026, 9, 1)
+
+
+def test_historical_window_keeps_the_watermark(harvester):
+    # Stored: the last few weeks. Requested: Q1, entirely before them.
+    store = FakeStore(utc(2026, 9, 15), utc(2026, 10, 16))
+    h = harvester(store)
+    h._sync(utc(2026, 1, 1), utc(2026, 4, 1))
+
+    # Only the backfill; no reversed "delta" from Oct 15 back to Apr 1
+    assert h.graphql.fetches == [(utc(2026, 1, 1), utc(2026, 9, 15))]
+    assert all(since <= until for since, until in h.graphql.fetches)
+    assert store.watermark.synced_from == utc(2026, 1, 1)
+    assert store.watermark.synced_until == utc(2026, 10, 16)
+
+    # The next weekly report is a one-day delta, not a refetch from March
+    h._sync(utc(2026, 10, 10), utc(2026, 10, 17))
+    assert h.graphql.fetches[-1] == (utc(2026, 10, 16) - SYNC_OVERLAP, utc(2026, 10, 17))
+
+
+def test_window_inside_stored_range_fetches_nothing(harvester):
+    store = FakeStore(utc(2026, 9, 1), utc(2026, 10, 16))
+    h = harvester(store)
+    h._sync(utc(2026, 9, 10), utc(2026, 9, 20))
+    assert h.graphql.fetches == []
+    assert store.watermark.synced_until == utc(2026, 10, 16)
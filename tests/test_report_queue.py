@@ -0,0 +1,87 @@
+# tests/test_report_queue.py
+import asyncio
+import pytest
+from src.bot.jobs import QueueFull, ReportQueue
+
+
+class SlowWorkflow:
+    """Counts runs; each one waits until the test releases it"""
+
+    def __init__(self):
+        self.runs = []
+        self.release = None
+
+    async def arun(self, command, time_range, target_user=None):
+        self.runs.append((command, time_range, target_user))
+        await self.release.wait()
+        return {"summary": f"{time_range} report", "errors": []}
+
+
+class FakeReports:
+    def __init__(self):
+        self.saved = []
+
+    def save(self, command, time_range, target_user, result, duration_s, computed_at):
+        self.saved.append((command, time_range, target_user))
+
+
+def test_identical_requests_share_one_run():
+    async def scenario():
+        workflow, reports = SlowWorkflow(), FakeReports()
+        workflow.release = asyncio.Event()
+        queue = ReportQueue(workflow, workers=2, max_queued=10, reports=reports)
+        queue.start()
+        submissions = [queue.submit("insights", "weekly") for _ in range(10)]
+        await asyncio.sleep(0)
+        workflow.release.set()
+        results = await asyncio.gather(*(future for future, _ in submissions))
+        await queue.stop()
+        return workflow, reports, queue, submissions, results
+
+    workflow, reports, queue, submissions, results = asyncio.run(scenario())
+    assert workflow.runs == [("insights", "weekly", None)]
+    assert [coalesced for _, coalesced in submissions] == [False] + [True] * 9
+    assert all(result["summary"] == "weekly report" for result in results)
+    assert reports.saved == [("insights", "weekly", None)]
+    assert queue.stats()["coalesced"] == 9
+
+
+def test_different_requests_run_separately_and_finished_ones_rerun():
+    async def scenario():
+        workflow = SlowWorkflow()
+        workflow.release = asyncio.Event()
+        workflow.release.set()
+        queue = ReportQueue(workflow, workers=1, max_queued=10)
+        queue.start()
+        first, _ = queue.submit("insights", "weekly")
+        other, _ = queue.submit("insights", "weekly", "octocat")
+        await asyncio.gather(first, other)
+        # The earlier run is finished, so this is a fresh one rather than its stale result
+        again, coalesced = queue.submit("insights", "weekly")
+        await again
+        await queue.stop()
+        return workflow, coalesced
+
+    workflow, coalesced = asyncio.run(scenario())
+    assert not coalesced
+    assert workflow.runs == [("insights", "weekly", None), ("insights", "weekly", "octocat"),
+                             ("insights", "weekly", None)]
+
+
+def test_submit_rejects_when_the_queue_is_full():
+    async def scenario():
+        workflow = SlowWorkflow()
+        workflow.release = asyncio.Event()
+        queue = ReportQueue(workflow, workers=1, max_queued=1)
+        queue.start()
+        queue.submit("insights", "daily")
+        await asyncio.sleep(0)  # the worker takes it; the queue is empty again
+        queue.submit("insights", "weekly")
+        try:
+            with pytest.raises(QueueFull):
+                queue.submit("insights", "monthly")
+        finally:
+            await queue.stop()
+        return queue
+
+    assert asyncio.run(scenario()).stats()["rejected"] == 1
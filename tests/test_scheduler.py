@@ -0,0 +1,55 @@
+# tests/test_scheduler.py
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+import pytest
+from src.bot.scheduler import CronTrigger, parse_schedule
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+# 2026-10-16 is a Friday
+@pytest.mark.parametrize("expression, after, expected", [
+    ("0 5 * * *", utc(2026, 10, 16, 4, 59), utc(2026, 10, 16, 5, 0)),
+    ("0 5 * * *", utc(2026, 10, 16, 5, 0), utc(2026, 10, 17, 5, 0)),
+    ("*/15 * * * *", utc(2026, 10, 16, 10, 7), utc(2026, 10, 16, 10, 15)),
+    ("30 9-17/4 * * *", utc(2026, 10, 16, 14, 0), utc(2026, 10, 16, 17, 30)),
+    ("0 5 * * 1", utc(2026, 10, 16), utc(2026, 10, 19, 5, 0)),
+    ("0 5 * * 0", utc(2026, 10, 16), utc(2026, 10, 18, 5, 0)),
+    ("0 5 * * 7", utc(2026, 10, 16), utc(2026, 10, 18, 5, 0)),
+    ("0 5 * * 5-7", utc(2026, 10, 16, 6), utc(2026, 10, 17, 5, 0)),
+    ("0 0 29 2 *", utc(2026, 10, 16), utc(2028, 2, 29)),
+    ("0 0 1 * *", utc(2026, 12, 31, 23, 59), utc(2027, 1, 1)),
+    # Both day fields restricted: either one fires (the 20th is a Tuesday, the 19th a Monday)
+    ("0 0 20 * 1", utc(2026, 10, 16), utc(2026, 10, 19)),
+])
+def test_next_after(expression, after, expected):
+    assert CronTrigger(expression).next_after(after) == expected
+
+
+def test_next_after_honours_the_time_zone():
+    trigger = CronTrigger("0 5 * * *", ZoneInfo("America/New_York"))
+    assert trigger.next_after(utc(2026, 10, 16, 0)) == utc(2026, 10, 16, 9)
+    # Standard time after November 1st
+    assert trigger.next_after(utc(2026, 11, 2, 0)) == utc(2026, 11, 2, 10)
+
+
+@pytest.mark.parametrize("expression", ["0 5 * *", "60 5 * * *", "0 24 * * *", "0 5 0 * *", "0 5 * * 8"])
+def test_invalid_expressions_are_rejected(expression):
+    with pytest.raises(ValueError):
+        CronTrigger(expression)
+
+
+def test_never_firing_expression_raises():
+    with pytest.raises(ValueError):
+        CronTrigger("0 0 31 2 *").next_after(utc(2026, 10, 16))
+
+
+def test_parse_schedule():
+    jobs = parse_schedule("Daily=0 5 * * *; weekly=10 5 * * 1;")
+    assert [(job.time_range, job.trigger.expression) for job in jobs] == [
+        ("daily", "0 5 * * *"), ("weekly", "10 5 * * 1")
+    ]
+    with pytest.raises(ValueError):
+        parse_schedule("daily 0 5 * * *")
@@ -0,0 +1,75 @@
+# tests/test_slack_bot.py
+from datetime import datetime, timezone
+import asyncio
+import pytest
+from src.bot.jobs import ReportQueue
+from src.bot.reports import CachedReport
+from src.bot.slack_bot import InsightsBot
+
+
+class FakeWorkflow:
+    def __init__(self):
+        self.runs = 0
+
+    async def arun(self, command, time_range, target_user=None):
+        self.runs += 1
+        return {"summary": "fresh", "errors": []}
+
+
+class FakeReports:
+    """Records when the cache is read relative to the ack"""
+
+    def __init__(self, events, cached=None):
+        self.events = events
+        self.cached = cached
+
+    def lookup(self, command, time_range, target_user):
+        self.events.append("lookup")
+        return self.cached
+
+    def save(self, *args):
+        pass
+
+
+def _handle(cached=None):
+    events, responses = [], []
+
+    async def ack(text=None):
+        events.append("ack")
+
+    async def respond(text=None, **kwargs):
+        responses.append(text)
+
+    async def scenario():
+        workflow = FakeWorkflow()
+        reports = FakeReports(events, cached)
+        bot = InsightsBot(workflow, ReportQueue(workflow, workers=1, reports=reports), reports)
+        bot.queue.start()
+        await bot.handle_insights(ack, {"text": "weekly", "channel_id": "C1"}, respond, client=None)
+        await bot.queue.stop()
+        return workflow
+
+    workflow = asyncio.run(scenario())
+    return events, responses, workflow
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    monkeypatch.setenv("REPORT_SCHEDULE", "off")
+    monkeypatch.setenv("BOT_UPLOAD_CHARTS", "0")
+
+
+def test_ack_comes_before_the_cache_lookup():
+    events, responses, workflow = _handle()
+    assert events[:2] == ["ack", "lookup"]
+    assert responses[0].startswith("Generating your weekly report")
+    assert responses[-1] == "fresh"
+    assert workflow.runs == 1
+
+
+def test_cached_report_is_served_after_the_ack():
+    cached = CachedReport({"summary": "stored"}, [], datetime(2026, 10, 16, tzinfo=timezone.utc), fresh=True)
+    events, responses, workflow = _handle(cached)
+    assert events == ["ack", "lookup"]
+    assert responses == ["stored"]
+    assert workflow.runs == 0
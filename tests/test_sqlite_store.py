@@ -0,0 +1,56 @@
+# tests/test_sqlite_store.py
+import sqlite3
+import time
+import pytest
+from src.graph.checkpoint import CheckpointStore
+from src.llm.cache import ResponseCache, SQLiteResponseCache
+from src.storage.sqlite_store import SQLiteStore
+
+
+def test_least_recently_used_entries_go_first(tmp_path):
+    store = SQLiteStore(str(tmp_path / "store.sqlite"), max_bytes=300)
+    for key in ("a", "b", "c"):
+        store.put(key, b"x" * 100, {"name": key})
+        time.sleep(0.01)
+    store.get("a")
+    store.put("d", b"x" * 100)
+    assert store.get("b") is None
+    assert store.get("a") == ({"name": "a"}, b"x" * 100)
+    assert store.stats() == {"evictions": 2, "entries": 2, "bytes": 200}
+
+
+def test_expired_entries_are_not_served(tmp_path):
+    store = SQLiteStore(str(tmp_path / "store.sqlite"), ttl_seconds=0.01)
+    store.put("a", b"value")
+    time.sleep(0.02)
+    assert store.get("a") is None
+    assert store.stats()["bytes"] == 0
+
+
+def test_tables_of_the_old_layout_are_dropped(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE checkpoints (key TEXT PRIMARY KEY, node TEXT, run_id TEXT, output BLOB,"
+                 " size INTEGER, created_at REAL, expires_at REAL)")
+    conn.execute("INSERT INTO checkpoints VALUES ('k', 'n', NULL, X'00', 1, 0, NULL)")
+    conn.commit()
+    conn.close()
+
+    store = CheckpointStore(path)
+    assert store.get("k") is None
+    store.put("k", "narrate", "run", {"narrative": "story"})
+    assert CheckpointStore(path).get("k") == {"narrative": "story"}
+    tables = {name for (name,) in sqlite3.connect(path).execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "checkpoints" not in tables
+
+
+def test_response_caches_count_hits_and_persist(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    cache = SQLiteResponseCache(path)
+    assert cache.get("k") is None
+    cache.set("k", "réponse")
+    assert SQLiteResponseCache(path).get("k") == "réponse"
+    assert cache.get("k") == "réponse"
+    assert cache.stats()["hit_rate"] == 0.5
+    with pytest.raises(TypeError):
+        ResponseCache()
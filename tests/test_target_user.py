@@ -0,0 +1,95 @@
+# tests/test_target_user.py
+from datetime import datetime, timezone
+import json
+import pytest
+from src.agents.dataharvester import DataHarvesterAgent
+from src.agents.diffanalyst import DiffAnalystAgent
+from src.agents.insightnarrator import InsightNarratorAgent
+from src.bot.slack_bot import parse_command
+from src.clients import ClientRegistry
+from src.storage.database import DatabaseManager
+
+
+def _commit(sha, author):
+    return {"sha": sha, "author": author, "message": "", "date": datetime(2026, 10, 1, tzinfo=timezone.utc),
+            "additions": 1, "deletions": 0, "total": 1, "files": 1}
+
+
+def _pr(number, author):
+    created = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    return {"number": number, "title": "", "author": author, "state": "closed", "created_at": created,
+            "updated_at": created, "merged_at": created, "additions": 1, "deletions": 0,
+            "changed_files": 1, "review_comments": 0}
+
+
+class FakeHarvester:
+    def harvest(self, start_date, end_date):
+        return ([_commit("a", "Octocat"), _commit("b", "hubot"), _commit("c", "Octocat")],
+                [_pr(1, "hubot"), _pr(2, "Octocat")])
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    for name in ("GITHUB_REPOS", "GITHUB_ORG"):
+        monkeypatch.delenv(name, raising=False)
+    agent = DataHarvesterAgent(ClientRegistry())
+    agent.__dict__["harvester"] = FakeHarvester()
+    return agent
+
+
+def test_target_user_narrows_commits_and_prs(agent):
+    state = agent.process({"time_range": "weekly", "target_user": "octocat", "errors": []})
+    assert state["errors"] == []
+    assert [c["sha"] for c in state["commits"]] == ["a", "c"]
+    assert [pr["number"] for pr in state["pull_requests"]] == [2]
+
+
+def test_unknown_target_user_gets_an_empty_report(agent):
+    state = agent.process({"time_range": "weekly", "target_user": "nobody", "errors": []})
+    assert len(state["commits"]) == 0 and len(state["pull_requests"]) == 0
+
+
+def test_without_target_user_the_whole_team_is_kept(agent):
+    state = agent.process({"time_range": "weekly", "target_user": None, "errors": []})
+    assert len(state["commits"]) == 3 and len(state["pull_requests"]) == 2
+
+
+def test_parse_command_takes_a_github_login():
+    assert parse_command("Q3 2024 @OctoCat") == ("q3 2024", "octocat")
+    assert parse_command("") == ("weekly", None)
+
+
+def test_parse_command_rejects_slack_mentions():
+    with pytest.raises(ValueError):
+        parse_command("weekly <@U024BE7LH|bob>")
+
+
+def test_user_reports_leave_the_team_trend_and_baselines_alone(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'insights.db'}")
+    monkeypatch.setenv("DB_WRITE_BEHIND", "0")
+    monkeypatch.setenv("GITHUB_OWNER", "acme")
+    monkeypatch.setenv("GITHUB_REPO", "app")
+    monkeypatch.delenv("GITHUB_REPOS", raising=False)
+    clients = ClientRegistry()
+    clients.register("db", DatabaseManager)
+    analyst, narrator = DiffAnalystAgent(clients), InsightNarratorAgent(clients)
+    db = clients.get("db")
+
+    team = {"commits": [_commit("a", "octocat"), _commit("b", "hubot")], "pull_requests": [_pr(1, "hubot")],
+            "time_range": "weekly", "target_user": None, "errors": []}
+    team.update(analyst.analyze_metrics(team))
+    narrator.persist_metrics(team)
+    trend = db.get_metrics_trend(time_range="weekly")
+    baselines = db.load_anomaly_state("acme/app")
+    assert len(trend) == 1 and baselines is not None
+
+    # Commits the team run has not seen yet, which would move the baselines if observed
+    user = {"commits": [_commit("c", "octocat"), _commit("d", "octocat")], "pull_requests": [],
+            "time_range": "weekly", "target_user": "octocat", "errors": []}
+    user.update(analyst.analyze_metrics(user))
+    narrator.persist_metrics(user)
+    assert user["errors"] == []
+    assert narrator.query_trends(user) == {"trend": []}
+    assert db.get_metrics_trend(time_range="weekly") == trend
+    assert db.load_anomaly_state("acme/app") == baselines
+    assert json.loads(json.dumps(analyst.detectors["acme/app"].to_dict())) == baselines
@@ -0,0 +1,29 @@
+# tests/test_time_range.py
+from datetime import datetime, timezone
+import pytest
+from src.metrics.time_range import resolve_time_range
+
+NOW = datetime(2026, 10, 16, 12, tzinfo=timezone.utc)
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("time_range, expected", [
+    ("weekly", (utc(2026, 10, 9, 12), NOW)),
+    ("last_90_days", (utc(2026, 7, 18, 12), NOW)),
+    ("Q3 2024", (utc(2024, 7, 1), utc(2024, 10, 1))),
+    ("q4", (utc(2026, 10, 1), NOW)),
+    ("q1", (utc(2026, 1, 1), utc(2026, 4, 1))),
+    ("2026-10-01..2026-12-31", (utc(2026, 10, 1), NOW)),
+])
+def test_resolve_time_range(time_range, expected):
+    assert resolve_time_range(time_range, NOW) == expected
+
+
+@pytest.mark.parametrize("time_range", ["q4 2030", "2030-01-01..2030-02-01", "2026-10-17..2026-10-20",
+                                        "2024-09-30..2024-07-01", "0d", "fortnightly"])
+def test_invalid_or_future_ranges_are_rejected(time_range):
+    with pytest.raises(ValueError):
+        resolve_time_range(time_range, NOW)
@@ -0,0 +1,99 @@
+# tests/test_workflow_checkpoints.py
+from collections import Counter
+from src.clients import ClientRegistry
+from src.data.columnar import CommitTable
+from src.graph.checkpoint import CheckpointStore
+from src.graph.workflow import DevInsightsWorkflow
+
+
+class FakeAgents:
+    """Every workflow step at once; counts calls and fails the steps named in ``failing``"""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.failing = set()
+
+    def _step(self, name, state, **updates):
+        self.calls[name] += 1
+        if name in self.failing:
+            state["errors"].append(f"{name} failed")
+            return {}
+        return updates
+
+    def process(self, state):
+        commits = CommitTable.from_records([{"sha": "a1", "author": "dev", "message": "", "date": state["timestamp"],
+                                             "additions": 10, "deletions": 2, "files": 1}])
+        return self._step("harvest_data", state, commits=commits)
+
+    def analyze_metrics(self, state):
+        return self._step("analyze_metrics", state, metrics={"commits": len(state.get("commits", []))}, anomalies=[])
+
+    def analyze_code(self, state):
+        return self._step("analyze_code", state, code_analysis="fine")
+
+    def build_charts(self, state):
+        return self._step("build_charts", state, charts=[])
+
+    def persist_metrics(self, state):
+        return self._step("persist_metrics", state)
+
+    def query_trends(self, state):
+        return self._step("query_trends", state, trend=[])
+
+    def narrate(self, state):
+        return self._step("narrate", state, narrative="story")
+
+    def build_trend_chart(self, state):
+        return self._step("build_trend_chart", state)
+
+    def summarize(self, state):
+        return {"summary": state.get("narrative", "")}
+
+
+def _workflow(tmp_path):
+    workflow = DevInsightsWorkflow(ClientRegistry(), CheckpointStore(str(tmp_path / "checkpoints.sqlite")))
+    agents = FakeAgents()
+    workflow.harvester = workflow.analyst = workflow.narrator = agents
+    return workflow, agents
+
+
+def test_resume_reruns_only_the_failed_step(tmp_path):
+    workflow, agents = _workflow(tmp_path)
+    agents.failing = {"narrate"}
+    failed = workflow.run("insights", "weekly")
+    assert failed["errors"] == ["narrate failed"]
+
+    agents.failing = set()
+    result = workflow.resume(failed["run_id"])
+    assert result["errors"] == []
+    assert result["summary"] == "story"
+    assert result["harvest_key"] == failed["harvest_key"]
+    assert agents.calls["harvest_data"] == 1
+    assert agents.calls["analyze_metrics"] == 1
+    assert agents.calls["analyze_code"] == 1
+    assert agents.calls["narrate"] == 2
+
+
+def test_new_run_reharvests_but_reuses_the_analysis(tmp_path):
+    workflow, agents = _workflow(tmp_path)
+    first = workflow.run("insights", "weekly")
+    second = workflow.run("insights", "weekly")
+    assert second["harvest_key"] != first["harvest_key"]
+    assert agents.calls["harvest_data"] == 2
+    assert agents.calls["analyze_metrics"] == 2
+    # Same metrics, so the analysis comes from its checkpoint; narrate logs each run's conversation
+    assert agents.calls["analyze_code"] == 1
+    assert agents.calls["narrate"] == 2
+
+
+def test_failed_harvest_is_not_keyed_downstream(tmp_path):
+    workflow, agents = _workflow(tmp_path)
+    agents.failing = {"harvest_data"}
+    failed = workflow.run("insights", "weekly")
+    assert "harvest_key" not in failed or failed["harvest_key"] is None
+
+    agents.failing = set()
+    workflow.resume(failed["run_id"])
+    # Nothing was saved for analyze_metrics without a harvest key, so it reruns on the new harvest
+    assert agents.calls["harvest_data"] == 2
+    assert agents.calls["analyze_metrics"] == 2